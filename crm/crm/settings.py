@@ -68,6 +68,7 @@ INSTALLED_APPS = [
 CRISPY_TEMPLATE_PACK = 'bootstrap4'
 
 MIDDLEWARE = [
+    'webapp.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -167,12 +168,67 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Together AI (Primary) - Fast, cheap, high quality
 TOGETHER_API_KEY = os.getenv('TOGETHER_API_KEY', '')
 TOGETHER_MODEL = os.getenv('TOGETHER_MODEL', 'meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo')
+# Bazowy URL API zgodnego z OpenAI; lokalnie można wskazać fake_together_server (np. http://127.0.0.1:8765/v1)
+TOGETHER_API_URL = os.getenv('TOGETHER_API_URL', 'https://api.together.xyz/v1')
+TOGETHER_TIMEOUT = float(os.getenv('TOGETHER_TIMEOUT', '60'))
+# Ponowienia przy 429/5xx/błędach połączenia (z Retry-After albo backoffem wykładniczym)
+TOGETHER_MAX_RETRIES = int(os.getenv('TOGETHER_MAX_RETRIES', '0'))
+TOGETHER_RETRY_BACKOFF = float(os.getenv('TOGETHER_RETRY_BACKOFF', '1.0'))
 
+# Rejestr wywołań LLM (LLMCallLog) - zapis zbiorczy w wątku w tle
+LLM_CALL_LOG_ENABLED = os.getenv('LLM_CALL_LOG_ENABLED', 'True') == 'True'
+LLM_CALL_LOG_ASYNC = os.getenv('LLM_CALL_LOG_ASYNC', 'True') == 'True'
+LLM_CALL_LOG_FLUSH_SIZE = int(os.getenv('LLM_CALL_LOG_FLUSH_SIZE', '50'))
+LLM_CALL_LOG_FLUSH_INTERVAL = float(os.getenv('LLM_CALL_LOG_FLUSH_INTERVAL', '5'))
 
+# Spotify (wyszukiwarka artystów) - jeden klient na proces, token odświeżany dopiero po wygaśnięciu
+SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID', '')
+SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET', '')
+# Adresy można podmienić na lokalny serwer (testy, praca offline)
+SPOTIFY_TOKEN_URL = os.getenv('SPOTIFY_TOKEN_URL', 'https://accounts.spotify.com/api/token')
+SPOTIFY_API_URL = os.getenv('SPOTIFY_API_URL', 'https://api.spotify.com/v1/')
+SPOTIFY_TIMEOUT = float(os.getenv('SPOTIFY_TIMEOUT', '5'))
+# Cache wyników wyszukiwania (TTL + LRU, w pamięci procesu)
+SPOTIFY_CACHE_TTL = int(os.getenv('SPOTIFY_CACHE_TTL', '3600'))
+SPOTIFY_CACHE_SIZE = int(os.getenv('SPOTIFY_CACHE_SIZE', '512'))
+# Podpowiedzi (typeahead): liczba wyników, minimalna długość zapytania, cache i odstęp między
+# zapytaniami do Spotify z jednej sesji (szybsze naciśnięcia dostają odpowiedź "debounced")
+SPOTIFY_TYPEAHEAD_LIMIT = int(os.getenv('SPOTIFY_TYPEAHEAD_LIMIT', '8'))
+SPOTIFY_TYPEAHEAD_MIN_CHARS = int(os.getenv('SPOTIFY_TYPEAHEAD_MIN_CHARS', '2'))
+SPOTIFY_TYPEAHEAD_CACHE_TTL = int(os.getenv('SPOTIFY_TYPEAHEAD_CACHE_TTL', '300'))
+SPOTIFY_TYPEAHEAD_DEBOUNCE = float(os.getenv('SPOTIFY_TYPEAHEAD_DEBOUNCE', '0.3'))
 
+# Onboarding
+# Propagacja nowych szablonów do istniejących członków w wątku w tle (bez Celery)
+ONBOARDING_PROPAGATION_ASYNC = os.getenv('ONBOARDING_PROPAGATION_ASYNC', 'True') == 'True'
+# Grafy zależności zadań (depends_on) per rola w cache; zmiany szablonów unieważniają je od razu
+ONBOARDING_GRAPH_CACHE_TIMEOUT = int(os.getenv('ONBOARDING_GRAPH_CACHE_TIMEOUT', '3600'))
 
 
 
 
 
 
+
+
+
+
+# Cache
+# Domyślnie pamięć procesu. Wersje kluczy (generacja statystyk, graf zależności onboardingu)
+# leżą w bazie, więc unieważnianie działa między workerami także bez wspólnego backendu;
+# wspólny backend (np. Redis/Memcached) pozwala tylko dzielić same wpisy.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'crm-default'),
+    }
+}
+STATS_CACHE_TIMEOUT = int(os.getenv('STATS_CACHE_TIMEOUT', '600'))
+# Jak długo członkostwa projektowe (uprawnienia admina) są trzymane w sesji; zmiany członkostw unieważniają je od razu
+PROJECT_PERMISSIONS_SESSION_TTL = int(os.getenv('PROJECT_PERMISSIONS_SESSION_TTL', '300'))
+
+# Metryki żądań (/metrics, format Prometheusa)
+# Histogramy zbierane dla części żądań; licznik żądań zawsze. Pusty METRICS_TOKEN = endpoint tylko dla kont staff.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', '0.1'))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
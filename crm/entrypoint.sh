@@ -24,13 +24,7 @@ if not User.objects.filter(username=username).exists():
 "
 
 echo "👤 Tworzę profile dla pozostałych użytkowników (jeśli brak)..."
-python manage.py shell -c "
-from django.contrib.auth.models import User
-from webapp.models import UserProfile
-
-for user in User.objects.all():
-    UserProfile.objects.get_or_create(user=user)
-"
+python manage.py ensure_user_profiles
 
 if [ "$ENVIRONMENT" = "production" ]; then
   echo "🚀 Uruchamiam Gunicorn (produkcja)"
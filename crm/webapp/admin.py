@@ -1,8 +1,9 @@
 from django.contrib import admin
+from django.db.models import Avg, Count, Sum
 
 # Register your models here.
 
-from webapp.models import Contact,ProjectTask,Project,UserRole,UserProfile,OnboardingTaskTemplate,OnboardingTask
+from webapp.models import Contact,ProjectTask,Project,UserRole,UserProfile,OnboardingTaskTemplate,OnboardingTask,OnboardingTaskCompletion,LLMCallLog
 
 admin.site.register(Contact)
 admin.site.register(ProjectTask)
@@ -11,4 +12,49 @@ admin.site.register(UserRole)
 admin.site.register(UserProfile)
 admin.site.register(OnboardingTaskTemplate)
 admin.site.register(OnboardingTask)
+admin.site.register(OnboardingTaskCompletion)
 
+
+def _percentile(queryset, field, fraction, count):
+    # Wartość na pozycji percentyla wprost z bazy (ORDER BY + OFFSET), bez ładowania wszystkich wierszy
+    if not count:
+        return None
+    return queryset.order_by(field).values_list(field, flat=True)[int(round(fraction * (count - 1)))]
+
+
+@admin.register(LLMCallLog)
+class LLMCallLogAdmin(admin.ModelAdmin):
+    list_display = (
+        'created_at', 'model', 'generation_method', 'latency_ms', 'api_latency_ms', 'prompt_tokens',
+        'completion_tokens', 'http_status', 'retries', 'parse_path',
+    )
+    list_filter = ('model', 'generation_method', 'parse_path', 'http_status', 'created_at')
+    search_fields = ('role_name', 'prompt_hash', 'fallback_reason')
+    date_hierarchy = 'created_at'
+    readonly_fields = [field.name for field in LLMCallLog._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if changelist is not None:
+            response.context_data['model_stats'] = self.model_stats(changelist.queryset)
+        return response
+
+    def model_stats(self, queryset):
+        """p50/p95 opóźnienia i tokeny per model dla bieżących filtrów listy."""
+        stats = []
+        rows = queryset.order_by().values('model').annotate(
+            calls=Count('id'),
+            total_prompt_tokens=Sum('prompt_tokens'),
+            total_completion_tokens=Sum('completion_tokens'),
+            avg_completion_tokens=Avg('completion_tokens'),
+        ).order_by('model')
+        for row in rows:
+            calls = queryset.filter(model=row['model'])
+            row['p50_ms'] = _percentile(calls, 'latency_ms', 0.5, row['calls'])
+            row['p95_ms'] = _percentile(calls, 'latency_ms', 0.95, row['calls'])
+            stats.append(row)
+        return stats
@@ -0,0 +1,184 @@
+"""
+Eksport kolumnowy (Parquet / Arrow IPC) danych zadań i onboardingu dla analityków.
+
+Dane płyną prosto z kursora serwerowego (values_list().iterator()) i są zapisywane
+paczkami jako RecordBatch z typami kolumn (daty, czasy, liczby, bool), więc pliki
+są mniejsze od CSV i nie trzeba ich ponownie parsować.
+
+pyarrow jest zależnością opcjonalną - importujemy go dopiero przy eksporcie.
+"""
+from typing import Dict, Iterator, List, Tuple
+
+from webapp.models import OnboardingTask, ProjectMembership, ProjectTask
+
+BATCH_SIZE = 10000
+
+FORMATS = ('parquet', 'arrow')
+
+
+class ExportUnavailable(Exception):
+    """pyarrow nie jest zainstalowany."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise ExportUnavailable("Columnar export requires pyarrow (pip install pyarrow)") from exc
+    return pyarrow
+
+
+def filter_project_tasks(params, tasks=None):
+    """Filtry dashboardu statystyk (project, organizer, start_date, end_date) nałożone na ProjectTask."""
+    tasks = ProjectTask.objects.all() if tasks is None else tasks
+    if params.get('project'):
+        tasks = tasks.filter(project_id=params['project'])
+    if params.get('organizer'):
+        tasks = tasks.filter(assigned_to_id=params['organizer'])
+    if params.get('start_date'):
+        tasks = tasks.filter(date__gte=params['start_date'])
+    if params.get('end_date'):
+        tasks = tasks.filter(date__lte=params['end_date'])
+    return tasks
+
+
+def _filter_onboarding_tasks(params):
+    tasks = OnboardingTask.objects.all()
+    if params.get('project'):
+        tasks = tasks.filter(membership__project_id=params['project'])
+    if params.get('organizer'):
+        tasks = tasks.filter(assigned_to_id=params['organizer'])
+    if params.get('start_date'):
+        tasks = tasks.filter(created_at__date__gte=params['start_date'])
+    if params.get('end_date'):
+        tasks = tasks.filter(created_at__date__lte=params['end_date'])
+    return tasks
+
+
+def _filter_memberships(params):
+    memberships = ProjectMembership.objects.all()
+    if params.get('project'):
+        memberships = memberships.filter(project_id=params['project'])
+    if params.get('organizer'):
+        memberships = memberships.filter(user_id=params['organizer'])
+    if params.get('start_date'):
+        memberships = memberships.filter(added_at__date__gte=params['start_date'])
+    if params.get('end_date'):
+        memberships = memberships.filter(added_at__date__lte=params['end_date'])
+    return memberships
+
+
+# (nazwa kolumny, ścieżka pola dla values_list, typ arrow)
+DATASETS: Dict[str, Dict] = {
+    'tasks': {
+        'queryset': filter_project_tasks,
+        'columns': [
+            ('id', 'pk', 'int64'),
+            ('title', 'title', 'string'),
+            ('description', 'description', 'string'),
+            ('status', 'status', 'string'),
+            ('date', 'date', 'date'),
+            ('time', 'time', 'time'),
+            ('duration', 'duration', 'int64'),
+            ('project_id', 'project_id', 'int64'),
+            ('project', 'project__name', 'string'),
+            ('assigned_to_id', 'assigned_to_id', 'int64'),
+            ('assigned_to', 'assigned_to__username', 'string'),
+            ('created_at', 'created_at', 'timestamp'),
+        ],
+    },
+    'onboarding_tasks': {
+        'queryset': _filter_onboarding_tasks,
+        'columns': [
+            ('id', 'pk', 'int64'),
+            ('title', 'title', 'string'),
+            ('status', 'status', 'string'),
+            ('completed', 'completed', 'bool'),
+            ('completed_at', 'completed_at', 'timestamp'),
+            ('added_by_user', 'added_by_user', 'bool'),
+            ('template_id', 'template_id', 'int64'),
+            ('membership_id', 'membership_id', 'int64'),
+            ('project', 'membership__project__name', 'string'),
+            ('role', 'membership__role__name', 'string'),
+            ('assigned_to', 'assigned_to__username', 'string'),
+            ('created_at', 'created_at', 'timestamp'),
+        ],
+    },
+    'membership_progress': {
+        'queryset': _filter_memberships,
+        'columns': [
+            ('membership_id', 'pk', 'int64'),
+            ('username', 'user__username', 'string'),
+            ('project_id', 'project_id', 'int64'),
+            ('project', 'project__name', 'string'),
+            ('role', 'role__name', 'string'),
+            ('is_admin', 'is_admin', 'bool'),
+            ('total_tasks', 'total_tasks', 'int64'),
+            ('completed_tasks', 'completed_tasks', 'int64'),
+            ('added_at', 'added_at', 'timestamp'),
+            ('completed_at', 'completed_at', 'timestamp'),
+        ],
+    },
+}
+
+
+def _arrow_type(pa, name: str):
+    return {
+        'int64': pa.int64(),
+        'string': pa.string(),
+        'bool': pa.bool_(),
+        'date': pa.date32(),
+        'time': pa.time64('us'),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }[name]
+
+
+def _row_chunks(dataset: str, params, batch_size: int) -> Iterator[List[Tuple]]:
+    spec = DATASETS[dataset]
+    fields = [field for _, field, _ in spec['columns']]
+    rows = spec['queryset'](params).order_by('pk').values_list(*fields).iterator(chunk_size=batch_size)
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= batch_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_dataset(dataset: str, params, sink, file_format: str = 'parquet',
+                   batch_size: int = BATCH_SIZE, compression: str = 'zstd') -> int:
+    """
+    Zapisuje zbiór danych do sink (ścieżka lub obiekt plikowy) paczkami po batch_size wierszy.
+
+    Zwraca liczbę zapisanych wierszy. Filtry params są takie same jak w statistics_dashboard.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format: {file_format}")
+    pa = _pyarrow()
+
+    columns = DATASETS[dataset]['columns']
+    schema = pa.schema([(name, _arrow_type(pa, type_name)) for name, _, type_name in columns])
+    if file_format == 'parquet':
+        writer = pa.parquet.ParquetWriter(sink, schema, compression=compression)
+    else:
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        writer = pa.ipc.new_file(sink, schema, options=options)
+
+    written = 0
+    try:
+        for chunk in _row_chunks(dataset, params, batch_size):
+            arrays = [
+                pa.array(values, type=field.type)
+                for values, field in zip(zip(*chunk), schema)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            written += len(chunk)
+    finally:
+        writer.close()
+    return written
@@ -0,0 +1,26 @@
+"""
+Wersje grup kluczy cache trzymane w bazie (CacheVersion).
+
+Wersja jest częścią kluczy cache; nowa wersja sprawia, że stare wpisy przestają być
+adresowane i wygasają same. Wersja nie może leżeć w samym cache - domyślny LocMemCache
+jest osobny w każdym procesie, więc podbicie w jednym workerze nie unieważniałoby wpisów
+pozostałych. Nowa wersja to time.time_ns() (jak UserProfile.memberships_version), więc
+nie wraca do wartości, pod którą mogą jeszcze leżeć stare wpisy we współdzielonym cache.
+"""
+import time
+
+from webapp.models import CacheVersion
+
+
+def get_cache_version(key: str) -> int:
+    version = CacheVersion.objects.filter(key=key).values_list('version', flat=True).first()
+    if version is None:
+        version = CacheVersion.objects.get_or_create(key=key, defaults={'version': time.time_ns()})[0].version
+    return version
+
+
+def bump_cache_version(key: str):
+    """Ustawia nową wersję w bieżącej transakcji."""
+    version = time.time_ns()
+    if not CacheVersion.objects.filter(key=key).update(version=version):
+        CacheVersion.objects.get_or_create(key=key, defaults={'version': version})
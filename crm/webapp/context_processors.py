@@ -1,7 +1,23 @@
+from django.utils.functional import SimpleLazyObject
+
 from .models import UserProfile
 
+
+def get_user_profile(request):
+    """
+    Profil zalogowanego użytkownika z dołączoną rolą, ładowany raz na żądanie.
+    Kolejne wywołania (szablony, has_permission w widokach) nie robią już zapytań.
+    """
+    if not hasattr(request, '_cached_user_profile'):
+        profile = UserProfile.objects.select_related('role').filter(user=request.user).first()
+        if profile is None:
+            profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        request._cached_user_profile = profile
+    return request._cached_user_profile
+
+
 def user_profile(request):
     if request.user.is_authenticated:
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
-        return {'user_profile': profile}
-    return {}
\ No newline at end of file
+        # Leniwie - strony, które nie używają user_profile, nie płacą za zapytanie
+        return {'user_profile': SimpleLazyObject(lambda: get_user_profile(request))}
+    return {}
@@ -0,0 +1,221 @@
+"""
+Lokalny zamiennik Together AI (API zgodne z OpenAI) do testów obciążeniowych i opóźnień.
+
+Serwer obsługuje POST /v1/chat/completions (także stream=true jako SSE) i GET /v1/models.
+Opóźnienie odpowiedzi losowane jest z zadanego rozkładu, a część żądań można celowo
+zakończyć błędem 500 albo 429 (z nagłówkiem Retry-After). Treść odpowiedzi to plan
+z create_role_based_onboarding dla roli z promptu albo pliki odpowiedzi (string.Template:
+$role, $stack, $model), np. nagrany korpus test/llm_corpus.
+
+Po ustawieniu TOGETHER_API_URL=http://127.0.0.1:<port>/v1 cała ścieżka generowania
+(HTTP, timeouty, fallbacki, parser) działa offline.
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from typing import Callable, List, Optional
+
+DEFAULT_PORT = 8765
+DEFAULT_MODEL = 'meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo'
+STREAM_CHUNK_CHARS = 40
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Zamienia opis rozkładu opóźnienia (w ms) na funkcję zwracającą sekundy:
+    fixed:MS, uniform:MIN:MAX, normal:MEAN:STDDEV, lognormal:MEDIAN:SIGMA.
+    """
+    kind, _, params = spec.partition(':')
+    try:
+        values = [float(value) for value in params.split(':')] if params else []
+        if kind == 'fixed' and len(values) == 1:
+            return lambda rng: values[0] / 1000
+        if kind == 'uniform' and len(values) == 2:
+            return lambda rng: rng.uniform(*values) / 1000
+        if kind == 'normal' and len(values) == 2:
+            return lambda rng: max(0.0, rng.gauss(*values)) / 1000
+        if kind == 'lognormal' and len(values) == 2:
+            median, sigma = values
+            return lambda rng: median * rng.lognormvariate(0, sigma) / 1000
+    except ValueError:
+        pass
+    raise ValueError(f"Nieprawidłowy rozkład opóźnienia: {spec!r}")
+
+
+def _prompt_fields(messages: List[dict]) -> dict:
+    """Wyciąga rolę i stack z promptu użytkownika (format build_user_prompt)."""
+    prompt = '\n'.join(message.get('content', '') for message in messages if message.get('role') == 'user')
+    role = re.search(r'onboarding plan for: (.+)', prompt)
+    stack = re.search(r'Technology stack: (.*)', prompt)
+    return {
+        'role': role.group(1).strip() if role else 'Developer',
+        'stack': stack.group(1).strip() if stack else '',
+    }
+
+
+class FakeTogetherServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: str = 'fixed:0', error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: int = 1, responses: Optional[List[str]] = None, seed: Optional[int] = None,
+                 chunk_chars: int = STREAM_CHUNK_CHARS):
+        super().__init__(address, FakeTogetherHandler)
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.responses = responses or []
+        self.chunk_chars = chunk_chars
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'rate_limited': 0, 'streamed': 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def draw(self):
+        """Losuje (opóźnienie w s, wynik: 'ok' / 'error' / 'rate_limited') pod blokadą - Random nie jest wątkowo bezpieczny."""
+        with self.lock:
+            self.stats['requests'] += 1
+            delay = self.latency(self.rng)
+            roll = self.rng.random()
+            if roll < self.rate_limit_rate:
+                outcome = 'rate_limited'
+            elif roll < self.rate_limit_rate + self.error_rate:
+                outcome = 'error'
+            else:
+                outcome = 'ok'
+            if outcome != 'ok':
+                self.stats['errors' if outcome == 'error' else 'rate_limited'] += 1
+            template = self.rng.choice(self.responses) if self.responses else None
+        return delay, outcome, template
+
+    def completion_text(self, template: Optional[str], model: str, messages: List[dict]) -> str:
+        fields = {**_prompt_fields(messages), 'model': model}
+        if template is not None:
+            return Template(template).safe_substitute(fields)
+        from webapp.llm_service import create_role_based_onboarding
+        plan = create_role_based_onboarding(fields['role'], fields['stack'], [])
+        return json.dumps({'steps': plan['steps'], 'tasks': plan['tasks']}, ensure_ascii=False, indent=2)
+
+
+class FakeTogetherHandler(BaseHTTPRequestHandler):
+    server: FakeTogetherServer
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # bez logu dostępu - przy teście obciążeniowym zalewałby konsolę
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/v1/models':
+            self._send_json(200, {'object': 'list', 'data': [{'id': DEFAULT_MODEL, 'object': 'model'}]})
+        else:
+            self._send_error(404, 'not_found', f'Unknown path {self.path}')
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/v1/chat/completions':
+            self._send_error(404, 'not_found', f'Unknown path {self.path}')
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_error(400, 'invalid_request_error', 'Request body is not valid JSON')
+            return
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            self._send_error(401, 'authentication_error', 'Missing API key')
+            return
+
+        delay, outcome, template = self.server.draw()
+        time.sleep(delay)
+        if outcome == 'rate_limited':
+            self._send_error(429, 'rate_limit_exceeded', 'Rate limit exceeded',
+                             headers={'Retry-After': str(self.server.retry_after)})
+            return
+        if outcome == 'error':
+            self._send_error(500, 'server_error', 'Injected server error')
+            return
+
+        model = payload.get('model', DEFAULT_MODEL)
+        text = self.server.completion_text(template, model, payload.get('messages', []))
+        if payload.get('stream'):
+            self._stream(model, text)
+        else:
+            self._send_json(200, self._completion(model, text, payload.get('messages', [])))
+
+    def _completion(self, model, text, messages):
+        prompt_tokens = sum(len(message.get('content', '')) for message in messages) // 4
+        completion_tokens = len(text) // 4
+        return {
+            'id': f'chatcmpl-{uuid.uuid4().hex}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': text},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _stream(self, model, text):
+        with self.server.lock:
+            self.server.stats['streamed'] += 1
+        completion_id = f'chatcmpl-{uuid.uuid4().hex}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta, finish_reason=None):
+            chunk = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }
+            self.wfile.write(f'data: {json.dumps(chunk, ensure_ascii=False)}\n\n'.encode())
+
+        event({'role': 'assistant'})
+        step = max(1, self.server.chunk_chars)
+        for start in range(0, len(text), step):
+            event({'content': text[start:start + step]})
+            self.wfile.flush()
+        event({}, finish_reason='stop')
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.wfile.flush()
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, error_type, message, headers=None):
+        self._send_json(status, {'error': {'message': message, 'type': error_type}}, headers)
+
+
+def start_fake_together(host: str = '127.0.0.1', port: int = 0, **options) -> FakeTogetherServer:
+    """Uruchamia serwer w wątku w tle (port 0 = losowy wolny port); zatrzymanie: server.shutdown()."""
+    server = FakeTogetherServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
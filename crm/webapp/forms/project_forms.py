@@ -2,6 +2,19 @@ from django import forms
 from django.contrib.auth.models import User
 from webapp.models import Project, UserRole, ProjectRole, ProjectMembership
 
+
+def set_role_choices(form, roles):
+    """Show only the given (prefetched) project roles in the role dropdown, without querying."""
+    field = form.fields['role']
+    field.choices = [('', field.empty_label)] + [(role.pk, role.name) for role in roles]
+
+
+def use_shared_user_options(form, field_name):
+    """Render the user select without options; the page fills it from its one shared user list on focus."""
+    field = form.fields[field_name]
+    field.choices = [('', field.empty_label)] if field.empty_label is not None else []
+    field.widget.attrs['data-user-options'] = 'user-options'
+
 class ProjectForm(forms.ModelForm):
     class Meta:
         model = Project
@@ -22,7 +35,7 @@ class CreateRoleForm(forms.ModelForm):
 
 class AssignProjectRoleForm(forms.Form):
     user = forms.ModelChoiceField(queryset=User.objects.all())
-    role = forms.ModelChoiceField(queryset=ProjectRole.objects.all(), required=False)
+    role = forms.ModelChoiceField(queryset=ProjectRole.objects.select_related('project'), required=False)
 
 class AddMemberForm(forms.ModelForm):
     project_id = forms.IntegerField(widget=forms.HiddenInput())
@@ -34,9 +47,45 @@ class AddMemberForm(forms.ModelForm):
             'is_admin': 'Check this to make the user a project administrator (can generate onboarding, manage project settings)'
         }
 
+    def __init__(self, *args, project=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Z projektem akceptujemy tylko jego role
+        self.fields['role'].queryset = project.roles.all() if project else ProjectRole.objects.select_related('project')
+
 class CreateProjectRoleForm(forms.ModelForm):
     project_id = forms.IntegerField(widget=forms.HiddenInput())
 
     class Meta:
         model = ProjectRole
         fields = ['name', 'description']
+
+class BulkAddMembersForm(forms.Form):
+    project_id = forms.IntegerField(widget=forms.HiddenInput())
+    users = forms.ModelMultipleChoiceField(queryset=User.objects.all(), required=False)
+    role = forms.ModelChoiceField(queryset=ProjectRole.objects.select_related('project'), required=False)
+    is_admin = forms.BooleanField(required=False)
+    csv_file = forms.FileField(
+        required=False,
+        help_text="Plik CSV z kolumną 'username' lub 'email' oraz opcjonalnymi kolumnami 'role' i 'is_admin'"
+    )
+
+    def __init__(self, *args, project=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if project:
+            self.fields['role'].queryset = project.roles.all()
+
+    def clean_csv_file(self):
+        """Dekoduje przesłany plik CSV; cleaned_data['csv_file'] zawiera jego treść (lub None)."""
+        csv_file = self.cleaned_data.get('csv_file')
+        if not csv_file:
+            return None
+        try:
+            return csv_file.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise forms.ValidationError("Plik CSV musi być zakodowany w UTF-8.")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if 'csv_file' not in self.errors and not cleaned_data.get('users') and not cleaned_data.get('csv_file'):
+            raise forms.ValidationError("Wybierz użytkowników lub prześlij plik CSV.")
+        return cleaned_data
@@ -0,0 +1,113 @@
+"""
+Zapis LLMCallLog poza ścieżką żądania.
+
+record_llm_call() wrzuca wpis do kolejki, a wątek w tle zapisuje je zbiorczo
+(bulk_create) co LLM_CALL_LOG_FLUSH_SIZE wpisów albo co LLM_CALL_LOG_FLUSH_INTERVAL
+sekund. Przy LLM_CALL_LOG_ASYNC = False wpis zapisuje się od razu (testy, komendy).
+Błąd zapisu logu nigdy nie przerywa generowania - wpis jest wtedy tracony z ostrzeżeniem.
+"""
+import atexit
+import logging
+import queue
+import threading
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SIZE = 50
+FLUSH_INTERVAL = 5.0
+MAX_QUEUE = 10000
+
+
+def _bulk_write(entries: List[Dict]):
+    from webapp.models import LLMCallLog
+
+    try:
+        LLMCallLog.objects.bulk_create([LLMCallLog(**entry) for entry in entries])
+    finally:
+        connections.close_all()  # połączenia są per wątek; nie trzymamy ich między partiami
+
+
+class LLMCallLogWriter:
+    def __init__(self, write: Callable[[List[Dict]], None] = _bulk_write, flush_size: int = FLUSH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL, max_queue: int = MAX_QUEUE):
+        self.write = write
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    def submit(self, entry: Dict):
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            logger.warning("LLM call log queue full, dropping entry")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Zapisuje wszystko, co jest w kolejce; zwraca False, jeśli wątek nie zdążył."""
+        if self.thread is None or not self.thread.is_alive():
+            return True
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def _ensure_started(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='llm-call-log-writer', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        batch = []
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, threading.Event):
+                self._write(batch)
+                batch = []
+                item.set()
+                continue
+            if item is not None:
+                batch.append(item)
+            if batch and (item is None or len(batch) >= self.flush_size):
+                self._write(batch)
+                batch = []
+
+    def _write(self, batch: List[Dict]):
+        if not batch:
+            return
+        try:
+            self.write(batch)
+        except Exception as e:
+            logger.warning(f"Failed to write {len(batch)} LLM call log entries: {e}", exc_info=True)
+
+
+writer = LLMCallLogWriter(
+    flush_size=getattr(settings, 'LLM_CALL_LOG_FLUSH_SIZE', FLUSH_SIZE),
+    flush_interval=getattr(settings, 'LLM_CALL_LOG_FLUSH_INTERVAL', FLUSH_INTERVAL),
+)
+atexit.register(writer.flush)
+
+
+def record_llm_call(**fields):
+    """Zapisuje wywołanie LLM (pola LLMCallLog) - asynchronicznie albo od razu, zależnie od ustawień."""
+    if not getattr(settings, 'LLM_CALL_LOG_ENABLED', True):
+        return
+    if getattr(settings, 'LLM_CALL_LOG_ASYNC', True):
+        writer.submit(fields)
+        return
+    from webapp.models import LLMCallLog
+
+    try:
+        with transaction.atomic():
+            LLMCallLog.objects.create(**fields)
+    except Exception as e:
+        logger.warning(f"Failed to write LLM call log entry: {e}", exc_info=True)
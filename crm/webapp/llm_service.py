@@ -5,11 +5,16 @@ Wykorzystuje Together AI API
 import json
 import hashlib
 import logging
+import time
+import tracemalloc
 import requests
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 from django.conf import settings
 from django.utils import timezone
 
+from webapp.llm_call_log import record_llm_call
+
 logger = logging.getLogger(__name__)
 
 
@@ -586,6 +591,7 @@ REQUIREMENTS:
 - Create 8-12 detailed steps (not just 3-4)
 - Each step should cover a specific domain/area
 - Include 2-4 tasks per step
+- Give every task an id ("T1", "T2", ...); depends_on lists ids of tasks that must be finished first (no cycles)
 - Make steps comprehensive and thorough
 - Cover: Environment Setup, Development Tools, Project Architecture, Database, Testing, CI/CD, Documentation, etc.
 
@@ -595,7 +601,8 @@ Format:
     {"id": "S1", "title": "Environment Setup", "order": 1, "description": "Set up development environment and tools"}
   ],
   "tasks": [
-    {"step_id": "S1", "title": "Install tools", "is_required": true, "description": "Install Docker and IDE", "acceptance_criteria": ["Tools installed"], "estimated_time_hours": 2.0, "depends_on": []}
+    {"id": "T1", "step_id": "S1", "title": "Install tools", "is_required": true, "description": "Install Docker and IDE", "acceptance_criteria": ["Tools installed"], "estimated_time_hours": 2.0, "depends_on": []},
+    {"id": "T2", "step_id": "S1", "title": "Run the project locally", "is_required": true, "description": "Start the app with Docker", "acceptance_criteria": ["App running"], "estimated_time_hours": 1.0, "depends_on": ["T1"]}
   ]
 }
 
@@ -635,9 +642,34 @@ def calculate_prompt_hash(system_prompt: str, user_prompt: str) -> str:
     return hashlib.sha256(combined.encode()).hexdigest()
 
 
-def parse_llm_output(raw_output: str, role_name: str = "Developer") -> Dict[str, Any]:
+@contextmanager
+def _parse_stage(stats: Optional[Dict[str, Any]], name: str):
+    """Mierzy czas (i alokacje, jeśli działa tracemalloc) etapu parsowania do słownika stats."""
+    if stats is None:
+        yield
+        return
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.setdefault('stages', []).append(name)
+        timings = stats.setdefault('timings', {})
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+        if tracing:
+            allocations = stats.setdefault('allocations', {})
+            allocations[name] = max(allocations.get(name, 0), tracemalloc.get_traced_memory()[1] - start_memory)
+
+
+def parse_llm_output(raw_output: str, role_name: str = "Developer", stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Parsuje output z LLM i waliduje strukturę JSON.
+
+    Opcjonalny słownik stats dostaje listę wykonanych etapów ('stages'), ich czasy ('timings'),
+    alokacje przy włączonym tracemalloc ('allocations') oraz etap, który dał wynik ('repair_path').
     """
     try:
         # Clean up the output first
@@ -650,6 +682,8 @@ def parse_llm_output(raw_output: str, role_name: str = "Developer") -> Dict[str,
         json_start = raw_output.find('{')
         json_end = raw_output.rfind('}') + 1
         
+        if stats is not None:
+            stats.update(repair_path='direct', stages=[], timings={})
         if json_start == -1 or json_end == 0:
             logger.warning("No JSON braces found, trying alternative extraction")
             # Try to fix common JSON issues
@@ -659,6 +693,8 @@ def parse_llm_output(raw_output: str, role_name: str = "Developer") -> Dict[str,
                 # Find the last } and add it if missing
                 if json_str.rfind('}') == -1:
                     json_str = json_str[:json_str.rfind(']') + 1] + '}'
+                if stats is not None:
+                    stats['repair_path'] = 'missing_braces'
             else:
                 logger.error(f"No JSON structure found in LLM output: {raw_output[:500]}...")
                 raise ValueError("No JSON found in LLM output")
@@ -669,7 +705,8 @@ def parse_llm_output(raw_output: str, role_name: str = "Developer") -> Dict[str,
         
         # Try to parse JSON first without any fixes
         try:
-            data = json.loads(json_str)
+            with _parse_stage(stats, 'direct'):
+                data = json.loads(json_str)
             logger.info(f"JSON parsed successfully without fixes: {len(data.get('steps', []))} steps, {len(data.get('tasks', []))} tasks")
             
             # Fix boolean values in tasks
@@ -686,10 +723,13 @@ def parse_llm_output(raw_output: str, role_name: str = "Developer") -> Dict[str,
                 # Use the original JSON string for repair, not the broken one
                 logger.info("Attempting aggressive JSON repair...")
                 logger.debug(f"JSON to repair: {raw_output[json_start:json_end][:300]}...")
-                repaired_json = aggressive_json_repair(raw_output[json_start:json_end])
+                with _parse_stage(stats, 'aggressive_json_repair'):
+                    repaired_json = aggressive_json_repair(raw_output[json_start:json_end])
+                    data = json.loads(repaired_json)
                 logger.info(f"Repaired JSON length: {len(repaired_json)} chars")
                 logger.debug(f"Repaired JSON: {repaired_json[:300]}...")
-                data = json.loads(repaired_json)
+                if stats is not None:
+                    stats['repair_path'] = 'aggressive_json_repair'
                 logger.info(f"JSON repaired successfully: {len(data.get('steps', []))} steps, {len(data.get('tasks', []))} tasks")
             except Exception as repair_error:
                 logger.error(f"JSON repair failed: {repair_error}")
@@ -698,8 +738,11 @@ def parse_llm_output(raw_output: str, role_name: str = "Developer") -> Dict[str,
                 
                 # Try to fix common JSON issues as fallback
                 try:
-                    json_str = fix_json_syntax(raw_output[json_start:json_end])
-                    data = json.loads(json_str)
+                    with _parse_stage(stats, 'fix_json_syntax'):
+                        json_str = fix_json_syntax(raw_output[json_start:json_end])
+                        data = json.loads(json_str)
+                    if stats is not None:
+                        stats['repair_path'] = 'fix_json_syntax'
                     logger.info("JSON parsed successfully after fixes")
                 except json.JSONDecodeError as e2:
                     logger.error(f"JSON fixes also failed: {e2}")
@@ -707,7 +750,10 @@ def parse_llm_output(raw_output: str, role_name: str = "Developer") -> Dict[str,
                     # Try one more approach - extract and parse steps and tasks separately
                     try:
                         logger.info("Attempting separate extraction of steps and tasks")
-                        data = extract_steps_and_tasks_separately(raw_output[json_start:json_end])
+                        with _parse_stage(stats, 'separate_extraction'):
+                            data = extract_steps_and_tasks_separately(raw_output[json_start:json_end])
+                        if stats is not None:
+                            stats['repair_path'] = 'separate_extraction'
                         logger.info("Separate extraction successful")
                     except Exception as separate_error:
                         logger.error(f"Separate extraction also failed: {separate_error}")
@@ -740,11 +786,17 @@ def parse_llm_output(raw_output: str, role_name: str = "Developer") -> Dict[str,
         logger.error(f"Błąd parsowania JSON: {e}\nOutput: {raw_output[:500]}")
         # Fallback: create basic structure
         logger.info("Using fallback structure")
+        if stats is not None:
+            stats['repair_path'] = 'fallback'
+            stats['error'] = str(e)
         return create_fallback_structure(role_name)
     except Exception as e:
         logger.error(f"Błąd walidacji outputu LLM: {e}", exc_info=True)
         # Fallback: create basic structure
         logger.info("Using fallback structure due to error")
+        if stats is not None:
+            stats['repair_path'] = 'fallback'
+            stats['error'] = str(e)
         return create_fallback_structure(role_name)
 
 
@@ -1095,6 +1147,25 @@ def create_fallback_structure(role_name: str, project_stack: str = "", documenta
     return create_role_based_onboarding(role_name, project_stack or "Software Development", documentation_chunks or [])
 
 
+def _log_llm_call(started: float, model: str, generation_method: str, role_name: str, prompt_hash: str,
+                  call_info: Dict[str, Any], parse_path: str = "", fallback_reason: str = ""):
+    """Przekazuje wynik generowania do LLMCallLog (zapis w tle, patrz webapp.llm_call_log)."""
+    record_llm_call(
+        model=model[:100],
+        generation_method=generation_method,
+        role_name=role_name[:100],
+        prompt_hash=prompt_hash,
+        prompt_tokens=call_info.get('prompt_tokens'),
+        completion_tokens=call_info.get('completion_tokens'),
+        latency_ms=int((time.perf_counter() - started) * 1000),
+        api_latency_ms=call_info.get('api_latency_ms'),
+        http_status=call_info.get('http_status'),
+        retries=call_info.get('retries', 0),
+        parse_path=parse_path,
+        fallback_reason=fallback_reason[:2000],
+    )
+
+
 def generate_onboarding_draft(
     role_name: str,
     project_stack: str,
@@ -1123,6 +1194,9 @@ def generate_onboarding_draft(
         prompt_hash = calculate_prompt_hash(system_prompt, user_prompt)
         
         logger.info(f"Generowanie onboardingu dla roli: {role_name} z LLM")
+        started = time.perf_counter()
+        call_info = {}
+        fallback_reason = ""
         
         # Multi-tier LLM generation strategy
         try:
@@ -1140,13 +1214,14 @@ def generate_onboarding_draft(
                     model_name_used = getattr(settings, 'TOGETHER_MODEL', 'meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo')
                     logger.info(f"Attempting Together AI with {model_name_used}")
                     
-                    raw_output = generate_with_together(system_prompt, user_prompt, model_name_used)
+                    raw_output = generate_with_together(system_prompt, user_prompt, model_name_used, call_info=call_info)
                     generation_method = "together_ai"
                     logger.info("✅ Together AI succeeded!")
                     
                 except Exception as together_error:
                     logger.warning(f"Together AI failed: {together_error}")
                     logger.info("Falling back to next tier...")
+                    fallback_reason = f"Together AI: {together_error}"
                     raw_output = None
             
             # TIER 2: Use template-based fallback (most reliable fallback)
@@ -1169,11 +1244,19 @@ def generate_onboarding_draft(
             logger.debug(f"LLM raw output: {raw_output[:500]}...")  # Log first 500 chars
             
             # Parse LLM output
-            parsed_data = parse_llm_output(raw_output, role_name)
+            parse_stats = {}
+            parsed_data = parse_llm_output(raw_output, role_name, stats=parse_stats)
+            if parse_stats.get('repair_path') == 'fallback':
+                fallback_reason = f"Parse: {parse_stats.get('error', '')}"
             
             # Validate and fix
             parsed_data = validate_and_fix_draft(parsed_data)
             
+            _log_llm_call(
+                started, model_name_used, generation_method, role_name, prompt_hash, call_info,
+                parse_path=parse_stats.get('repair_path', ''), fallback_reason=fallback_reason,
+            )
+            
             return {
                 'success': True,
                 'data': parsed_data,
@@ -1192,6 +1275,10 @@ def generate_onboarding_draft(
             logger.warning(f"LLM generation failed: {llm_error}, falling back to template-based", exc_info=True)
             # Fallback to template-based if LLM fails
             parsed_data = create_fallback_structure(role_name, project_stack, documentation_chunks)
+            _log_llm_call(
+                started, 'template-based-fallback', 'error_fallback', role_name, prompt_hash, call_info,
+                fallback_reason=str(llm_error),
+            )
             
             return {
                 'success': True,
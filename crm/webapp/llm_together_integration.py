@@ -11,6 +11,7 @@ Advantages:
 """
 
 import logging
+import time
 import requests
 from typing import Dict, Any, Optional
 from django.conf import settings
@@ -18,10 +19,25 @@ from django.conf import settings
 logger = logging.getLogger(__name__)
 
 
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_DELAY = 30.0
+
+
+def _retry_delay(response: Optional[requests.Response], attempt: int) -> float:
+    """Opóźnienie przed ponowieniem: Retry-After z odpowiedzi albo wykładniczy backoff."""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    try:
+        delay = float(retry_after)
+    except (TypeError, ValueError):
+        delay = getattr(settings, 'TOGETHER_RETRY_BACKOFF', 1.0) * 2 ** attempt
+    return min(delay, MAX_RETRY_DELAY)
+
+
 def generate_with_together(
     system_prompt: str,
     user_prompt: str,
-    model: str = "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo"
+    model: str = "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo",
+    call_info: Optional[Dict[str, Any]] = None
 ) -> str:
     """
     Generate text using Together AI API
@@ -30,6 +46,8 @@ def generate_with_together(
         system_prompt: System instruction for the model
         user_prompt: User's actual prompt
         model: Together AI model to use (default: Llama 3.1 8B Turbo)
+        call_info: Optional dict filled with http_status, api_latency_ms, retries,
+            prompt_tokens and completion_tokens (also when the call fails)
     
     Returns:
         Generated text
@@ -42,7 +60,8 @@ def generate_with_together(
     if not api_key:
         raise ValueError("TOGETHER_API_KEY not configured")
     
-    url = "https://api.together.xyz/v1/chat/completions"
+    base_url = getattr(settings, 'TOGETHER_API_URL', 'https://api.together.xyz/v1')
+    url = f"{base_url.rstrip('/')}/chat/completions"
     
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -62,11 +81,31 @@ def generate_with_together(
         "stop": ["<|eot_id|>", "<|end_of_text|>"],  # Llama stop tokens
     }
     
+    info = call_info if call_info is not None else {}
+    info.update(retries=0, http_status=None)
+    max_retries = getattr(settings, 'TOGETHER_MAX_RETRIES', 0)
+    started = time.perf_counter()
+    
     try:
         logger.info(f"Calling Together AI with model: {model}")
         logger.info(f"System prompt: {len(system_prompt)} chars, User prompt: {len(user_prompt)} chars")
         
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
+        # Ponawiamy tylko 429, 5xx i błędy połączenia (domyślnie TOGETHER_MAX_RETRIES = 0)
+        for attempt in range(max_retries + 1):
+            response = None
+            try:
+                response = requests.post(url, headers=headers, json=payload, timeout=getattr(settings, 'TOGETHER_TIMEOUT', 60))
+                info['http_status'] = response.status_code
+                if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+                    break
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == max_retries:
+                    raise
+            delay = _retry_delay(response, attempt)
+            logger.warning(f"Together AI attempt {attempt + 1} failed, retrying in {delay:.1f}s")
+            info['retries'] = attempt + 1
+            time.sleep(delay)
+        
         response.raise_for_status()
         
         result = response.json()
@@ -77,6 +116,8 @@ def generate_with_together(
         # Log usage
         if 'usage' in result:
             usage = result['usage']
+            info['prompt_tokens'] = usage.get('prompt_tokens')
+            info['completion_tokens'] = usage.get('completion_tokens')
             logger.info(
                 f"Together AI tokens: {usage.get('prompt_tokens', 0)} input, "
                 f"{usage.get('completion_tokens', 0)} output, "
@@ -93,6 +134,8 @@ def generate_with_together(
     except Exception as e:
         logger.error(f"Together AI error: {e}")
         raise
+    finally:
+        info['api_latency_ms'] = int((time.perf_counter() - started) * 1000)
 
 
 # Rekomendowane modele dla różnych use cases
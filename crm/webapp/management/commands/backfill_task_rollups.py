@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from webapp.task_rollups import BATCH_SIZE, rebuild_daily_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild daily project task rollups from raw tasks (optionally for one project or date range)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help="Project ID")
+        parser.add_argument('--start-date', help="YYYY-MM-DD")
+        parser.add_argument('--end-date', help="YYYY-MM-DD")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        written = rebuild_daily_rollups(
+            project_id=options['project'],
+            start_date=options['start_date'],
+            end_date=options['end_date'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} daily rollup rows"))
@@ -0,0 +1,175 @@
+import copy
+import json
+import logging
+import statistics
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from webapp.llm_service import parse_llm_output, validate_and_fix_draft
+
+# Nagrane surowe odpowiedzi LLM oraz przykładowy plan w formie prozy (bez JSON)
+DEFAULT_CORPUS = [
+    settings.BASE_DIR.parent / 'test' / 'llm_corpus',
+    settings.BASE_DIR.parent / 'test' / 'onboarding_plan_backend_developer.txt',
+]
+# Oczekiwane liczby kroków i zadań plików z katalogu: {"plik": {"steps": 3, "tasks": 5}}
+EXPECTED_FILE = 'expected.json'
+
+
+class Command(BaseCommand):
+    help = "Replay recorded LLM outputs through parse_llm_output and validate_and_fix_draft and write a JSON report"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help="Corpus files or directories (default: test/llm_corpus and the sample plan)")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed runs per file")
+        parser.add_argument('--role', default='Backend Developer')
+        parser.add_argument('--no-allocations', action='store_true', help="Skip the tracemalloc pass")
+        parser.add_argument('--verbose-logging', action='store_true', help="Keep parser logging enabled while timing")
+        parser.add_argument('--output', default='benchmark_llm_parser.json')
+
+    def handle(self, *args, **options):
+        files = self._corpus_files(options['paths'] or DEFAULT_CORPUS)
+        if not files:
+            raise CommandError("No corpus files found")
+
+        # Parser loguje każdy etap; przy pomiarze czasu mierzylibyśmy głównie logging
+        if not options['verbose_logging']:
+            logging.disable(logging.CRITICAL)
+        try:
+            results = [self._benchmark_file(path, options) for path in files]
+        finally:
+            logging.disable(logging.NOTSET)
+
+        recovered = [result for result in results if result['success']]
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'commit': self._git_commit(),
+            'repeat': options['repeat'],
+            'files': len(results),
+            'success_rate': len(recovered) / len(results),
+            # Suma odczytanych i oczekiwanych kroków/zadań w plikach z oczekiwanymi liczbami
+            'recovered': {
+                kind: sum(result[kind] for result in results if result['expected']) for kind in ('steps', 'tasks')
+            },
+            'expected': {
+                kind: sum(result['expected'][kind] for result in results if result['expected'])
+                for kind in ('steps', 'tasks')
+            },
+            'repair_paths': {
+                path: sum(1 for result in results if result['repair_path'] == path)
+                for path in dict.fromkeys(result['repair_path'] for result in results)
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as handle:
+            json.dump(report, handle, indent=2)
+
+        for result in results:
+            expected = result['expected'] or {'steps': '?', 'tasks': '?'}
+            self.stdout.write(
+                f"{result['file']}: {result['repair_path']}, {'ok' if result['success'] else 'FAILED'}, "
+                f"{result['steps']}/{expected['steps']} steps, {result['tasks']}/{expected['tasks']} tasks, "
+                f"parse median {result['parse_median_ms']:.2f} ms, validate median {result['validate_median_ms']:.3f} ms"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Success rate {report['success_rate']:.0%} ({len(recovered)}/{len(results)}); "
+            f"report written to {options['output']}"
+        ))
+
+    def _corpus_files(self, paths):
+        files = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                files += sorted(child for child in path.iterdir() if child.is_file() and child.name != EXPECTED_FILE)
+            elif path.is_file():
+                files.append(path)
+        return files
+
+    def _expected(self, path):
+        """Oczekiwane {'steps': n, 'tasks': n} z pliku EXPECTED_FILE obok pliku korpusu (albo None)."""
+        manifest = path.parent / EXPECTED_FILE
+        if not manifest.is_file():
+            return None
+        return json.loads(manifest.read_text(encoding='utf-8')).get(path.name)
+
+    def _success(self, repair_path, steps, tasks, expected):
+        # Fallback to szablon, nie odczytany plan; bez oczekiwanych liczb wymagamy choć kroków i zadań
+        if repair_path == 'fallback':
+            return False
+        if expected is None:
+            return steps > 0 and tasks > 0
+        return steps == expected['steps'] and tasks == expected['tasks']
+
+    def _benchmark_file(self, path, options):
+        raw = path.read_text(encoding='utf-8')
+        parse_times, validate_times, stage_times = [], [], {}
+
+        for _ in range(max(1, options['repeat'])):
+            stats = {}
+            started = time.perf_counter()
+            data = parse_llm_output(raw, options['role'], stats=stats)
+            parse_times.append((time.perf_counter() - started) * 1000)
+
+            draft = copy.deepcopy(data)  # walidacja modyfikuje dane w miejscu
+            started = time.perf_counter()
+            validate_and_fix_draft(draft)
+            validate_times.append((time.perf_counter() - started) * 1000)
+
+            for stage, seconds in stats['timings'].items():
+                stage_times.setdefault(stage, []).append(seconds * 1000)
+
+        steps, tasks = len(data.get('steps', [])), len(data.get('tasks', []))
+        expected = self._expected(path)
+        result = {
+            'file': path.name,
+            'bytes': len(raw.encode('utf-8')),
+            'repair_path': stats['repair_path'],
+            'stages': stats['stages'],
+            'steps': steps,
+            'tasks': tasks,
+            'expected': expected,
+            'success': self._success(stats['repair_path'], steps, tasks, expected),
+            'parse_median_ms': statistics.median(parse_times),
+            'parse_max_ms': max(parse_times),
+            'validate_median_ms': statistics.median(validate_times),
+            'stage_median_ms': {stage: statistics.median(times) for stage, times in stage_times.items()},
+        }
+        if 'error' in stats:
+            result['error'] = stats['error']
+        if not options['no_allocations']:
+            result.update(self._allocations(raw, options['role']))
+        return result
+
+    def _allocations(self, raw, role):
+        # Osobny przebieg - tracemalloc spowalnia kod kilkukrotnie, więc nie mieszamy go z pomiarem czasu
+        tracemalloc.start()
+        try:
+            stats = {}
+            baseline = tracemalloc.get_traced_memory()[0]
+            data = parse_llm_output(raw, role, stats=stats)
+            parse_peak = tracemalloc.get_traced_memory()[1] - baseline
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            validate_and_fix_draft(data)
+            validate_peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            tracemalloc.stop()
+        return {
+            'parse_peak_bytes': parse_peak,
+            'validate_peak_bytes': validate_peak,
+            'stage_peak_bytes': stats.get('allocations', {}),
+        }
+
+    def _git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
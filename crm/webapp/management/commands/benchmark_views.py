@@ -0,0 +1,167 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from webapp import urls
+from webapp.models import Contact, ProjectMembership, ProjectTask
+from webapp.seeding import scaled_volumes, seed_dataset
+
+# Widoki, które zmieniają stan przy GET, wylogowują albo wołają zewnętrzne API
+DEFAULT_EXCLUDE = [
+    'user-logout',
+    'artist_search_url',
+    'llm_onboarding_generate_sync',
+    'mark_task_complete',
+    'mark_task_in_progress',
+    'reset_task_to_do',
+    'restart_onboarding',
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Time every GET view in webapp.urls at several data sizes and write a JSON report"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1,5,20', help="Comma-separated seed scale factors")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed requests per view")
+        parser.add_argument('--warmup', type=int, default=1, help="Untimed requests per view")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--only', action='append', help="Benchmark only this URL name (repeatable)")
+        parser.add_argument('--exclude', action='append', default=[], help="Skip this URL name (repeatable)")
+        parser.add_argument('--output', default='benchmark_views.json')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        exclude = set(DEFAULT_EXCLUDE) | set(options['exclude'])
+        names = [
+            pattern.name for pattern in urls.urlpatterns
+            if isinstance(pattern, URLPattern) and pattern.name and pattern.name not in exclude
+        ]
+        if options['only']:
+            names = [name for name in names if name in options['only']]
+        names = list(dict.fromkeys(names))
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'commit': self._git_commit(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'seed': options['seed'],
+            'results': [],
+        }
+
+        # Test client wymaga 'testserver' w ALLOWED_HOSTS i lokalnego backendu e-mail
+        try:
+            setup_test_environment()
+            owns_environment = True
+        except RuntimeError:
+            owns_environment = False  # już ustawione (np. wywołanie z testów)
+        try:
+            for size in sizes:
+                self.stdout.write(f"Scale {size}:")
+                report['results'].append(self._run_size(size, names, options))
+        finally:
+            if owns_environment:
+                teardown_test_environment()
+
+        with open(options['output'], 'w') as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def _run_size(self, size, names, options):
+        # Każdy rozmiar w osobnej transakcji wycofywanej na końcu - baza zostaje czysta
+        volumes = scaled_volumes(size)
+        result = {'scale': size, 'volumes': volumes, 'views': {}}
+        try:
+            with transaction.atomic():
+                admin = User.objects.create_superuser('benchmark_admin', 'benchmark@example.com', 'benchmark')
+                seed_dataset(volumes, prefix=f'bench{size}', seed=options['seed'], admin=admin)
+                client = Client()
+                client.force_login(admin)
+                args = self._url_arguments(admin)
+
+                for name in names:
+                    try:
+                        with transaction.atomic():
+                            timing = self._time_view(client, name, args, options)
+                    except Exception as exc:
+                        timing = {'skipped': f"{type(exc).__name__}: {exc}"}
+                    result['views'][name] = timing
+                    if 'skipped' in timing:
+                        self.stdout.write(f"  {name}: skipped ({timing['skipped']})")
+                    else:
+                        self.stdout.write(
+                            f"  {name}: median {timing['median_ms']:.1f} ms, "
+                            f"p95 {timing['p95_ms']:.1f} ms, {timing['queries']} queries"
+                        )
+                raise _Rollback
+        except _Rollback:
+            pass
+        return result
+
+    def _url_arguments(self, admin):
+        membership = ProjectMembership.objects.filter(user=admin).order_by('pk').first()
+        task = ProjectTask.objects.order_by('pk').first()
+        contact = Contact.objects.order_by('pk').first()
+        return {
+            'project_id': membership.project_id if membership else None,
+            'membership_id': membership.pk if membership else None,
+            'task_id': task.pk if task else None,
+            'pk': contact.pk if contact else None,
+            'dataset': 'tasks',
+        }
+
+    def _time_view(self, client, name, args, options):
+        pattern = next(p for p in urls.urlpatterns if getattr(p, 'name', None) == name)
+        kwargs = {}
+        for param in pattern.pattern.regex.groupindex:
+            if args.get(param) is None:
+                return {'skipped': f"no value for <{param}>"}
+            kwargs[param] = args[param]
+        url = reverse(name, kwargs=kwargs or None)
+
+        for _ in range(options['warmup']):
+            client.get(url)
+        timings = []
+        for _ in range(options['repeat']):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            return {'skipped': f"HTTP {response.status_code}"}
+
+        timings.sort()
+        return {
+            'url': url,
+            'status': response.status_code,
+            'queries': len(queries),
+            'min_ms': timings[0],
+            'median_ms': statistics.median(timings),
+            'p95_ms': timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))],
+        }
+
+    def _git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
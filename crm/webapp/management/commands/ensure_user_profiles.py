@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from webapp.user_service import BATCH_SIZE, ensure_user_profiles
+
+
+class Command(BaseCommand):
+    help = "Create missing user profiles in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        created = ensure_user_profiles(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Created {created} missing user profiles"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from webapp.analytics_export import BATCH_SIZE, DATASETS, FORMATS, ExportUnavailable, export_dataset
+
+
+class Command(BaseCommand):
+    help = "Export tasks, onboarding tasks or membership progress as a Parquet/Arrow file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument('output', help="Output file path")
+        parser.add_argument('--format', choices=FORMATS, default='parquet')
+        parser.add_argument('--compression', default='zstd')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Rows per record batch")
+        parser.add_argument('--project', type=int)
+        parser.add_argument('--organizer', type=int, help="User ID")
+        parser.add_argument('--start-date', help="YYYY-MM-DD")
+        parser.add_argument('--end-date', help="YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        filters = {
+            key: options[key]
+            for key in ('project', 'organizer', 'start_date', 'end_date')
+            if options[key]
+        }
+        try:
+            written = export_dataset(
+                options['dataset'], filters, options['output'],
+                file_format=options['format'],
+                batch_size=options['batch_size'],
+                compression=options['compression'],
+            )
+        except ExportUnavailable as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rows to {options['output']}"))
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from webapp.fake_together import DEFAULT_PORT, STREAM_CHUNK_CHARS, FakeTogetherServer, parse_latency
+
+
+class Command(BaseCommand):
+    help = "Run a local OpenAI-compatible stand-in for the Together AI API (point TOGETHER_API_URL at it)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+        parser.add_argument(
+            '--latency', default='lognormal:2500:0.4',
+            help="Latency distribution in ms: fixed:MS, uniform:MIN:MAX, normal:MEAN:STDDEV, lognormal:MEDIAN:SIGMA",
+        )
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Fraction of requests answered with HTTP 429")
+        parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with 429 responses")
+        parser.add_argument(
+            '--response', action='append', default=[],
+            help="Response file or directory of files ($role, $stack, $model are substituted); "
+                 "default is the role-based template plan",
+        )
+        parser.add_argument('--chunk-chars', type=int, default=STREAM_CHUNK_CHARS, help="Characters per streamed chunk")
+        parser.add_argument('--seed', type=int, help="Seed for latency and failure injection")
+
+    def handle(self, *args, **options):
+        try:
+            parse_latency(options['latency'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        if options['error_rate'] + options['rate_limit_rate'] > 1:
+            raise CommandError("--error-rate and --rate-limit-rate must add up to at most 1")
+
+        responses = []
+        for path in map(Path, options['response']):
+            files = sorted(child for child in path.iterdir() if child.is_file()) if path.is_dir() else [path]
+            try:
+                responses += [file.read_text(encoding='utf-8') for file in files]
+            except OSError as exc:
+                raise CommandError(f"Cannot read response file: {exc}")
+
+        server = FakeTogetherServer(
+            (options['host'], options['port']),
+            latency=options['latency'],
+            error_rate=options['error_rate'],
+            rate_limit_rate=options['rate_limit_rate'],
+            retry_after=options['retry_after'],
+            responses=responses,
+            seed=options['seed'],
+            chunk_chars=options['chunk_chars'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake Together AI listening on {server.base_url} "
+            f"(latency {options['latency']}, errors {options['error_rate']:.0%}, 429 {options['rate_limit_rate']:.0%}, "
+            f"{len(responses) or 'template'} responses)"
+        ))
+        self.stdout.write(f"Set TOGETHER_API_URL={server.base_url} and any TOGETHER_API_KEY to use it")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(
+                "Served {requests} requests ({errors} errors, {rate_limited} rate limited, {streamed} streamed)".format(
+                    **server.stats
+                )
+            )
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from webapp.models import Project, ProjectRole
+from webapp.onboarding_service import BATCH_SIZE, bulk_add_members, read_member_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import project members from CSV and assign their onboarding tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('csv_path', help="CSV with a 'username' or 'email' column and optional 'role', 'is_admin'")
+        parser.add_argument('--role', help="Default role name for rows without a role")
+        parser.add_argument('--admin', action='store_true', help="Make every imported member a project admin")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(pk=options['project_id'])
+        except Project.DoesNotExist:
+            raise CommandError(f"Project {options['project_id']} does not exist")
+
+        default_role = None
+        if options['role']:
+            default_role = ProjectRole.objects.filter(project=project, name=options['role']).first()
+            if default_role is None:
+                raise CommandError(f"Role '{options['role']}' does not exist in project '{project.name}'")
+
+        with open(options['csv_path'], encoding='utf-8-sig') as f:
+            parsed = read_member_rows(f.read(), project)
+
+        for error in parsed['errors']:
+            self.stderr.write(error)
+
+        rows = parsed['rows']
+        for row in rows:
+            if row['role'] is None:
+                row['role'] = default_role
+            row['is_admin'] = row['is_admin'] or options['admin']
+
+        def report(done, total):
+            self.stdout.write(f"  {done}/{total} memberships created")
+
+        result = bulk_add_members(project, rows, batch_size=options['batch_size'], progress=report)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created_memberships']} members with {result['created_tasks']} onboarding tasks "
+            f"({len(result['skipped'])} skipped, {len(parsed['errors'])} invalid rows)"
+        ))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from webapp.models import ProjectRole
+from webapp.onboarding_service import BATCH_SIZE, propagate_role_templates
+
+
+class Command(BaseCommand):
+    help = "Assign onboarding tasks from newly added templates to existing members of a role"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--role', type=int, action='append', dest='roles', help="Role ID (repeatable)")
+        parser.add_argument('--project', type=int, help="Propagate for every role of this project")
+        parser.add_argument('--all', action='store_true', help="Propagate for every role")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Memberships per batch")
+        parser.add_argument('--start-after', type=int, default=0,
+                            help="Resume after this membership ID (single role only)")
+
+    def handle(self, *args, **options):
+        roles = ProjectRole.objects.order_by('pk')
+        if options['roles']:
+            roles = roles.filter(pk__in=options['roles'])
+        elif options['project']:
+            roles = roles.filter(project_id=options['project'])
+        elif not options['all']:
+            raise CommandError("Pass --role, --project or --all")
+
+        role_ids = list(roles.values_list('pk', flat=True))
+        if options['start_after'] and len(role_ids) != 1:
+            raise CommandError("--start-after can only be used with a single role")
+
+        for role_id in role_ids:
+            self.stdout.write(f"Role {role_id}:")
+
+            def report(last_id, created):
+                self.stdout.write(f"  up to membership {last_id}: {created} tasks created")
+
+            result = propagate_role_templates(
+                role_id,
+                batch_size=options['batch_size'],
+                start_after=options['start_after'],
+                progress=report,
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"  {result['created_tasks']} tasks for {result['processed_memberships']} memberships"
+            ))
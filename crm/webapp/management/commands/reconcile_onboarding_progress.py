@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from webapp.models import ProjectMembership
+from webapp.onboarding_dag import refresh_pending_dependencies
+from webapp.onboarding_service import BATCH_SIZE, reconcile_progress_counters
+
+
+class Command(BaseCommand):
+    help = ("Recompute denormalized onboarding progress counters on ProjectMembership "
+            "and pending dependency counters on OnboardingTask, fixing drift")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help="Only reconcile memberships of this project")
+
+    def handle(self, *args, **options):
+        memberships = ProjectMembership.objects.all()
+        if options['project']:
+            memberships = memberships.filter(project_id=options['project'])
+
+        fixed = reconcile_progress_counters(memberships)
+        self.stdout.write(self.style.SUCCESS(f"Reconciled onboarding progress: {fixed} fixes applied"))
+
+        membership_ids = list(memberships.order_by('pk').values_list('pk', flat=True))
+        fixed = sum(
+            refresh_pending_dependencies(membership_ids[start:start + BATCH_SIZE])
+            for start in range(0, len(membership_ids), BATCH_SIZE)
+        )
+        self.stdout.write(self.style.SUCCESS(f"Reconciled task dependencies: {fixed} tasks updated"))
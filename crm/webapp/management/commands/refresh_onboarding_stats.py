@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from webapp.onboarding_service import BATCH_SIZE, refresh_onboarding_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the onboarding statistics rollup used by statistics_dashboard (run periodically)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        refreshed = refresh_onboarding_rollup(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {refreshed} onboarding statistics rows"))
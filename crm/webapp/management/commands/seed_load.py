@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from webapp.onboarding_service import BATCH_SIZE
+from webapp.seeding import DEFAULT_VOLUMES, SEED_PASSWORD, flush_dataset, scaled_volumes, seed_dataset
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic users, projects, onboarding data, tasks and documents with bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1, help="Multiply the default volumes")
+        for key in DEFAULT_VOLUMES:
+            parser.add_argument(f"--{key.replace('_', '-')}", type=int, dest=key, help=f"Override {key}")
+        parser.add_argument('--prefix', default='seed', help="Prefix for generated usernames and project names")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed (same seed -> same data)")
+        parser.add_argument('--admin', help="Username of an existing user to add as admin to every project")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--flush', action='store_true', help="Delete data generated earlier with this prefix first")
+
+    def handle(self, *args, **options):
+        volumes = scaled_volumes(options['scale'])
+        volumes.update({key: options[key] for key in DEFAULT_VOLUMES if options[key] is not None})
+
+        admin = None
+        if options['admin']:
+            admin = User.objects.filter(username=options['admin']).first()
+            if admin is None:
+                raise CommandError(f"User '{options['admin']}' does not exist")
+
+        prefix = options['prefix']
+        if options['flush']:
+            deleted = flush_dataset(prefix)
+            self.stdout.write(f"Deleted {deleted} rows generated with prefix '{prefix}'")
+        elif User.objects.filter(username__startswith=f'{prefix}_user').exists():
+            raise CommandError(f"Data with prefix '{prefix}' already exists; pass --flush or another --prefix")
+
+        def report(stage, count):
+            self.stdout.write(f"  {stage}: {count}")
+
+        started = time.perf_counter()
+        counts = seed_dataset(
+            volumes, prefix=prefix, seed=options['seed'], admin=admin,
+            batch_size=options['batch_size'], progress=report,
+        )
+        elapsed = time.perf_counter() - started
+
+        summary = ', '.join(f"{key}={value}" for key, value in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {elapsed:.1f}s: {summary}"))
+        self.stdout.write(f"Generated users log in with password '{SEED_PASSWORD}'")
@@ -0,0 +1,131 @@
+"""
+Metryki żądań HTTP w formacie tekstowym Prometheusa (endpoint /metrics).
+
+Rejestr jest lokalny dla procesu - przy kilku workerach gunicorna każdy wystawia własne
+liczniki, a Prometheus sumuje je po instancjach. Liczba żądań liczona jest zawsze,
+a histogramy czasu, zapytań SQL i rozmiaru odpowiedzi tylko dla próbki żądań
+(METRICS_SAMPLE_RATE), więc narzut pozostaje mały również pod obciążeniem.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+QUERY_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = {
+    'crm_http_request_duration_seconds': ('Request latency per view (sampled)', LATENCY_BUCKETS),
+    'crm_http_request_sql_queries': ('SQL queries per request (sampled)', QUERY_COUNT_BUCKETS),
+    'crm_http_request_sql_seconds': ('Time spent in SQL per request (sampled)', QUERY_TIME_BUCKETS),
+    'crm_http_response_size_bytes': ('Response body size, non-streaming responses (sampled)', SIZE_BUCKETS),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # ostatni kubełek to +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class QueryCollector:
+    """execute_wrapper zliczający zapytania SQL i czas ich wykonania."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests: Dict[Tuple[str, str, str], int] = {}
+            self.histograms: Dict[Tuple[str, str], Histogram] = {}
+
+    def count_request(self, view: str, method: str, status: int):
+        key = (view, method, str(status))
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def observe(self, view: str, duration: float, queries: int, query_time: float, size=None):
+        values = {
+            'crm_http_request_duration_seconds': duration,
+            'crm_http_request_sql_queries': queries,
+            'crm_http_request_sql_seconds': query_time,
+            'crm_http_response_size_bytes': size,
+        }
+        with self.lock:
+            for name, value in values.items():
+                if value is None:
+                    continue
+                histogram = self.histograms.get((name, view))
+                if histogram is None:
+                    histogram = self.histograms[(name, view)] = Histogram(HISTOGRAMS[name][1])
+                histogram.observe(value)
+
+    def render(self, sample_rate: float = 1.0) -> str:
+        """Zrzut rejestru w formacie tekstowym Prometheusa (wersja 0.0.4)."""
+        with self.lock:
+            requests = sorted(self.requests.items())
+            histograms = sorted(
+                (key, list(histogram.counts), histogram.sum, histogram.count, histogram.buckets)
+                for key, histogram in self.histograms.items()
+            )
+
+        lines = [
+            '# HELP crm_http_requests_total Requests per view, method and status',
+            '# TYPE crm_http_requests_total counter',
+        ]
+        lines += [
+            f'crm_http_requests_total{{{_labels(view=view, method=method, status=status)}}} {count}'
+            for (view, method, status), count in requests
+        ]
+        lines += [
+            '# HELP crm_metrics_sample_rate Fraction of requests observed in histograms',
+            '# TYPE crm_metrics_sample_rate gauge',
+            f'crm_metrics_sample_rate {sample_rate}',
+        ]
+        for name, (help_text, _) in HISTOGRAMS.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            for (metric, view), counts, total, count, buckets in histograms:
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{{_labels(view=view, le=bound)}}} {cumulative}')
+                lines.append(f'{name}_sum{{{_labels(view=view)}}} {total}')
+                lines.append(f'{name}_count{{{_labels(view=view)}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
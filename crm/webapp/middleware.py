@@ -0,0 +1,47 @@
+import random
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from webapp.metrics import REGISTRY, QueryCollector
+
+
+class RequestMetricsMiddleware:
+    """
+    Zbiera metryki żądań do webapp.metrics.REGISTRY: licznik żądań per widok zawsze,
+    a czas, liczbę i czas zapytań SQL oraz rozmiar odpowiedzi dla próbki METRICS_SAMPLE_RATE.
+    Powinien być pierwszy w MIDDLEWARE, żeby objąć zapytania sesji i autoryzacji.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        if random.random() >= self.sample_rate:
+            response = self.get_response(request)
+            REGISTRY.count_request(self._view_name(request), request.method, response.status_code)
+            return response
+
+        collector = QueryCollector()
+        started = time.perf_counter()
+        with connection.execute_wrapper(collector):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        # Przy odpowiedziach strumieniowych mierzymy tylko czas do pierwszego bajtu; rozmiar nieznany
+        size = None if response.streaming else len(response.content)
+        view = self._view_name(request)
+        REGISTRY.count_request(view, request.method, response.status_code)
+        REGISTRY.observe(view, duration, collector.count, collector.duration, size)
+        return response
+
+    @staticmethod
+    def _view_name(request):
+        # Nazwa widoku zamiast ścieżki - ograniczona liczba serii niezależnie od ID w URL
+        match = getattr(request, 'resolver_match', None)
+        return match.view_name if match and match.view_name else '<unresolved>'
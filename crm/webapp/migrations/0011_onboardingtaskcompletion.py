@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-19 18:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0010_add_ai_status_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OnboardingTaskCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('membership', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_completions', to='webapp.projectmembership')),
+                ('template', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='webapp.onboardingtasktemplate')),
+            ],
+            options={
+                'ordering': ['-archived_at'],
+            },
+        ),
+    ]
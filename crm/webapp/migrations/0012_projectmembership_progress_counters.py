@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-19 18:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+
+
+def backfill_progress_counters(apps, schema_editor):
+    ProjectMembership = apps.get_model('webapp', 'ProjectMembership')
+    OnboardingTask = apps.get_model('webapp', 'OnboardingTask')
+
+    tasks = OnboardingTask.objects.filter(membership=OuterRef('pk')).order_by().values('membership')
+    ProjectMembership.objects.update(
+        total_tasks=Coalesce(Subquery(tasks.annotate(c=Count('pk')).values('c')), 0),
+        completed_tasks=Coalesce(Subquery(tasks.filter(completed=True).annotate(c=Count('pk')).values('c')), 0),
+    )
+    last_completed_at = Subquery(
+        OnboardingTask.objects.filter(membership=OuterRef('pk'), completed=True)
+        .order_by('-completed_at').values('completed_at')[:1]
+    )
+    ProjectMembership.objects.filter(total_tasks__gt=0, total_tasks=models.F('completed_tasks')).update(
+        completed_at=Coalesce(last_completed_at, Now())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0011_onboardingtaskcompletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectmembership',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, help_text='Kiedy onboarding został ukończony', null=True),
+        ),
+        migrations.AddField(
+            model_name='projectmembership',
+            name='completed_tasks',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='projectmembership',
+            name='total_tasks',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_progress_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2 on 2026-10-19 18:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_rollup(apps, schema_editor):
+    ProjectMembership = apps.get_model('webapp', 'ProjectMembership')
+    OnboardingStatsRollup = apps.get_model('webapp', 'OnboardingStatsRollup')
+
+    rows = ProjectMembership.objects.values(
+        'pk', 'project_id', 'role_id', 'user__username', 'project__name', 'role__name',
+        'total_tasks', 'completed_tasks', 'completed_at',
+    ).order_by('pk')
+    OnboardingStatsRollup.objects.bulk_create(
+        [
+            OnboardingStatsRollup(
+                membership_id=row['pk'],
+                project_id=row['project_id'],
+                role_id=row['role_id'],
+                username=row['user__username'],
+                project_name=row['project__name'],
+                role_name=row['role__name'],
+                total_tasks=row['total_tasks'],
+                completed_tasks=row['completed_tasks'],
+                completion_percent=(
+                    round(row['completed_tasks'] / row['total_tasks'] * 100, 2) if row['total_tasks'] else 0
+                ),
+                completed_at=row['completed_at'],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0012_projectmembership_progress_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OnboardingStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150)),
+                ('project_name', models.CharField(max_length=200)),
+                ('role_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('total_tasks', models.PositiveIntegerField(default=0)),
+                ('completed_tasks', models.PositiveIntegerField(default=0)),
+                ('completion_percent', models.FloatField(default=0)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('membership', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats_rollup', to='webapp.projectmembership')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='onboarding_rollups', to='webapp.project')),
+                ('role', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='webapp.projectrole')),
+            ],
+            options={
+                'ordering': ['project_name', 'username'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='onboardingstatsrollup',
+            index=models.Index(fields=['project_name', 'username'], name='webapp_onbo_project_b7f6bd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onboardingstatsrollup',
+            index=models.Index(fields=['project', 'role', 'username'], name='webapp_onbo_project_9f9799_idx'),
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2 on 2026-10-19 18:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_daily_rollups(apps, schema_editor):
+    ProjectTask = apps.get_model('webapp', 'ProjectTask')
+    ProjectTaskDailyRollup = apps.get_model('webapp', 'ProjectTaskDailyRollup')
+
+    rows = ProjectTask.objects.values('project_id', 'assigned_to_id', 'date').annotate(
+        task_count=models.Count('pk'),
+        total_duration=models.Sum('duration'),
+    ).order_by()
+    ProjectTaskDailyRollup.objects.bulk_create(
+        [
+            ProjectTaskDailyRollup(
+                project_id=row['project_id'],
+                assigned_to_id=row['assigned_to_id'],
+                day=row['date'],
+                task_count=row['task_count'],
+                total_duration=row['total_duration'] or 0,
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('webapp', '0013_onboardingstatsrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectTaskDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('task_count', models.IntegerField(default=0)),
+                ('total_duration', models.IntegerField(default=0)),
+                ('assigned_to', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_task_rollups', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_task_rollups', to='webapp.project')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='projecttaskdailyrollup',
+            index=models.Index(fields=['project', 'day'], name='webapp_proj_project_99f9c0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projecttaskdailyrollup',
+            index=models.Index(fields=['day'], name='webapp_proj_day_527f53_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='projecttaskdailyrollup',
+            unique_together={('project', 'assigned_to', 'day')},
+        ),
+        migrations.RunPython(populate_daily_rollups, migrations.RunPython.noop),
+    ]
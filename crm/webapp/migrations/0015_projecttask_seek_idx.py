@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0014_projecttaskdailyrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projecttask',
+            index=models.Index(fields=['date', 'time', 'basetask_ptr'], name='projecttask_seek_idx'),
+        ),
+    ]
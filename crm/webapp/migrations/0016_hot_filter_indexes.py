@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-19 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0015_projecttask_seek_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documentsource',
+            index=models.Index(fields=['project', 'ai_generation_status'], name='webapp_docu_project_a91563_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onboardingtask',
+            index=models.Index(fields=['membership', 'completed'], name='webapp_onbo_members_24d7c0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectmembership',
+            index=models.Index(fields=['user', 'is_admin'], name='webapp_proj_user_id_f738cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projecttask',
+            index=models.Index(fields=['project', 'date'], name='webapp_proj_project_63ca8f_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-19 19:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0016_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCallLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('model', models.CharField(max_length=100)),
+                ('generation_method', models.CharField(help_text='together_ai / template_fallback / error_fallback', max_length=30)),
+                ('role_name', models.CharField(blank=True, max_length=100)),
+                ('prompt_hash', models.CharField(blank=True, max_length=64)),
+                ('prompt_tokens', models.PositiveIntegerField(blank=True, null=True)),
+                ('completion_tokens', models.PositiveIntegerField(blank=True, null=True)),
+                ('latency_ms', models.PositiveIntegerField(help_text='Czas całego generowania (API + parsowanie)')),
+                ('api_latency_ms', models.PositiveIntegerField(blank=True, help_text='Czas samego wywołania API', null=True)),
+                ('http_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('retries', models.PositiveSmallIntegerField(default=0)),
+                ('parse_path', models.CharField(blank=True, max_length=30)),
+                ('fallback_reason', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='llmcalllog',
+            index=models.Index(fields=['model', 'created_at'], name='webapp_llmc_model_4ec6f8_idx'),
+        ),
+    ]
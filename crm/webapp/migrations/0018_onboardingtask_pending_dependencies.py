@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0017_llmcalllog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='onboardingtask',
+            name='pending_dependencies',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0018_onboardingtask_pending_dependencies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='memberships_version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
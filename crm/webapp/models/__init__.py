@@ -1,4 +1,5 @@
 from .user_models import *
 from .project_models import *
 from .task_models import *
-from .onboarding_models import *
\ No newline at end of file
+from .onboarding_models import *
+from .cache_models import *
\ No newline at end of file
@@ -0,0 +1,9 @@
+from django.db import models
+
+class CacheVersion(models.Model):
+    """Wersja grupy kluczy cache (webapp.cache_versions) - w bazie, żeby była wspólna dla wszystkich procesów."""
+    key = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.key}: {self.version}"
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from .project_models import ProjectRole, ProjectMembership, Project
 from django.contrib.auth.models import User
 from .task_models import BaseTask
@@ -33,13 +34,54 @@ class OnboardingTask(BaseTask):
     completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
     added_by_user = models.BooleanField(default=False)
+    # Liczba nieukończonych zależności (template.depends_on) - utrzymywana przyrostowo (webapp.onboarding_dag)
+    pending_dependencies = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ('template', 'membership')
+        indexes = [models.Index(fields=['membership', 'completed'])]
 
     def __str__(self):
         return f"{self.title} by {self.membership.user.username}"
 
+class OnboardingTaskCompletion(models.Model):
+    """Archiwum ukończonych zadań - zachowuje historię przy restarcie onboardingu"""
+    membership = models.ForeignKey(ProjectMembership, on_delete=models.CASCADE, related_name='archived_completions')
+    template = models.ForeignKey(OnboardingTaskTemplate, on_delete=models.SET_NULL, null=True, blank=True)
+    title = models.CharField(max_length=200)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-archived_at']
+
+    def __str__(self):
+        return f"{self.title} (archived {self.archived_at:%Y-%m-%d})"
+
+class OnboardingStatsRollup(models.Model):
+    """Zmaterializowane statystyki onboardingu per (projekt, rola, członkostwo) dla statistics_dashboard"""
+    membership = models.OneToOneField(ProjectMembership, on_delete=models.CASCADE, related_name='stats_rollup')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='onboarding_rollups')
+    role = models.ForeignKey(ProjectRole, on_delete=models.SET_NULL, null=True, blank=True)
+    username = models.CharField(max_length=150)
+    project_name = models.CharField(max_length=200)
+    role_name = models.CharField(max_length=100, null=True, blank=True)
+    total_tasks = models.PositiveIntegerField(default=0)
+    completed_tasks = models.PositiveIntegerField(default=0)
+    completion_percent = models.FloatField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['project_name', 'username']
+        indexes = [
+            models.Index(fields=['project_name', 'username']),
+            models.Index(fields=['project', 'role', 'username']),
+        ]
+
+    def __str__(self):
+        return f"{self.username} @ {self.project_name}: {self.completion_percent}%"
+
 class OnboardingProgress(models.Model):
     membership = models.ForeignKey(ProjectMembership, on_delete=models.CASCADE, related_name='onboarding_progress')
     task = models.ForeignKey(OnboardingTask, on_delete=models.CASCADE)
@@ -106,6 +148,33 @@ class DocumentSource(models.Model):
     ai_processing_completed_at = models.DateTimeField(null=True, blank=True)
     ai_processing_error = models.TextField(null=True, blank=True, help_text="Error message if processing failed")
     ai_processing_progress = models.IntegerField(default=0, help_text="Processing progress percentage (0-100)")
+
+    class Meta:
+        indexes = [models.Index(fields=['project', 'ai_generation_status'])]
     
     def __str__(self):
         return f"{self.title} ({self.project.name})"
+
+
+class LLMCallLog(models.Model):
+    """Rejestr wywołań generowania onboardingu (tokeny, opóźnienie, ścieżka parsowania) - zapisywany zbiorczo w tle"""
+    created_at = models.DateTimeField(default=timezone.now)
+    model = models.CharField(max_length=100)
+    generation_method = models.CharField(max_length=30, help_text="together_ai / template_fallback / error_fallback")
+    role_name = models.CharField(max_length=100, blank=True)
+    prompt_hash = models.CharField(max_length=64, blank=True)
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
+    completion_tokens = models.PositiveIntegerField(null=True, blank=True)
+    latency_ms = models.PositiveIntegerField(help_text="Czas całego generowania (API + parsowanie)")
+    api_latency_ms = models.PositiveIntegerField(null=True, blank=True, help_text="Czas samego wywołania API")
+    http_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    retries = models.PositiveSmallIntegerField(default=0)
+    parse_path = models.CharField(max_length=30, blank=True)
+    fallback_reason = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['model', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.model} {self.latency_ms} ms ({self.created_at:%Y-%m-%d %H:%M})"
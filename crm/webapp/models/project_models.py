@@ -31,14 +31,17 @@ class ProjectMembership(models.Model):
     is_admin = models.BooleanField(default=False)  # NEW
     added_at = models.DateTimeField(auto_now_add=True)
 
+    # Zdenormalizowany postęp onboardingu (utrzymywany przez webapp.onboarding_service)
+    total_tasks = models.PositiveIntegerField(default=0)
+    completed_tasks = models.PositiveIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True, help_text="Kiedy onboarding został ukończony")
+
     class Meta:
         unique_together = ('user', 'project')
+        indexes = [models.Index(fields=['user', 'is_admin'])]
 
     def __str__(self):
         return f"{self.user.username} in {self.project.name} as {self.role.name if self.role else 'Unassigned'}"
 
     def is_onboarding_completed(self):
-        from .onboarding_models import OnboardingTaskTemplate  # zapobiegamy cyklom
-        total = OnboardingTaskTemplate.objects.filter(step__role=self.role).count()
-        done = self.user_onboarding_tasks.filter(completed=True).count()
-        return total > 0 and done == total
+        return self.total_tasks > 0 and self.completed_tasks == self.total_tasks
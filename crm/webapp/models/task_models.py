@@ -25,3 +25,30 @@ class ProjectTask(BaseTask):
     date = models.DateField()
     time = models.TimeField()
     duration = models.IntegerField(default=1)
+
+    class Meta:
+        # Klucz paginacji keyset (webapp.pagination)
+        indexes = [
+            models.Index(fields=['date', 'time', 'basetask_ptr'], name='projecttask_seek_idx'),
+            # Filtry statystyk/eksportu: projekt + zakres dat
+            models.Index(fields=['project', 'date']),
+        ]
+
+
+class ProjectTaskDailyRollup(models.Model):
+    """Dzienne agregaty zadań projektowych (projekt, osoba, dzień) - źródło szeregów czasowych."""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='daily_task_rollups')
+    assigned_to = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_task_rollups')
+    day = models.DateField()
+    task_count = models.IntegerField(default=0)
+    total_duration = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('project', 'assigned_to', 'day')
+        indexes = [
+            models.Index(fields=['project', 'day']),
+            models.Index(fields=['day']),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id}/{self.assigned_to_id} {self.day}: {self.task_count}"
@@ -17,6 +17,8 @@ class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     is_verified = models.BooleanField(default=False)
     role = models.ForeignKey(UserRole, on_delete=models.SET_NULL, null=True, blank=True)
+    # Wersja członkostw projektowych (time_ns przy każdej zmianie) - unieważnia ich kopię w sesji (webapp.permissions)
+    memberships_version = models.BigIntegerField(default=0)
 
     def __str__(self):
         return f"{self.user.username} - {self.role.name if self.role else 'No Role'}"
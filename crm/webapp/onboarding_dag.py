@@ -0,0 +1,224 @@
+"""
+Zależności między zadaniami onboardingowymi (OnboardingTaskTemplate.depends_on).
+
+Po zatwierdzeniu draftu depends_on zawiera ID szablonów tej samej roli. Graf roli
+(zależności i odwrotne krawędzie) budowany jest raz i trzymany w cache do zmiany
+szablonów. Wersja grafu leży w bazie (webapp.cache_versions) i zmienia się w tej samej
+transakcji co szablony, więc żaden proces nie przesuwa liczników według starego grafu
+po zatwierdzeniu zmiany.
+
+Każde OnboardingTask ma licznik pending_dependencies (nieukończone zależności).
+Ukończenie albo ponowne otwarcie zadania zmienia liczniki tylko jego bezpośrednich
+następników - jeden UPDATE, koszt O(stopień wyjściowy) zamiast przeliczania grafu.
+Pełne przeliczenie (refresh_pending_dependencies) robione jest przy przypisywaniu
+zadań i po zmianach szablonów.
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from webapp.cache_versions import bump_cache_version, get_cache_version
+from webapp.models import OnboardingTask, OnboardingTaskTemplate, ProjectMembership
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'onboarding_graph:version'
+
+
+class DependencyCycleError(ValueError):
+    """Zależności zadań tworzą cykl - żadne z zadań w cyklu nie mogłoby zostać odblokowane."""
+
+    def __init__(self, cycle: List):
+        self.cycle = cycle
+        super().__init__("Dependency cycle: " + " -> ".join(str(node) for node in cycle))
+
+
+def find_cycle(dependencies: Dict[int, Iterable[int]]) -> Optional[List[int]]:
+    """Pierwszy znaleziony cykl (lista węzłów, pierwszy == ostatni) albo None. DFS bez rekurencji."""
+    WHITE, GREY, BLACK = 0, 1, 2
+    color = defaultdict(int)
+    for root in dependencies:
+        if color[root] != WHITE:
+            continue
+        color[root] = GREY
+        path = [root]
+        stack = [iter(dependencies.get(root, ()))]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                color[path.pop()] = BLACK
+                stack.pop()
+            elif color[node] == GREY:
+                return path[path.index(node):] + [node]
+            elif color[node] == WHITE:
+                color[node] = GREY
+                path.append(node)
+                stack.append(iter(dependencies.get(node, ())))
+    return None
+
+
+def resolve_draft_dependencies(created: List[Tuple[Dict, OnboardingTaskTemplate]]) -> Dict[int, List[int]]:
+    """
+    Tłumaczy depends_on z draftu LLM na ID utworzonych szablonów.
+
+    Odwołanie może być ID zadania z draftu ("T3"), tytułem zadania, ID kroku ("S1" - wszystkie
+    zadania kroku) albo numerem zadania w drafcie (od 1). Nierozpoznane odwołania są pomijane.
+
+    Raises:
+        DependencyCycleError: jeśli zależności tworzą cykl (w tym zależność od samego siebie)
+    """
+    def key(value) -> str:
+        return str(value).strip().casefold()
+
+    by_task: Dict[str, List[int]] = defaultdict(list)
+    by_step: Dict[str, List[int]] = defaultdict(list)
+    for position, (task_data, template) in enumerate(created, start=1):
+        for value in (task_data.get('id'), task_data.get('title'), position):
+            if value is not None:
+                by_task[key(value)].append(template.pk)
+        by_step[key(task_data.get('step_id'))].append(template.pk)
+
+    resolved = {}
+    for task_data, template in created:
+        dependencies = []
+        for reference in task_data.get('depends_on') or []:
+            # Zależność od własnego kroku nie obejmuje samego zadania; jawne odwołanie do siebie to cykl
+            matches = by_task.get(key(reference)) or [
+                pk for pk in by_step.get(key(reference), []) if pk != template.pk
+            ]
+            if not matches:
+                logger.warning(f"Unknown dependency {reference!r} of task {template.title!r}, ignoring")
+            dependencies += [pk for pk in matches if pk not in dependencies]
+        resolved[template.pk] = dependencies
+
+    cycle = find_cycle(resolved)
+    if cycle:
+        titles = {template.pk: template.title for _, template in created}
+        raise DependencyCycleError([titles[pk] for pk in cycle])
+    return resolved
+
+
+class DependencyGraph:
+    """Graf zależności szablonów jednej roli: dependencies (poprzednicy) i dependents (następnicy)."""
+
+    def __init__(self, dependencies: Dict[int, List[int]]):
+        self.dependencies = dependencies
+        self.dependents: Dict[int, List[int]] = defaultdict(list)
+        for template_id, required in dependencies.items():
+            for dependency in required:
+                self.dependents[dependency].append(template_id)
+        self.dependents = dict(self.dependents)
+
+    @classmethod
+    def build(cls, role_id: int) -> 'DependencyGraph':
+        rows = list(
+            OnboardingTaskTemplate.objects.filter(step__role_id=role_id).values_list('pk', 'depends_on')
+        )
+        known = {pk for pk, _ in rows}
+        dependencies = {
+            pk: [dependency for dependency in (depends_on or [])
+                 if isinstance(dependency, int) and dependency in known and dependency != pk]
+            for pk, depends_on in rows
+        }
+        # Cykl z edycji w adminie nie może zablokować członków na zawsze - pomijamy zależności w cyklu
+        cycle = find_cycle(dependencies)
+        while cycle:
+            logger.warning(f"Dependency cycle in role {role_id} templates {cycle}, ignoring its edges")
+            for template_id in cycle:
+                dependencies[template_id] = []
+            cycle = find_cycle(dependencies)
+        return cls({pk: required for pk, required in dependencies.items() if required})
+
+
+def get_graph_version() -> int:
+    return get_cache_version(VERSION_KEY)
+
+
+def bump_graph_version():
+    """
+    Unieważnia zapamiętane grafy wszystkich ról - w bieżącej transakcji, razem ze zmianą szablonów.
+
+    Przy usuwaniu wołać po odczycie grafu - w pre_delete szablon jest jeszcze w bazie, a graf
+    zbudowany po podbiciu zostałby w cache pod nową wersją.
+    """
+    bump_cache_version(VERSION_KEY)
+
+
+def get_role_graph(role_id: int) -> DependencyGraph:
+    key = f'onboarding_graph:{get_graph_version()}:{role_id}'
+    graph = cache.get(key)
+    if graph is None:
+        graph = DependencyGraph.build(role_id)
+        cache.set(key, graph, getattr(settings, 'ONBOARDING_GRAPH_CACHE_TIMEOUT', 3600))
+    return graph
+
+
+def apply_completion(task: OnboardingTask, role_id: int, completed: bool) -> int:
+    """
+    Przesuwa liczniki następników zadania członka po jego ukończeniu (albo ponownym otwarciu).
+    Zwraca liczbę zmienionych zadań.
+    """
+    dependents = get_role_graph(role_id).dependents.get(task.template_id)
+    if not dependents:
+        return 0
+    delta = Greatest(F('pending_dependencies') - 1, 0) if completed else F('pending_dependencies') + 1
+    return OnboardingTask.objects.filter(
+        membership_id=task.membership_id, template_id__in=dependents
+    ).update(pending_dependencies=delta)
+
+
+def refresh_pending_dependencies(membership_ids: Iterable[int]) -> int:
+    """
+    Przelicza liczniki pending_dependencies podanych członkostw od zera.
+
+    Jedno zapytanie o zadania, grafy ról z cache i jeden UPDATE na każdą różną wartość
+    licznika. Zwraca liczbę poprawionych zadań.
+    """
+    membership_ids = list(membership_ids)
+    if not membership_ids:
+        return 0
+    roles = dict(
+        ProjectMembership.objects.filter(pk__in=membership_ids, role__isnull=False).values_list('pk', 'role_id')
+    )
+    graphs = {role_id: get_role_graph(role_id) for role_id in set(roles.values())}
+    if not any(graph.dependencies for graph in graphs.values()):
+        # Brak zależności w rolach - wystarczy wyzerować ewentualne stare liczniki
+        return OnboardingTask.objects.filter(membership_id__in=roles, pending_dependencies__gt=0).update(
+            pending_dependencies=0
+        )
+
+    tasks = list(
+        OnboardingTask.objects.filter(membership_id__in=roles).values_list(
+            'pk', 'membership_id', 'template_id', 'completed', 'pending_dependencies'
+        )
+    )
+    completed = {(membership_id, template_id) for _, membership_id, template_id, done, _ in tasks if done}
+    updates = defaultdict(list)
+    for pk, membership_id, template_id, _, pending in tasks:
+        required = graphs[roles[membership_id]].dependencies.get(template_id, ())
+        actual = sum(1 for dependency in required if (membership_id, dependency) not in completed)
+        if actual != pending:
+            updates[actual].append(pk)
+
+    with transaction.atomic():
+        for pending, pks in updates.items():
+            OnboardingTask.objects.filter(pk__in=pks).update(pending_dependencies=pending)
+    return sum(len(pks) for pks in updates.values())
+
+
+def refresh_role_dependencies(role_id: int) -> int:
+    """Przelicza liczniki wszystkich członków roli (po zmianie zależności albo usunięciu szablonu)."""
+    membership_ids = ProjectMembership.objects.filter(role_id=role_id).values_list('pk', flat=True)
+    return refresh_pending_dependencies(membership_ids)
+
+
+def schedule_dependency_refresh(role_id: int):
+    """Przeliczenie liczników roli po zatwierdzeniu bieżącej transakcji."""
+    transaction.on_commit(lambda: refresh_role_dependencies(role_id))
+
@@ -0,0 +1,604 @@
+"""
+Serwis onboardingowy - operacje zbiorcze na członkostwach i zadaniach onboardingowych.
+
+Wszystkie funkcje działają na zbiorach (bulk_create / update / anti-join), żeby koszt
+nie rósł liniowo z liczbą członków ani szablonów.
+"""
+import csv
+import io
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections, router, transaction
+from django.db.models import Case, Count, DateTimeField, Exists, F, OuterRef, Prefetch, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from webapp.models import (
+    BaseTask, OnboardingStatsRollup, OnboardingStep, OnboardingTask, OnboardingTaskCompletion, OnboardingTaskTemplate,
+    ProjectMembership, ProjectRole
+)
+from webapp.onboarding_dag import apply_completion, refresh_pending_dependencies
+from webapp.permissions import bump_memberships_version
+from webapp.stats_cache import bump_stats_generation
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+NEXT_TASKS_LIMIT = 3
+
+ProgressCallback = Optional[Callable[[int, int], None]]
+
+
+class TaskBlockedError(ValueError):
+    """Zadanie ma nieukończone zależności (pending_dependencies > 0), więc nie może zostać ukończone."""
+
+    def __init__(self, task: OnboardingTask):
+        self.task = task
+        super().__init__(f"Task {task.title!r} is waiting for unfinished dependencies")
+
+
+def apply_progress_delta(membership_ids: Iterable[int], total: int = 0, completed: int = 0):
+    """
+    Atomowo przesuwa liczniki postępu członkostw (F-expressions, jeden UPDATE).
+
+    completed_at ustawiane jest przy osiągnięciu completed == total > 0 i czyszczone,
+    gdy onboarding przestaje być ukończony. Warunek liczony jest na wartościach sprzed
+    UPDATE-u, dlatego porównujemy je z uwzględnieniem delty.
+    """
+    membership_ids = list(membership_ids)
+    if not membership_ids or (not total and not completed):
+        return
+    becomes_complete = Q(total_tasks__gt=-total) & Q(total_tasks=F('completed_tasks') + (completed - total))
+    ProjectMembership.objects.filter(pk__in=membership_ids).update(
+        total_tasks=Greatest(F('total_tasks') + total, Value(0)),
+        completed_tasks=Greatest(F('completed_tasks') + completed, Value(0)),
+        completed_at=Case(
+            When(becomes_complete, then=Coalesce(F('completed_at'), Value(timezone.now()))),
+            default=Value(None),
+            output_field=DateTimeField(),
+        ),
+    )
+    refresh_onboarding_rollup(membership_ids)
+
+
+def refresh_onboarding_rollup(membership_ids: Optional[Iterable[int]] = None, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Odświeża wiersze OnboardingStatsRollup z liczników na ProjectMembership.
+
+    Upsert (INSERT ... ON CONFLICT DO UPDATE) paczkami po kluczu, bez agregacji po
+    zadaniach. Bez `membership_ids` przebudowuje całą tabelę (komenda okresowa).
+    Zwraca liczbę odświeżonych wierszy.
+    """
+    memberships = ProjectMembership.objects.order_by('pk')
+    if membership_ids is not None:
+        membership_ids = list(membership_ids)
+        if not membership_ids:
+            return 0
+        memberships = memberships.filter(pk__in=membership_ids)
+
+    last_id = 0
+    refreshed = 0
+    while True:
+        batch = list(
+            memberships.filter(pk__gt=last_id).values(
+                'pk', 'project_id', 'role_id', 'user__username', 'project__name', 'role__name',
+                'total_tasks', 'completed_tasks', 'completed_at',
+            )[:batch_size]
+        )
+        if not batch:
+            break
+        OnboardingStatsRollup.objects.bulk_create(
+            [
+                OnboardingStatsRollup(
+                    membership_id=row['pk'],
+                    project_id=row['project_id'],
+                    role_id=row['role_id'],
+                    username=row['user__username'],
+                    project_name=row['project__name'],
+                    role_name=row['role__name'],
+                    total_tasks=row['total_tasks'],
+                    completed_tasks=row['completed_tasks'],
+                    completion_percent=(
+                        round(row['completed_tasks'] / row['total_tasks'] * 100, 2) if row['total_tasks'] else 0
+                    ),
+                    completed_at=row['completed_at'],
+                )
+                for row in batch
+            ],
+            update_conflicts=True,
+            unique_fields=['membership'],
+            update_fields=[
+                'project', 'role', 'username', 'project_name', 'role_name', 'total_tasks',
+                'completed_tasks', 'completion_percent', 'completed_at', 'refreshed_at',
+            ],
+        )
+        refreshed += len(batch)
+        last_id = batch[-1]['pk']
+    return refreshed
+
+
+def _apply_task_counts(tasks: Iterable[OnboardingTask], sign: int = 1):
+    """Grupuje członkostwa po wielkości delty - jeden UPDATE na każdą różną deltę."""
+    counts = Counter()
+    for task in tasks:
+        counts[(task.membership_id, 'total')] += 1
+        if task.completed:
+            counts[(task.membership_id, 'completed')] += 1
+
+    deltas = defaultdict(list)
+    for membership_id in {membership_id for membership_id, _ in counts}:
+        delta = (counts[(membership_id, 'total')], counts[(membership_id, 'completed')])
+        deltas[delta].append(membership_id)
+    for (total, completed), membership_ids in deltas.items():
+        apply_progress_delta(membership_ids, total=sign * total, completed=sign * completed)
+
+
+def set_onboarding_task_status(task: OnboardingTask, status: str) -> OnboardingTask:
+    """
+    Zmienia status zadania onboardingowego i utrzymuje liczniki postępu członkostwa.
+
+    Przejście completed jest warunkowym UPDATE-em (WHERE completed = poprzednia wartość),
+    więc równoległe kliknięcia nie zliczą tego samego zadania dwa razy. Po przejściu
+    przesuwane są też liczniki pending_dependencies następników zadania.
+
+    Raises:
+        TaskBlockedError: przy próbie ukończenia zadania z nieukończonymi zależnościami
+    """
+    completed = status == BaseTask.TaskStatus.COMPLETED
+    completed_at = timezone.now() if completed else None
+    with transaction.atomic():
+        transition = OnboardingTask.objects.filter(pk=task.pk, completed=not completed)
+        if completed:
+            # Warunek w tym samym UPDATE - inaczej następnicy odblokowaliby się przed zależnościami zadania
+            transition = transition.filter(pending_dependencies=0)
+        changed = transition.update(
+            completed=completed,
+            completed_at=completed_at,
+        )
+        if completed and not changed and OnboardingTask.objects.filter(pk=task.pk, completed=False).exists():
+            raise TaskBlockedError(task)
+        BaseTask.objects.filter(pk=task.pk).update(status=status)
+        if changed:
+            apply_progress_delta([task.membership_id], completed=1 if completed else -1)
+            role_id = ProjectMembership.objects.filter(pk=task.membership_id).values_list('role_id', flat=True).first()
+            if role_id:
+                apply_completion(task, role_id, completed)
+        # UPDATE nie wysyła sygnałów - cache statystyk unieważniamy ręcznie
+        bump_stats_generation()
+
+    task.status = status
+    if changed:
+        task.completed = completed
+        task.completed_at = completed_at
+    return task
+
+
+def reconcile_progress_counters(memberships=None) -> int:
+    """
+    Przelicza liczniki postępu od zera i naprawia rozjazdy (np. po edycji w adminie).
+    Zwraca liczbę poprawionych członkostw.
+    """
+    if memberships is None:
+        memberships = ProjectMembership.objects.all()
+
+    tasks = OnboardingTask.objects.filter(membership=OuterRef('pk')).order_by().values('membership')
+    actual_total = Coalesce(Subquery(tasks.annotate(c=Count('pk')).values('c')), 0)
+    actual_completed = Coalesce(Subquery(tasks.filter(completed=True).annotate(c=Count('pk')).values('c')), 0)
+    last_completed_at = Subquery(
+        OnboardingTask.objects.filter(membership=OuterRef('pk'), completed=True)
+        .order_by('-completed_at').values('completed_at')[:1]
+    )
+
+    drifted_ids = list(
+        memberships
+        .annotate(actual_total=actual_total, actual_completed=actual_completed)
+        .exclude(total_tasks=F('actual_total'), completed_tasks=F('actual_completed'))
+        .values_list('pk', flat=True)
+    )
+    with transaction.atomic():
+        ProjectMembership.objects.filter(pk__in=drifted_ids).update(
+            total_tasks=actual_total,
+            completed_tasks=actual_completed,
+        )
+        fixed = ProjectMembership.objects.filter(pk__in=memberships.values('pk'))
+        complete = Q(total_tasks__gt=0, total_tasks=F('completed_tasks'))
+        fixed_dates = fixed.filter(complete, completed_at__isnull=True).update(
+            completed_at=Coalesce(last_completed_at, Value(timezone.now()))
+        )
+        fixed_dates += fixed.exclude(complete).filter(completed_at__isnull=False).update(completed_at=None)
+
+    if drifted_ids or fixed_dates:
+        refresh_onboarding_rollup(memberships.values_list('pk', flat=True))
+
+    return len(drifted_ids) + fixed_dates
+
+
+def bulk_insert_tasks(model, tasks: List, batch_size: int = BATCH_SIZE) -> List:
+    """
+    Zbiorczy zapis zadań dziedziczących po BaseTask (OnboardingTask, ProjectTask).
+
+    Takie modele używają multi-table inheritance, a Django nie obsługuje dla nich bulk_create.
+    Dlatego najpierw wstawiamy wiersze BaseTask (z RETURNING id), a potem wiersze tabeli
+    dziecka - dwa INSERT-y na paczkę zamiast dwóch na zadanie. Sygnały nie są wysyłane.
+    """
+    db = router.db_for_write(model)
+    child_fields = model._meta.local_concrete_fields
+
+    with transaction.atomic(using=db):
+        for start in range(0, len(tasks), batch_size):
+            batch = tasks[start:start + batch_size]
+            parents = BaseTask.objects.using(db).bulk_create([
+                BaseTask(
+                    title=task.title,
+                    description=task.description,
+                    assigned_to_id=task.assigned_to_id,
+                    status=task.status,
+                )
+                for task in batch
+            ])
+            for parent, task in zip(parents, batch):
+                task.id = task.basetask_ptr_id = parent.pk
+                task.created_at = parent.created_at
+            model._base_manager._insert(batch, fields=child_fields, using=db)
+            for task in batch:
+                task._state.adding = False
+                task._state.db = db
+    return tasks
+
+
+def bulk_create_onboarding_tasks(tasks: List[OnboardingTask], batch_size: int = BATCH_SIZE) -> List[OnboardingTask]:
+    """Zbiorczy zapis zadań onboardingowych razem z licznikami postępu członkostw."""
+    with transaction.atomic(using=router.db_for_write(OnboardingTask)):
+        bulk_insert_tasks(OnboardingTask, tasks, batch_size)
+        # bulk_create nie wysyła sygnałów, więc liczniki postępu i cache statystyk obsługujemy tutaj
+        _apply_task_counts(tasks)
+        if tasks:
+            bump_stats_generation()
+    return tasks
+
+
+def missing_assignments(memberships):
+    """
+    Pary (członkostwo, szablon), dla których nie istnieje jeszcze OnboardingTask.
+
+    Jedno zapytanie: członkostwa złączone z szablonami swojej roli + NOT EXISTS
+    na istniejących zadaniach (anti-join).
+    """
+    already_assigned = OnboardingTask.objects.filter(
+        membership_id=OuterRef('pk'),
+        template_id=OuterRef('template_id'),
+    )
+    return (
+        memberships
+        .annotate(
+            template_id=F('role__steps__task_templates__id'),
+            template_title=F('role__steps__task_templates__title'),
+            template_description=F('role__steps__task_templates__description'),
+        )
+        .filter(template_id__isnull=False)
+        .filter(~Exists(already_assigned))
+        .order_by('pk', 'template_id')
+        .values('pk', 'user_id', 'template_id', 'template_title', 'template_description')
+    )
+
+
+def _tasks_from_assignments(rows: Iterable[Dict]) -> List[OnboardingTask]:
+    return [
+        OnboardingTask(
+            title=row['template_title'],
+            description=row['template_description'],
+            assigned_to_id=row['user_id'],
+            status=BaseTask.TaskStatus.TODO,
+            membership_id=row['pk'],
+            template_id=row['template_id'],
+        )
+        for row in rows
+    ]
+
+
+def assign_onboarding_tasks(membership_ids: List[int], batch_size: int = BATCH_SIZE) -> int:
+    """
+    Przypisuje brakujące zadania onboardingowe podanym członkostwom i przelicza
+    ich liczniki zależności. Zwraca liczbę utworzonych zadań.
+    """
+    if not membership_ids:
+        return 0
+    rows = missing_assignments(ProjectMembership.objects.filter(pk__in=membership_ids))
+    tasks = _tasks_from_assignments(rows)
+    with transaction.atomic():
+        bulk_create_onboarding_tasks(tasks, batch_size=batch_size)
+        refresh_pending_dependencies(membership_ids)
+    return len(tasks)
+
+
+def restart_membership_onboarding(membership) -> Dict:
+    """
+    Restartuje onboarding członka bez kasowania zadań.
+
+    Ukończone zadania są archiwizowane (OnboardingTaskCompletion), istniejące zadania
+    resetowane jednym UPDATE-em, a szablony dodane od ostatniego razu dopisywane
+    anti-joinem. Liczba zapytań nie zależy od liczby zadań.
+    """
+    tasks = OnboardingTask.objects.filter(membership=membership)
+    with transaction.atomic():
+        archived = OnboardingTaskCompletion.objects.bulk_create([
+            OnboardingTaskCompletion(
+                membership_id=membership.pk,
+                template_id=template_id,
+                title=title,
+                completed_at=completed_at,
+            )
+            for template_id, title, completed_at in tasks.filter(completed=True).values_list(
+                'template_id', 'title', 'completed_at'
+            )
+        ])
+        reset = tasks.filter(Q(completed=True) | ~Q(status=BaseTask.TaskStatus.TODO)).update(
+            status=BaseTask.TaskStatus.TODO,
+            completed=False,
+            completed_at=None,
+        )
+        apply_progress_delta([membership.pk], completed=-len(archived))
+        if reset:
+            bump_stats_generation()
+        created = assign_onboarding_tasks([membership.pk])
+
+    return {'archived': len(archived), 'reset': reset, 'created': created}
+
+
+def read_member_rows(csv_text: str, project) -> Dict:
+    """
+    Parsuje CSV z członkami projektu i waliduje go w pamięci.
+
+    Obsługiwane kolumny: username lub email (wymagana jedna z nich), role, is_admin.
+    Użytkownicy i role są dociągane dwoma zapytaniami niezależnie od liczby wierszy.
+    """
+    reader = csv.DictReader(io.StringIO(csv_text))
+    fieldnames = [name.strip().lower() for name in (reader.fieldnames or [])]
+    if 'username' not in fieldnames and 'email' not in fieldnames:
+        return {'rows': [], 'errors': ["CSV must have a 'username' or 'email' column"]}
+
+    raw_rows = []
+    for line_no, row in enumerate(reader, start=2):
+        row = {(k or '').strip().lower(): (v or '').strip() for k, v in row.items()}
+        raw_rows.append((line_no, row))
+
+    usernames = {row['username'] for _, row in raw_rows if row.get('username')}
+    emails = {row['email'].lower() for _, row in raw_rows if row.get('email') and not row.get('username')}
+    users = User.objects.filter(Q(username__in=usernames) | Q(email__in=emails))
+    by_username = {}
+    by_email = {}
+    for user in users:
+        by_username[user.username] = user
+        by_email.setdefault(user.email.lower(), user)
+
+    roles = {role.name.lower(): role for role in ProjectRole.objects.filter(project=project)}
+
+    rows = []
+    errors = []
+    for line_no, row in raw_rows:
+        if row.get('username'):
+            user = by_username.get(row['username'])
+        else:
+            user = by_email.get(row.get('email', '').lower())
+        if user is None:
+            errors.append(f"Line {line_no}: unknown user '{row.get('username') or row.get('email')}'")
+            continue
+
+        role = None
+        if row.get('role'):
+            role = roles.get(row['role'].lower())
+            if role is None:
+                errors.append(f"Line {line_no}: role '{row['role']}' does not exist in project '{project.name}'")
+                continue
+
+        is_admin = row.get('is_admin', '').lower() in ('1', 'true', 'yes', 'y')
+        rows.append({'user': user, 'role': role, 'is_admin': is_admin})
+
+    return {'rows': rows, 'errors': errors}
+
+
+def bulk_add_members(project, rows: List[Dict], batch_size: int = BATCH_SIZE,
+                     progress: ProgressCallback = None) -> Dict:
+    """
+    Zbiorczo dodaje członków do projektu i przypisuje im zadania onboardingowe.
+
+    Args:
+        project: Projekt docelowy
+        rows: Lista słowników {'user', 'role', 'is_admin'}
+        batch_size: Rozmiar paczki dla INSERT-ów
+        progress: Opcjonalny callback (zrobione, wszystkie) wołany po każdej paczce
+
+    Returns:
+        Dict z liczbą utworzonych członkostw, zadań i listą pominiętych użytkowników
+    """
+    existing = set(
+        ProjectMembership.objects.filter(project=project).values_list('user_id', flat=True)
+    )
+
+    skipped = []
+    seen = set()
+    memberships = []
+    for row in rows:
+        user = row['user']
+        role = row.get('role')
+        if user.pk in existing or user.pk in seen:
+            skipped.append(user.username)
+            continue
+        if role is not None and role.project_id != project.pk:
+            skipped.append(user.username)
+            continue
+        seen.add(user.pk)
+        memberships.append(ProjectMembership(
+            user=user,
+            project=project,
+            role=role,
+            is_admin=row.get('is_admin', False),
+        ))
+
+    total = len(memberships)
+    created_tasks = 0
+    done = 0
+    with transaction.atomic():
+        for start in range(0, total, batch_size):
+            batch = ProjectMembership.objects.bulk_create(memberships[start:start + batch_size])
+            created_tasks += assign_onboarding_tasks(
+                [m.pk for m in batch if m.role_id], batch_size=batch_size
+            )
+            refresh_onboarding_rollup([m.pk for m in batch], batch_size=batch_size)
+            done += len(batch)
+            if progress:
+                progress(done, total)
+        bump_memberships_version(seen)  # bulk_create nie wysyła sygnałów
+
+    logger.info(
+        f"Bulk import into project {project.pk}: {total} memberships, "
+        f"{created_tasks} onboarding tasks, {len(skipped)} skipped"
+    )
+    return {
+        'created_memberships': total,
+        'created_tasks': created_tasks,
+        'skipped': skipped,
+    }
+
+
+def propagate_role_templates(role_id: int, batch_size: int = BATCH_SIZE, start_after: int = 0,
+                             progress: ProgressCallback = None) -> Dict:
+    """
+    Dopisuje brakujące zadania onboardingowe wszystkim członkom roli.
+
+    Członkostwa są przetwarzane paczkami po kluczu (pk > ostatnie_pk), każda paczka
+    to jeden anti-join + INSERT-y w osobnej transakcji. Istniejące zadania (i ich postęp)
+    nie są ruszane, więc przerwane zadanie można bezpiecznie wznowić od `start_after`
+    albo po prostu uruchomić ponownie.
+
+    Args:
+        role_id: ID roli projektu
+        batch_size: Liczba członkostw w paczce
+        start_after: Ostatnie przetworzone ID członkostwa (do wznawiania)
+        progress: Opcjonalny callback (ostatnie_pk, utworzone_zadania) po każdej paczce
+
+    Returns:
+        Dict z liczbą przetworzonych członkostw, utworzonych zadań i ostatnim ID
+    """
+    last_id = start_after
+    processed = 0
+    created = 0
+    while True:
+        membership_ids = list(
+            ProjectMembership.objects
+            .filter(role_id=role_id, pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not membership_ids:
+            break
+        created += assign_onboarding_tasks(membership_ids, batch_size=batch_size)
+        processed += len(membership_ids)
+        last_id = membership_ids[-1]
+        if progress:
+            progress(last_id, created)
+
+    logger.info(f"Propagated templates of role {role_id}: {created} tasks for {processed} memberships")
+    return {'processed_memberships': processed, 'created_tasks': created, 'last_membership_id': last_id}
+
+
+def _propagate_in_background(role_ids: List[int]):
+    try:
+        for role_id in role_ids:
+            propagate_role_templates(role_id)
+    except Exception as e:
+        logger.error(f"Template propagation for roles {role_ids} failed: {e}", exc_info=True)
+    finally:
+        connections.close_all()
+
+
+def schedule_template_propagation(role_ids: Iterable[int]):
+    """
+    Uruchamia propagację szablonów po zatwierdzeniu bieżącej transakcji.
+
+    Bez Celery (Railway free tier) propagacja działa w wątku w tle; przy
+    ONBOARDING_PROPAGATION_ASYNC = False wykonuje się synchronicznie. Jeśli proces
+    zostanie przerwany, komenda `propagate_onboarding_templates` dokończy pracę.
+    """
+    role_ids = sorted(set(role_ids))
+    if not role_ids:
+        return
+
+    def start():
+        if getattr(settings, 'ONBOARDING_PROPAGATION_ASYNC', True):
+            threading.Thread(target=_propagate_in_background, args=(role_ids,), daemon=True).start()
+        else:
+            for role_id in role_ids:
+                propagate_role_templates(role_id)
+
+    transaction.on_commit(start)
+
+
+def onboarding_dashboard_tree(membership) -> Dict:
+    """
+    Drzewo krok -> szablon -> zadanie użytkownika dla dashboardu, w stałej liczbie zapytań.
+
+    Kroki z szablonami (Prefetch z to_attr) i zadania członka (jedno zapytanie, słownik po
+    template_id) łączone są w jednym przejściu, więc koszt nie zależy od liczby zadań roli.
+    Stan wiersza (completed / unlocked / blocked) wynika z licznika pending_dependencies;
+    next_tasks to pierwsze odblokowane, nieukończone zadania w kolejności kroków.
+
+    Returns:
+        Dict {'steps': [{'step', 'rows': [{'template', 'task', 'state', 'blocked_by'}], 'completed', 'total'}],
+              'completed', 'total', 'unlocked', 'blocked', 'next_tasks'}
+    """
+    steps = (
+        OnboardingStep.objects.filter(role_id=membership.role_id)
+        .order_by('order', 'pk')
+        .prefetch_related(Prefetch(
+            'task_templates',
+            queryset=OnboardingTaskTemplate.objects.order_by('pk').only(
+                'step_id', 'title', 'description', 'is_required', 'depends_on'
+            ),
+            to_attr='template_list',
+        ))
+    )
+    tasks = {
+        task.template_id: task
+        for task in OnboardingTask.objects.filter(membership=membership).only(
+            'template_id', 'status', 'completed', 'completed_at', 'pending_dependencies'
+        )
+    }
+
+    tree = {'steps': [], 'completed': 0, 'total': 0, 'unlocked': 0, 'blocked': 0, 'next_tasks': []}
+    rows_by_template = {}
+    for step in steps:
+        rows = []
+        for template in step.template_list:
+            task = tasks.get(template.pk)
+            state = None
+            if task:
+                state = 'completed' if task.completed else 'blocked' if task.pending_dependencies else 'unlocked'
+                if state != 'completed':
+                    tree[state] += 1
+            row = rows_by_template[template.pk] = {'template': template, 'task': task, 'state': state}
+            if state == 'unlocked' and len(tree['next_tasks']) < NEXT_TASKS_LIMIT:
+                tree['next_tasks'].append(row)
+            rows.append(row)
+        # To samo źródło co stan wiersza i liczniki członkostwa (OnboardingTask.completed), nie status
+        completed = sum(1 for row in rows if row['state'] == 'completed')
+        tree['steps'].append({'step': step, 'rows': rows, 'completed': completed, 'total': len(rows)})
+        tree['completed'] += completed
+        tree['total'] += len(rows)
+
+    # Tytuły blokujących zadań - tylko do wyświetlenia, stan bierze się z licznika
+    for row in rows_by_template.values():
+        row['blocked_by'] = []
+        if row['state'] != 'blocked':
+            continue
+        for dependency in row['template'].depends_on or []:
+            required = rows_by_template.get(dependency) if isinstance(dependency, int) else None
+            if required and required['state'] != 'completed':
+                row['blocked_by'].append(required['template'].title)
+    return tree
@@ -0,0 +1,72 @@
+"""
+Paginacja keyset (seek) dla list zadań.
+
+Zamiast OFFSET filtrujemy po ostatnim widzianym kluczu (date, time, pk), więc koszt
+strony jest stały niezależnie od głębokości - baza schodzi po indeksie od kursora.
+Kursor to nieprzezroczysty token base64 z kluczem ostatniego wiersza strony.
+"""
+import base64
+import datetime
+from typing import List, Optional, Tuple
+
+from django.db.models import Q
+
+TASK_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+TASK_ORDERING = ('date', 'time', 'pk')
+
+
+class KeysetPage:
+    def __init__(self, items: List, next_cursor: Optional[str]):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(task) -> str:
+    raw = f'{task.date.isoformat()}|{task.time.isoformat()}|{task.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime.date, datetime.time, int]]:
+    """Zwraca (date, time, pk) albo None dla pustego lub uszkodzonego kursora (= pierwsza strona)."""
+    if not cursor:
+        return None
+    try:
+        day, time, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.date.fromisoformat(day), datetime.time.fromisoformat(time), int(pk)
+    except ValueError:
+        return None
+
+
+def page_size_from(value, default: int = TASK_PAGE_SIZE) -> int:
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return default
+
+
+def keyset_paginate(queryset, cursor: Optional[str], page_size: int = TASK_PAGE_SIZE) -> KeysetPage:
+    """Strona zadań po kursorze, posortowana po (date, time, pk); pobiera page_size + 1 wierszy."""
+    queryset = queryset.order_by(*TASK_ORDERING)
+    key = decode_cursor(cursor)
+    if key:
+        day, time, pk = key
+        queryset = queryset.filter(
+            Q(date__gt=day) | Q(date=day, time__gt=time) | Q(date=day, time=time, pk__gt=pk)
+        )
+
+    items = list(queryset[:page_size + 1])
+    has_next = len(items) > page_size
+    items = items[:page_size]
+    return KeysetPage(items, encode_cursor(items[-1]) if has_next else None)
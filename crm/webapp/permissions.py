@@ -0,0 +1,85 @@
+"""
+Cache uprawnień projektowych użytkownika.
+
+Członkostwa zalogowanego użytkownika ({project_id: is_admin}) ładowane są jednym
+zapytaniem, trzymane na obiekcie żądania i w sesji (PROJECT_PERMISSIONS_SESSION_TTL
+sekund). Wpis w sesji jest ważny tylko dla bieżącej wersji członkostw zapisanej w bazie
+(UserProfile.memberships_version) - każda zmiana ProjectMembership (sygnały, ścieżki
+zbiorcze) ustawia nową wersję w tej samej transakcji, więc odebranie uprawnień działa
+od razu we wszystkich procesach. Wersję czytamy z profilu ładowanego i tak raz na żądanie.
+"""
+import time
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+
+from webapp.context_processors import get_user_profile
+from webapp.models import Project, ProjectMembership, UserProfile
+
+SESSION_KEY = '_project_memberships'
+
+
+def bump_memberships_version(user_ids: Iterable[int]):
+    """Unieważnia zapamiętane członkostwa podanych użytkowników (w bieżącej transakcji)."""
+    # time_ns - wersja nie wraca do wartości, z którą mogła zostać zapisana stara sesja
+    UserProfile.objects.filter(user_id__in=list(user_ids)).update(memberships_version=time.time_ns())
+
+
+def get_project_memberships(request) -> Dict[int, bool]:
+    """{project_id: is_admin} dla zalogowanego użytkownika - z żądania, sesji albo jednym zapytaniem."""
+    if hasattr(request, '_project_memberships'):
+        return request._project_memberships
+    user = request.user
+    if not user.is_authenticated:
+        return {}
+
+    version = get_user_profile(request).memberships_version
+    ttl = getattr(settings, 'PROJECT_PERMISSIONS_SESSION_TTL', 300)
+    cached = request.session.get(SESSION_KEY)
+    if (cached and cached['user_id'] == user.pk and cached['version'] == version
+            and time.time() - cached['loaded_at'] < ttl):
+        # Sesja serializowana jest do JSON - klucze słownika wracają jako napisy
+        memberships = {int(project_id): is_admin for project_id, is_admin in cached['projects'].items()}
+    else:
+        memberships = dict(ProjectMembership.objects.filter(user=user).values_list('project_id', 'is_admin'))
+        request.session[SESSION_KEY] = {
+            'user_id': user.pk,
+            'version': version,
+            'loaded_at': time.time(),
+            'projects': {str(project_id): is_admin for project_id, is_admin in memberships.items()},
+        }
+    request._project_memberships = memberships
+    return memberships
+
+
+def is_project_admin(request, project) -> bool:
+    """Czy zalogowany użytkownik jest adminem projektu (project albo jego ID)."""
+    project_id = getattr(project, 'pk', project)
+    return get_project_memberships(request).get(int(project_id), False)
+
+
+def project_admin_required(view_func: Optional[Callable] = None, *, on_denied: Optional[Callable] = None):
+    """
+    Dekorator widoków z argumentem project_id: wpuszcza tylko adminów projektu.
+
+    Nieistniejący projekt daje 404; on_denied(request, project_id) zwraca odpowiedź dla
+    pozostałych, domyślnie PermissionDenied (403).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            project_id = kwargs['project_id']
+            if not is_project_admin(request, project_id):
+                # Admin ma członkostwo, więc projekt istnieje - sprawdzamy tylko przy odmowie
+                if not Project.objects.filter(pk=project_id).exists():
+                    raise Http404
+                if on_denied is not None:
+                    return on_denied(request, project_id)
+                raise PermissionDenied
+            return func(request, *args, **kwargs)
+        return wrapper
+
+    return decorator(view_func) if view_func is not None else decorator
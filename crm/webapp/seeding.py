@@ -0,0 +1,204 @@
+"""
+Generator danych syntetycznych w skali produkcyjnej (komenda seed_load, benchmarki, testy budżetów zapytań).
+
+Wszystko jest wstawiane zbiorczo (bulk_create / bulk_insert_tasks), a liczniki, rollupy
+i cache statystyk są aktualizowane raz na końcu - sygnały per wiersz nie są wywoływane.
+Generator jest deterministyczny dla danego seed, więc wyniki benchmarków da się porównywać.
+"""
+import datetime
+import random
+from typing import Dict, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from webapp.models import (
+    Contact, DocumentSource, OnboardingStep, OnboardingTaskTemplate, Project, ProjectMembership, ProjectRole,
+    ProjectTask, UserProfile
+)
+from webapp.onboarding_service import BATCH_SIZE, assign_onboarding_tasks, bulk_insert_tasks, refresh_onboarding_rollup
+from webapp.permissions import bump_memberships_version
+from webapp.stats_cache import bump_stats_generation
+from webapp.task_rollups import rebuild_daily_rollups
+
+DEFAULT_VOLUMES = {
+    'users': 50,
+    'projects': 5,
+    'roles_per_project': 3,
+    'steps_per_role': 4,
+    'templates_per_step': 5,
+    'members_per_project': 20,
+    'tasks_per_project': 100,
+    'documents_per_project': 5,
+    'contacts': 10,
+}
+
+SEED_PASSWORD = 'seed-password'
+START_DATE = datetime.date(2024, 1, 1)
+
+
+def scaled_volumes(factor: int, base: Optional[Dict] = None) -> Dict:
+    """Skaluje liczności wierszy; struktura onboardingu (kroki, szablony) rośnie wolniej niż wolumen."""
+    base = base or DEFAULT_VOLUMES
+    volumes = {key: value * factor for key, value in base.items()}
+    for key in ('roles_per_project', 'steps_per_role', 'templates_per_step'):
+        volumes[key] = base[key] + factor - 1
+    return volumes
+
+
+def seed_dataset(volumes: Optional[Dict] = None, prefix: str = 'seed', seed: int = 0, admin: Optional[User] = None,
+                 batch_size: int = BATCH_SIZE, progress=None) -> Dict:
+    """
+    Generuje użytkowników, projekty, role, kroki, szablony, członkostwa, zadania onboardingowe,
+    zadania projektowe, dokumenty i kontakty. Nazwy zaczynają się od prefix, żeby dało się je
+    odróżnić (i usunąć przez flush_dataset).
+
+    admin (opcjonalnie) dostaje członkostwo z uprawnieniami admina w każdym projekcie.
+    Zwraca liczbę utworzonych wierszy per model.
+    """
+    volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+    volumes['members_per_project'] = min(volumes['members_per_project'], volumes['users'])
+    volumes['contacts'] = min(volumes['contacts'], volumes['users'])
+    rng = random.Random(seed)
+    report = progress or (lambda stage, count: None)
+    counts = {}
+
+    with transaction.atomic():
+        password = make_password(SEED_PASSWORD)
+        users = User.objects.bulk_create(
+            [
+                User(username=f'{prefix}_user{i}', email=f'{prefix}_user{i}@example.com', password=password)
+                for i in range(volumes['users'])
+            ],
+            batch_size=batch_size,
+        )
+        UserProfile.objects.bulk_create([UserProfile(user=user) for user in users], batch_size=batch_size)
+        counts['users'] = len(users)
+        report('users', len(users))
+
+        Contact.objects.bulk_create(
+            [
+                Contact(
+                    user=user, first_name=f'First{i}', last_name=f'Last{i}', email=user.email,
+                    phone=f'+48 600 {i:06d}', address=f'Street {i}', city='Warsaw', province='Mazowieckie',
+                    country='Poland',
+                )
+                for i, user in enumerate(users[:volumes['contacts']])
+            ],
+            batch_size=batch_size,
+        )
+        counts['contacts'] = volumes['contacts']
+
+        projects = Project.objects.bulk_create(
+            [
+                Project(name=f'{prefix} project {p}', description=f'Seeded project {p}', creator=admin)
+                for p in range(volumes['projects'])
+            ],
+            batch_size=batch_size,
+        )
+        counts['projects'] = len(projects)
+
+        roles = ProjectRole.objects.bulk_create(
+            [
+                ProjectRole(project=project, name=f'Role {r}', description=f'Seeded role {r}')
+                for project in projects
+                for r in range(volumes['roles_per_project'])
+            ],
+            batch_size=batch_size,
+        )
+        steps = OnboardingStep.objects.bulk_create(
+            [
+                OnboardingStep(role=role, title=f'Step {s}', description='', order=s)
+                for role in roles
+                for s in range(volumes['steps_per_role'])
+            ],
+            batch_size=batch_size,
+        )
+        templates = OnboardingTaskTemplate.objects.bulk_create(
+            [
+                OnboardingTaskTemplate(step=step, title=f'{step.title} task {t}', description='Seeded template')
+                for step in steps
+                for t in range(volumes['templates_per_step'])
+            ],
+            batch_size=batch_size,
+        )
+        counts.update({'roles': len(roles), 'steps': len(steps), 'templates': len(templates)})
+        report('onboarding structure', len(templates))
+
+        roles_by_project = {}
+        for role in roles:
+            roles_by_project.setdefault(role.project_id, []).append(role)
+
+        memberships = []
+        for project in projects:
+            project_roles = roles_by_project.get(project.pk, [])
+            for user in rng.sample(users, volumes['members_per_project']):
+                memberships.append(ProjectMembership(
+                    user=user, project=project,
+                    role=rng.choice(project_roles) if project_roles else None,
+                    is_admin=rng.random() < 0.05,
+                ))
+            if admin is not None:
+                memberships.append(ProjectMembership(
+                    user=admin, project=project, role=project_roles[0] if project_roles else None, is_admin=True,
+                ))
+        memberships = ProjectMembership.objects.bulk_create(memberships, batch_size=batch_size)
+        membership_ids = [membership.pk for membership in memberships]
+        counts['memberships'] = len(memberships)
+        counts['onboarding_tasks'] = assign_onboarding_tasks(membership_ids, batch_size=batch_size)
+        report('memberships', len(memberships))
+
+        members_by_project = {}
+        for membership in memberships:
+            members_by_project.setdefault(membership.project_id, []).append(membership.user_id)
+
+        statuses = [choice for choice, _ in ProjectTask.TaskStatus.choices]
+        tasks = [
+            ProjectTask(
+                title=f'Task {p}.{t}', description='Seeded task',
+                assigned_to_id=rng.choice(members_by_project.get(project.pk) or [users[0].pk]),
+                status=rng.choice(statuses),
+                project=project,
+                date=START_DATE + datetime.timedelta(days=rng.randrange(365)),
+                time=datetime.time(rng.randrange(8, 18), rng.choice((0, 15, 30, 45))),
+                duration=rng.randint(1, 8),
+            )
+            for p, project in enumerate(projects)
+            for t in range(volumes['tasks_per_project'])
+        ]
+        bulk_insert_tasks(ProjectTask, tasks, batch_size)
+        counts['project_tasks'] = len(tasks)
+        report('project tasks', len(tasks))
+
+        documents = DocumentSource.objects.bulk_create(
+            [
+                DocumentSource(
+                    project=project, title=f'Document {d}', content='Seeded document. ' * 50, doc_type='txt',
+                    uploaded_by=admin,
+                    ai_generation_status=rng.choice([choice for choice, _ in DocumentSource.AI_STATUS_CHOICES]),
+                )
+                for project in projects
+                for d in range(volumes['documents_per_project'])
+            ],
+            batch_size=batch_size,
+        )
+        counts['documents'] = len(documents)
+
+        # Agregaty, których sygnały nie policzyły przy wstawieniach zbiorczych
+        refresh_onboarding_rollup(membership_ids, batch_size=batch_size)
+        for project in projects:
+            rebuild_daily_rollups(project_id=project.pk, batch_size=batch_size)
+        bump_stats_generation()
+        bump_memberships_version({membership.user_id for membership in memberships})
+
+    return counts
+
+
+def flush_dataset(prefix: str) -> int:
+    """Usuwa dane wygenerowane z danym prefiksem (projekty kaskadowo, potem użytkownicy)."""
+    with transaction.atomic():
+        deleted, _ = Project.objects.filter(name__startswith=f'{prefix} project ').delete()
+        users_deleted, _ = User.objects.filter(username__startswith=f'{prefix}_user').delete()
+        bump_stats_generation()
+    return deleted + users_deleted
@@ -1,7 +1,13 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
+from django.db.models import QuerySet
 from django.contrib.auth.models import User
-from webapp.models import UserProfile, ProjectMembership, OnboardingTaskTemplate, OnboardingTask, OnboardingStep, Project
+from webapp.models import UserProfile, ProjectMembership, ProjectRole, OnboardingTaskTemplate, OnboardingTask, OnboardingStep, Project, ProjectTask, OnboardingStatsRollup
+from webapp.onboarding_dag import bump_graph_version, get_role_graph, schedule_dependency_refresh
+from webapp.onboarding_service import assign_onboarding_tasks, apply_progress_delta, refresh_onboarding_rollup
+from webapp.permissions import bump_memberships_version
+from webapp.stats_cache import bump_stats_generation
+from webapp.task_rollups import apply_daily_delta
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -26,18 +32,128 @@ def make_creator_admin(sender, instance, created, **kwargs):
 @receiver(post_save, sender=ProjectMembership)
 def create_onboarding_tasks_for_new_member(sender, instance, created, **kwargs):
     if created and instance.role:
-        step_templates = OnboardingTaskTemplate.objects.filter(step__role=instance.role)
-        for template in step_templates:
-            # Zabezpieczenie przed duplikatami
-            exists = OnboardingTask.objects.filter(
-                membership=instance,
-                template=template
-            ).exists()
-            if not exists:
-                OnboardingTask.objects.create(
-                    title=template.title,
-                    description=template.description,
-                    assigned_to=instance.user,
-                    membership=instance,
-                    template=template,
-                )
\ No newline at end of file
+        # Zbiorczo, z pominięciem już istniejących zadań (anti-join)
+        assign_onboarding_tasks([instance.pk])
+
+@receiver(post_save, sender=ProjectMembership)
+def refresh_membership_stats_rollup(sender, instance, **kwargs):
+    refresh_onboarding_rollup([instance.pk])
+
+# Nazwy w rollupie są kopiami - zmiana nazwy albo usunięcie roli poprawia je od razu, bez czekania na komendę
+@receiver(post_save, sender=User)
+def rename_user_in_stats_rollup(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (update_fields is None or 'username' in update_fields):
+        OnboardingStatsRollup.objects.filter(membership__user=instance).exclude(username=instance.username).update(
+            username=instance.username
+        )
+
+@receiver(post_save, sender=Project)
+def rename_project_in_stats_rollup(sender, instance, created, **kwargs):
+    if not created:
+        OnboardingStatsRollup.objects.filter(project=instance).exclude(project_name=instance.name).update(
+            project_name=instance.name
+        )
+
+@receiver(post_save, sender=ProjectRole)
+def rename_role_in_stats_rollup(sender, instance, created, **kwargs):
+    if not created:
+        OnboardingStatsRollup.objects.filter(role=instance).exclude(role_name=instance.name).update(
+            role_name=instance.name
+        )
+
+@receiver(pre_delete, sender=ProjectRole)
+def clear_role_in_stats_rollup(sender, instance, origin=None, **kwargs):
+    # pre_delete: po usunięciu FK rollupu jest już wyzerowany (SET_NULL) i nie da się znaleźć wierszy roli
+    if _deleted_along_with(origin, Project):
+        return
+    OnboardingStatsRollup.objects.filter(role=instance).update(role_name=None)
+
+@receiver(post_save, sender=OnboardingTask)
+def count_new_onboarding_task(sender, instance, created, **kwargs):
+    # Zbiorcze wstawienia (bulk_create_onboarding_tasks) aktualizują liczniki same
+    if created:
+        apply_progress_delta([instance.membership_id], total=1, completed=int(instance.completed))
+
+def _deleted_along_with(origin, *models):
+    """Czy usuwanie kaskadowe zaczęło się od jednego z models (origin to instancja albo QuerySet)."""
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model in models
+
+@receiver(post_delete, sender=OnboardingTask)
+def uncount_deleted_onboarding_task(sender, instance, origin=None, **kwargs):
+    # Przy kasowaniu członkostwa (projektu, użytkownika) liczniki i rollup znikają razem z nim
+    if _deleted_along_with(origin, ProjectMembership, Project, User):
+        return
+    apply_progress_delta([instance.membership_id], total=-1, completed=-int(instance.completed))
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=ProjectTask)
+@receiver(post_delete, sender=ProjectTask)
+@receiver(post_save, sender=OnboardingTask)
+@receiver(post_delete, sender=OnboardingTask)
+def invalidate_statistics_cache(sender, **kwargs):
+    bump_stats_generation()
+
+@receiver(post_save, sender=User)
+def invalidate_statistics_cache_on_rename(sender, instance, created, update_fields=None, **kwargs):
+    # Agregat per organizator pokazuje username; logowanie zapisuje samo last_login
+    if not created and (update_fields is None or 'username' in update_fields):
+        bump_stats_generation()
+
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def invalidate_project_permissions(sender, instance, **kwargs):
+    bump_memberships_version([instance.user_id])
+
+@receiver(pre_save, sender=OnboardingTaskTemplate)
+def remember_previous_dependencies(sender, instance, **kwargs):
+    instance._previous_dependencies = None
+    if instance.pk:
+        instance._previous_dependencies = OnboardingTaskTemplate.objects.filter(pk=instance.pk).values_list(
+            'step_id', 'depends_on'
+        ).first()
+
+@receiver(post_save, sender=OnboardingTaskTemplate)
+def invalidate_dependency_graph_on_save(sender, instance, created, **kwargs):
+    bump_graph_version()
+    # Nowy szablon dostają członkowie przy propagacji (ona przelicza liczniki); tu tylko zmiana zależności
+    previous = getattr(instance, '_previous_dependencies', None)
+    if not created and previous != (instance.step_id, instance.depends_on):
+        schedule_dependency_refresh(instance.step.role_id)
+
+@receiver(pre_delete, sender=OnboardingTaskTemplate)
+def invalidate_dependency_graph_on_delete(sender, instance, origin=None, **kwargs):
+    # pre_delete: graf i krok są jeszcze w bazie (także przy kasowaniu kaskadowym)
+    if not _deleted_along_with(origin, ProjectRole, Project):
+        role_id = OnboardingStep.objects.filter(pk=instance.step_id).values_list('role_id', flat=True).first()
+        # Liczniki trzeba poprawić tylko, jeśli coś zależało od usuniętego szablonu
+        if role_id and get_role_graph(role_id).dependents.get(instance.pk):
+            schedule_dependency_refresh(role_id)
+    # Dopiero po odczycie - graf zbudowany powyżej (jeszcze z usuwanym szablonem) zostaje pod starą wersją
+    bump_graph_version()
+
+@receiver(pre_save, sender=ProjectTask)
+def remember_previous_task_bucket(sender, instance, **kwargs):
+    # Stary (projekt, osoba, dzień, duration) - żeby post_save odjął go z właściwego rollupu
+    instance._previous_rollup_bucket = None
+    if instance.pk:
+        instance._previous_rollup_bucket = ProjectTask.objects.filter(pk=instance.pk).values_list(
+            'project_id', 'assigned_to_id', 'date', 'duration'
+        ).first()
+
+@receiver(post_save, sender=ProjectTask)
+def update_daily_rollup_on_save(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_rollup_bucket', None)
+    current = (instance.project_id, instance.assigned_to_id, instance.date, instance.duration)
+    if previous == current:
+        return
+    if previous:
+        project_id, assigned_to_id, day, duration = previous
+        apply_daily_delta(project_id, assigned_to_id, day, -1, -duration)
+    apply_daily_delta(instance.project_id, instance.assigned_to_id, instance.date, 1, instance.duration)
+
+@receiver(post_delete, sender=ProjectTask)
+def update_daily_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    if _deleted_along_with(origin, Project, User):
+        return
+    apply_daily_delta(instance.project_id, instance.assigned_to_id, instance.date, -1, -instance.duration)
@@ -1,20 +1,226 @@
+"""
+Wyszukiwanie artystów w Spotify.
+
+Klient spotipy jest jeden na proces: token client-credentials trzymany jest w pamięci
+do wygaśnięcia, a token i wyszukiwania idą przez wspólną requests.Session (pula
+połączeń keep-alive). Wyniki trafiają do cache TTL + LRU kluczowanego znormalizowaną
+nazwą, więc powtórne wyszukiwanie nie robi żadnego zapytania sieciowego.
+
+Podpowiedzi (typeahead) mają osobny, krótszy cache, a równoczesne identyczne zapytania
+w procesie są łączone w jedno wywołanie Spotify (SingleFlight).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import requests
 import spotipy
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from spotipy.cache_handler import MemoryCacheHandler
 from spotipy.oauth2 import SpotifyClientCredentials
-import os
-
-def get_spotify_client():
-    client_id = os.environ.get('SPOTIFY_CLIENT_ID')
-    client_secret = os.environ.get('SPOTIFY_CLIENT_SECRET')
-    client_credentials_manager = SpotifyClientCredentials(client_id=client_id, client_secret=client_secret)
-    sp = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
-    return sp
-
-def get_artist_info(artist_name):
-    sp = get_spotify_client()
-    
-    results = sp.search(q='artist:' + artist_name, type='artist')
-    items = results['artists']['items']
-    if len(items) > 0:
-        return items[0]  # Returns the first matching artist
-    else:
+from urllib3.util.retry import Retry
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Słownik z czasem życia wpisów i limitem rozmiaru (najdawniej używane wypadają pierwsze)."""
+
+    def __init__(self, ttl: float, max_size: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (self.clock() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+artist_cache = TTLCache(
+    ttl=getattr(settings, 'SPOTIFY_CACHE_TTL', 3600),
+    max_size=getattr(settings, 'SPOTIFY_CACHE_SIZE', 512),
+)
+suggestion_cache = TTLCache(
+    ttl=getattr(settings, 'SPOTIFY_TYPEAHEAD_CACHE_TTL', 300),
+    max_size=getattr(settings, 'SPOTIFY_CACHE_SIZE', 512),
+)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Łączy równoczesne wywołania z tym samym kluczem: liczy pierwsze, pozostałe czekają na jego wynik."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[str, _Call] = {}
+
+    def do(self, key, func: Callable):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+
+_suggestion_flight = SingleFlight()
+
+_client = None
+_client_config = None
+_client_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    # Te same ponowienia co domyślnie w spotipy (429/5xx), ale z pulą współdzieloną przez token i API
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=False)
+    adapter = HTTPAdapter(max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_spotify_client() -> spotipy.Spotify:
+    """Współdzielony klient; tworzony od nowa tylko po zmianie konfiguracji (np. override_settings w testach)."""
+    global _client, _client_config
+    config = (
+        settings.SPOTIFY_CLIENT_ID,
+        settings.SPOTIFY_CLIENT_SECRET,
+        settings.SPOTIFY_TOKEN_URL,
+        settings.SPOTIFY_API_URL,
+        settings.SPOTIFY_TIMEOUT,
+    )
+    with _client_lock:
+        if _client is None or _client_config != config:
+            client_id, client_secret, token_url, api_url, timeout = config
+            session = _build_session()
+            credentials = SpotifyClientCredentials(
+                client_id=client_id,
+                client_secret=client_secret,
+                requests_session=session,
+                requests_timeout=timeout,
+                # Domyślny CacheFileHandler zapisuje token do pliku .cache w katalogu roboczym
+                cache_handler=MemoryCacheHandler(),
+            )
+            credentials.OAUTH_TOKEN_URL = token_url
+            client = spotipy.Spotify(
+                client_credentials_manager=credentials,
+                requests_session=session,
+                requests_timeout=timeout,
+            )
+            client.prefix = api_url if api_url.endswith('/') else api_url + '/'
+            _client, _client_config = client, config
+        return _client
+
+
+def normalize_artist_name(artist_name: str) -> str:
+    return ' '.join((artist_name or '').split()).casefold()
+
+
+def get_artist_info(artist_name) -> Optional[dict]:
+    """Pierwszy artysta pasujący do nazwy (albo None); wyniki, również puste, są cache'owane."""
+    key = normalize_artist_name(artist_name)
+    if not key:
         return None
+
+    artist = artist_cache.get(key, _MISSING)
+    if artist is _MISSING:
+        results = get_spotify_client().search(q='artist:' + key, type='artist')
+        items = results['artists']['items']
+        artist = items[0] if items else None  # Returns the first matching artist
+        artist_cache.set(key, artist)
+    return artist
+
+
+def _suggestion(artist: dict) -> dict:
+    images = artist.get('images') or []
+    return {
+        'id': artist.get('id'),
+        'name': artist.get('name'),
+        'genres': (artist.get('genres') or [])[:3],
+        'followers': (artist.get('followers') or {}).get('total'),
+        'image': images[-1]['url'] if images else None,  # najmniejszy obrazek wystarcza na listę
+        'url': (artist.get('external_urls') or {}).get('spotify'),
+    }
+
+
+def _fetch_suggestions(key: str) -> List[dict]:
+    cached = suggestion_cache.get(key)
+    if cached is not None:  # poprzedni lider zdążył już zapisać wynik
+        return cached
+    results = get_spotify_client().search(q=key, type='artist', limit=settings.SPOTIFY_TYPEAHEAD_LIMIT)
+    suggestions = [_suggestion(artist) for artist in results['artists']['items']]
+    suggestion_cache.set(key, suggestions)
+    return suggestions
+
+
+def cached_artist_suggestions(query: str) -> Optional[List[dict]]:
+    """Podpowiedzi z cache (bez sieci) albo None, jeśli trzeba pytać Spotify."""
+    key = normalize_artist_name(query)
+    if len(key) < settings.SPOTIFY_TYPEAHEAD_MIN_CHARS:
+        return []
+    return suggestion_cache.get(key)
+
+
+def search_artists(query: str, limit: Optional[int] = None) -> List[dict]:
+    """
+    Do SPOTIFY_TYPEAHEAD_LIMIT artystów pasujących do (początku) nazwy, w kolejności trafności Spotify.
+
+    Zbyt krótkie zapytania zwracają pustą listę bez wywołania API.
+    """
+    limit = min(limit or settings.SPOTIFY_TYPEAHEAD_LIMIT, settings.SPOTIFY_TYPEAHEAD_LIMIT)
+    key = normalize_artist_name(query)
+    if len(key) < settings.SPOTIFY_TYPEAHEAD_MIN_CHARS:
+        return []
+    suggestions = suggestion_cache.get(key)
+    if suggestions is None:
+        suggestions = _suggestion_flight.do(key, lambda: _fetch_suggestions(key))
+    return suggestions[:limit]
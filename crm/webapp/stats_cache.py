@@ -0,0 +1,58 @@
+"""
+Cache agregatów dashboardu statystyk.
+
+Klucz = (generacja danych, krotka filtrów). Każdy zapis ProjectTask / OnboardingTask
+(i zmiana nazw pokazywanych w agregatach) ustawia nową generację, więc stare wpisy
+przestają być adresowane i wygasają same - nie trzeba szukać ani kasować kluczy
+pasujących do filtrów. Generacja leży w bazie (webapp.cache_versions), więc zapis
+w jednym workerze unieważnia agregaty we wszystkich.
+"""
+import hashlib
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from webapp.cache_versions import bump_cache_version, get_cache_version
+
+GENERATION_KEY = 'stats:generation'
+
+
+def get_stats_generation() -> int:
+    return get_cache_version(GENERATION_KEY)
+
+
+def _bump():
+    bump_cache_version(GENERATION_KEY)
+
+
+def bump_stats_generation():
+    """
+    Unieważnia wszystkie zapisane agregaty.
+
+    Podbicie następuje po commicie - inaczej równoległe żądanie mogłoby policzyć jeszcze
+    stare dane i zapisać je pod nową generacją.
+    """
+    transaction.on_commit(_bump)
+
+
+def stats_cache_key(name: str, filters: Tuple, generation: Optional[int] = None) -> str:
+    if generation is None:
+        generation = get_stats_generation()
+    digest = hashlib.md5(repr(filters).encode()).hexdigest()
+    return f'stats:{generation}:{name}:{digest}'
+
+
+def cached_stats(name: str, filters: Tuple, compute: Callable, generation: Optional[int] = None):
+    """
+    Zwraca wynik compute() z cache dla danej generacji i filtrów (liczy przy braku).
+
+    Widok liczący kilka agregatów czyta generację raz i przekazuje ją każdemu wywołaniu.
+    """
+    key = stats_cache_key(name, filters, generation)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, settings.STATS_CACHE_TIMEOUT)
+    return value
@@ -0,0 +1,117 @@
+"""
+Dzienne rollupy zadań projektowych (projekt, osoba, dzień) -> liczba zadań i suma duration.
+
+Tabela jest utrzymywana przyrostowo przez sygnały ProjectTask (apply_daily_delta), a
+rebuild_daily_rollups przelicza ją od zera dla zakresu (komenda backfill_task_rollups).
+Szeregi czasowe czytamy z rollupu, więc koszt zależy od liczby dni, a nie zadań.
+"""
+from typing import Dict, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from webapp.models import ProjectTask, ProjectTaskDailyRollup
+
+BATCH_SIZE = 1000
+
+BUCKETS = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def apply_daily_delta(project_id: int, assigned_to_id: int, day, count: int, duration: int):
+    """Przesuwa liczniki jednego dnia; brakujący wiersz jest tworzony, wyzerowany - usuwany."""
+    if not count and not duration:
+        return
+    rollups = ProjectTaskDailyRollup.objects.filter(project_id=project_id, assigned_to_id=assigned_to_id, day=day)
+    with transaction.atomic():
+        updated = rollups.update(
+            task_count=F('task_count') + count,
+            total_duration=F('total_duration') + duration,
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    ProjectTaskDailyRollup.objects.create(
+                        project_id=project_id, assigned_to_id=assigned_to_id, day=day,
+                        task_count=count, total_duration=duration,
+                    )
+            except IntegrityError:
+                # Równoległy zapis utworzył wiersz pomiędzy UPDATE a INSERT
+                rollups.update(
+                    task_count=F('task_count') + count,
+                    total_duration=F('total_duration') + duration,
+                )
+        if count < 0:
+            rollups.filter(task_count__lte=0).delete()
+
+
+def rebuild_daily_rollups(project_id: Optional[int] = None, start_date=None, end_date=None,
+                          batch_size: int = BATCH_SIZE) -> int:
+    """Przelicza rollupy z surowych ProjectTask dla zakresu; zwraca liczbę zapisanych wierszy."""
+    tasks = ProjectTask.objects.all()
+    rollups = ProjectTaskDailyRollup.objects.all()
+    if project_id:
+        tasks = tasks.filter(project_id=project_id)
+        rollups = rollups.filter(project_id=project_id)
+    if start_date:
+        tasks = tasks.filter(date__gte=start_date)
+        rollups = rollups.filter(day__gte=start_date)
+    if end_date:
+        tasks = tasks.filter(date__lte=end_date)
+        rollups = rollups.filter(day__lte=end_date)
+
+    rows = tasks.values('project_id', 'assigned_to_id', 'date').annotate(
+        task_count=Count('pk'),
+        total_duration=Sum('duration'),
+    ).order_by()
+
+    with transaction.atomic():
+        rollups.delete()
+        created = ProjectTaskDailyRollup.objects.bulk_create(
+            [
+                ProjectTaskDailyRollup(
+                    project_id=row['project_id'],
+                    assigned_to_id=row['assigned_to_id'],
+                    day=row['date'],
+                    task_count=row['task_count'],
+                    total_duration=row['total_duration'] or 0,
+                )
+                for row in rows
+            ],
+            batch_size=batch_size,
+        )
+    return len(created)
+
+
+def task_time_series(bucket: str = 'day', params=None) -> List[Dict]:
+    """
+    Szereg czasowy liczby zadań i sumy duration, zagregowany do dnia / tygodnia / miesiąca.
+
+    params to te same filtry co w statistics_dashboard (project, organizer, start_date, end_date).
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket: {bucket}")
+    params = params or {}
+
+    rollups = ProjectTaskDailyRollup.objects.all()
+    if params.get('project'):
+        rollups = rollups.filter(project_id=params['project'])
+    if params.get('organizer'):
+        rollups = rollups.filter(assigned_to_id=params['organizer'])
+    if params.get('start_date'):
+        rollups = rollups.filter(day__gte=params['start_date'])
+    if params.get('end_date'):
+        rollups = rollups.filter(day__lte=params['end_date'])
+
+    truncate = BUCKETS[bucket]
+    period = truncate('day') if truncate else F('day')
+    return list(
+        rollups.annotate(period=period).values('period').annotate(
+            task_count=Sum('task_count'),
+            total_duration=Sum('total_duration'),
+        ).order_by('period')
+    )
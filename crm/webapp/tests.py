@@ -1,10 +1,18 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
 from django.urls import reverse
+from django.utils import timezone
 from unittest.mock import patch, MagicMock
+import io
 import json
 
-from webapp.models import Project, ProjectRole, ProjectMembership, DocumentSource
+from webapp.models import (
+    Project, ProjectRole, ProjectMembership, DocumentSource, OnboardingStep, OnboardingTaskTemplate, OnboardingTask,
+    OnboardingTaskCompletion, OnboardingStatsRollup, ProjectTask, ProjectTaskDailyRollup, CacheVersion,
+)
+from webapp.cache_versions import bump_cache_version
 from webapp.llm_service import (
     generate_onboarding_draft,
     parse_llm_output,
@@ -12,6 +20,14 @@ from webapp.llm_service import (
     chunk_text,
     extract_text_from_document
 )
+from webapp.onboarding_dag import (
+    DependencyCycleError, bump_graph_version, get_graph_version, get_role_graph, resolve_draft_dependencies
+)
+from webapp.onboarding_service import (
+    TaskBlockedError, assign_onboarding_tasks, onboarding_dashboard_tree, reconcile_progress_counters,
+    set_onboarding_task_status,
+)
+from webapp.stats_cache import GENERATION_KEY, get_stats_generation
 
 
 class LLMServiceTests(TestCase):
@@ -227,3 +243,1555 @@ class LLMOnboardingViewsTests(TestCase):
         self.assertEqual(doc.project, self.project)
         self.assertEqual(doc.doc_type, 'txt')
         self.assertEqual(doc.content, 'This is test document content.')
+
+
+class BulkMemberImportTests(TestCase):
+    """Test cases for bulk member import with batched onboarding assignment."""
+
+    def setUp(self):
+        """Set up a project with one role, one step and two task templates."""
+        from webapp.models import OnboardingStep, OnboardingTaskTemplate
+
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='testpass123'
+        )
+        self.project = Project.objects.create(
+            name='Cohort Project',
+            description='Bulk import project',
+            creator=self.admin
+        )
+        self.role = ProjectRole.objects.create(project=self.project, name='Backend Developer')
+        step = OnboardingStep.objects.create(role=self.role, title='Setup', order=1)
+        OnboardingTaskTemplate.objects.create(step=step, title='Install Docker')
+        OnboardingTaskTemplate.objects.create(step=step, title='Clone repo')
+        self.users = [
+            User.objects.create_user(username=f'member{i}', email=f'member{i}@example.com', password='x')
+            for i in range(5)
+        ]
+
+    def test_bulk_add_members_assigns_tasks(self):
+        """Every imported member gets one task per template of the role."""
+        from webapp.models import OnboardingTask
+        from webapp.onboarding_service import bulk_add_members
+
+        rows = [{'user': u, 'role': self.role, 'is_admin': False} for u in self.users]
+        result = bulk_add_members(self.project, rows, batch_size=2)
+
+        self.assertEqual(result['created_memberships'], 5)
+        self.assertEqual(result['created_tasks'], 10)
+        for user in self.users:
+            membership = ProjectMembership.objects.get(user=user, project=self.project)
+            self.assertEqual(
+                set(OnboardingTask.objects.filter(membership=membership).values_list('template__title', flat=True)),
+                {'Install Docker', 'Clone repo'}
+            )
+            self.assertEqual(OnboardingTask.objects.filter(membership=membership, assigned_to=user).count(), 2)
+
+    def test_bulk_add_members_skips_existing(self):
+        """Existing members and duplicated rows are skipped."""
+        from webapp.onboarding_service import bulk_add_members
+
+        ProjectMembership.objects.create(user=self.users[0], project=self.project, role=self.role)
+        rows = [{'user': u, 'role': self.role} for u in self.users] + [{'user': self.users[1], 'role': self.role}]
+        result = bulk_add_members(self.project, rows)
+
+        self.assertEqual(result['created_memberships'], 4)
+        self.assertEqual(sorted(result['skipped']), ['member0', 'member1'])
+
+    def test_read_member_rows_validates_in_memory(self):
+        """CSV rows are resolved to users and roles, unknown entries become errors."""
+        from webapp.onboarding_service import read_member_rows
+
+        csv_text = "username,role,is_admin\nmember0,backend developer,yes\nghost,,\nmember1,Designer,\n"
+        parsed = read_member_rows(csv_text, self.project)
+
+        self.assertEqual(len(parsed['rows']), 1)
+        self.assertEqual(parsed['rows'][0]['user'], self.users[0])
+        self.assertEqual(parsed['rows'][0]['role'], self.role)
+        self.assertTrue(parsed['rows'][0]['is_admin'])
+        self.assertEqual(len(parsed['errors']), 2)
+
+    def test_manage_projects_bulk_import_view(self):
+        """The manage_projects view imports a multi-selection of users."""
+        client = Client()
+        client.login(username='admin', password='testpass123')
+        response = client.post(reverse('manage_projects'), {
+            'action': 'bulk_add_members',
+            'project_id': self.project.id,
+            'users': [u.id for u in self.users[:3]],
+            'role': self.role.id,
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            ProjectMembership.objects.filter(project=self.project, role=self.role).count(), 3
+        )
+
+    def test_manage_projects_bulk_import_rejects_non_utf8_csv(self):
+        """A CSV that is not UTF-8 is reported as an error instead of crashing the view."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        client = Client()
+        client.login(username='admin', password='testpass123')
+        csv_file = SimpleUploadedFile('members.csv', 'username\nmember0,żółw\n'.encode('cp1250'), 'text/csv')
+        response = client.post(reverse('manage_projects'), {
+            'action': 'bulk_add_members',
+            'project_id': self.project.id,
+            'role': self.role.id,
+            'csv_file': csv_file,
+        }, follow=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            "Plik CSV musi być zakodowany w UTF-8.", [str(m) for m in response.context['messages']]
+        )
+        self.assertFalse(ProjectMembership.objects.filter(project=self.project, role=self.role).exists())
+
+
+class TemplatePropagationTests(TestCase):
+    """Test cases for propagating new templates to existing members."""
+
+    def setUp(self):
+        """Set up a role with existing members and assigned tasks."""
+        from webapp.models import OnboardingStep, OnboardingTaskTemplate
+
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='testpass123'
+        )
+        self.project = Project.objects.create(name='Propagation', description='Test', creator=self.admin)
+        self.role = ProjectRole.objects.create(project=self.project, name='Backend Developer')
+        self.step = OnboardingStep.objects.create(role=self.role, title='Setup', order=1)
+        self.first_template = OnboardingTaskTemplate.objects.create(step=self.step, title='Install Docker')
+        self.memberships = [
+            ProjectMembership.objects.create(
+                user=User.objects.create_user(username=f'member{i}', password='x'),
+                project=self.project,
+                role=self.role
+            )
+            for i in range(4)
+        ]
+
+    def test_propagation_adds_missing_and_keeps_progress(self):
+        """New templates reach existing members without touching completed tasks."""
+        from webapp.models import OnboardingTask, OnboardingTaskTemplate
+        from webapp.onboarding_service import propagate_role_templates
+
+        done = OnboardingTask.objects.get(membership=self.memberships[0], template=self.first_template)
+        done.completed = True
+        done.save()
+        OnboardingTaskTemplate.objects.create(step=self.step, title='Clone repo')
+
+        result = propagate_role_templates(self.role.id, batch_size=3)
+
+        self.assertEqual(result['created_tasks'], 4)
+        self.assertEqual(result['processed_memberships'], 4)
+        self.assertEqual(OnboardingTask.objects.filter(membership__role=self.role).count(), 8)
+        done.refresh_from_db()
+        self.assertTrue(done.completed)
+
+        # Ponowne uruchomienie niczego nie dubluje
+        self.assertEqual(propagate_role_templates(self.role.id)['created_tasks'], 0)
+
+    def test_propagation_resumes_after_membership(self):
+        """start_after skips memberships processed by an interrupted run."""
+        from webapp.models import OnboardingTaskTemplate
+        from webapp.onboarding_service import propagate_role_templates
+
+        OnboardingTaskTemplate.objects.create(step=self.step, title='Clone repo')
+        result = propagate_role_templates(self.role.id, start_after=self.memberships[1].id)
+
+        self.assertEqual(result['processed_memberships'], 2)
+        self.assertEqual(result['last_membership_id'], self.memberships[-1].id)
+
+    @override_settings(ONBOARDING_PROPAGATION_ASYNC=False)
+    def test_onboarding_setup_add_task_propagates(self):
+        """Adding a template in onboarding_setup assigns it to current members."""
+        from webapp.models import OnboardingTask
+
+        client = Client()
+        client.login(username='admin', password='testpass123')
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(reverse('onboarding_setup', kwargs={'project_id': self.project.id}), {
+                'add_task': '1',
+                'step': self.step.id,
+                'title': 'Read the docs',
+                'description': '',
+                'is_required': 'on',
+            })
+
+        self.assertEqual(OnboardingTask.objects.filter(template__title='Read the docs').count(), 4)
+
+
+class OnboardingMemberTestCase(TestCase):
+    """Base fixture: a member of a project role with onboarding task templates."""
+
+    def setUp(self):
+        """Set up the role's templates (create_templates) and add the member, which assigns the tasks."""
+        self.user = User.objects.create_user(username='member', password='testpass123')
+        self.project = Project.objects.create(name='Onboarding', description='Test')
+        self.role = ProjectRole.objects.create(project=self.project, name='Backend Developer')
+        self.create_templates()
+        self.membership = ProjectMembership.objects.create(user=self.user, project=self.project, role=self.role)
+
+    def create_templates(self):
+        self.step = OnboardingStep.objects.create(role=self.role, title='Setup', order=1)
+        OnboardingTaskTemplate.objects.create(step=self.step, title='Install Docker')
+        OnboardingTaskTemplate.objects.create(step=self.step, title='Clone repo')
+
+
+class RestartOnboardingTests(OnboardingMemberTestCase):
+    """Test cases for the set-based restart_onboarding."""
+
+    def setUp(self):
+        """Set up a member with one completed and one in-progress task."""
+        super().setUp()
+        tasks = OnboardingTask.objects.filter(membership=self.membership).order_by('id')
+        self.done_task, self.started_task = tasks
+        self.done_task.status = OnboardingTask.TaskStatus.COMPLETED
+        self.done_task.completed = True
+        self.done_task.completed_at = timezone.now()
+        self.done_task.save()
+        self.started_task.status = OnboardingTask.TaskStatus.IN_PROGRESS
+        self.started_task.save()
+
+    def test_restart_resets_in_place_and_archives(self):
+        """Tasks keep their IDs, completions are archived and new templates are added."""
+        OnboardingTaskTemplate.objects.create(step=self.step, title='Read the docs')
+        client = Client()
+        client.login(username='member', password='testpass123')
+        response = client.post(reverse('restart_onboarding', kwargs={'membership_id': self.membership.id}))
+
+        self.assertEqual(response.status_code, 302)
+        tasks = OnboardingTask.objects.filter(membership=self.membership)
+        self.assertEqual(tasks.count(), 3)
+        self.assertTrue(tasks.filter(pk=self.done_task.pk).exists())
+        self.assertFalse(tasks.filter(completed=True).exists())
+        self.assertEqual(set(tasks.values_list('status', flat=True)), {OnboardingTask.TaskStatus.TODO})
+
+        archived = OnboardingTaskCompletion.objects.get(membership=self.membership)
+        self.assertEqual(archived.title, 'Install Docker')
+        self.assertEqual(archived.completed_at, self.done_task.completed_at)
+
+
+class OnboardingProgressCounterTests(OnboardingMemberTestCase):
+    """Test cases for the denormalized progress counters on ProjectMembership."""
+
+    def setUp(self):
+        """Set up a member with two onboarding tasks."""
+        super().setUp()
+        self.client = Client()
+        self.client.login(username='member', password='testpass123')
+
+    def test_counters_follow_task_transitions(self):
+        """Completing and reopening tasks moves the counters and completed_at."""
+        self.membership.refresh_from_db()
+        self.assertEqual((self.membership.total_tasks, self.membership.completed_tasks), (2, 0))
+
+        first, second = OnboardingTask.objects.filter(membership=self.membership).order_by('id')
+        self.client.get(reverse('mark_task_complete', kwargs={'task_id': first.id}))
+        self.client.get(reverse('mark_task_complete', kwargs={'task_id': first.id}))
+        self.membership.refresh_from_db()
+        self.assertEqual(self.membership.completed_tasks, 1)
+        self.assertIsNone(self.membership.completed_at)
+
+        self.client.get(reverse('mark_task_complete', kwargs={'task_id': second.id}))
+        self.membership.refresh_from_db()
+        self.assertTrue(self.membership.is_onboarding_completed())
+        self.assertIsNotNone(self.membership.completed_at)
+
+        self.client.get(reverse('mark_task_in_progress', kwargs={'task_id': second.id}))
+        self.membership.refresh_from_db()
+        self.assertEqual(self.membership.completed_tasks, 1)
+        self.assertFalse(self.membership.is_onboarding_completed())
+        self.assertIsNone(self.membership.completed_at)
+
+    def test_reconcile_fixes_drift(self):
+        """reconcile_progress_counters restores counters from the task rows."""
+        OnboardingTask.objects.filter(membership=self.membership).update(completed=True)
+        ProjectMembership.objects.filter(pk=self.membership.pk).update(total_tasks=7, completed_tasks=0)
+
+        self.assertEqual(reconcile_progress_counters(), 2)
+        self.membership.refresh_from_db()
+        self.assertEqual((self.membership.total_tasks, self.membership.completed_tasks), (2, 2))
+        self.assertIsNotNone(self.membership.completed_at)
+        self.assertEqual(reconcile_progress_counters(), 0)
+
+
+class OnboardingStatsRollupTests(OnboardingMemberTestCase):
+    """Test cases for the materialized onboarding statistics rollup."""
+
+    def setUp(self):
+        """Set up two projects with members in different roles."""
+        super().setUp()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        self.other_project = Project.objects.create(name='Beta', description='Test')
+        ProjectMembership.objects.create(user=self.admin, project=self.other_project)
+
+    def test_rollup_follows_task_transitions(self):
+        """Completing a task updates the rollup row of the membership."""
+        rollup = OnboardingStatsRollup.objects.get(membership=self.membership)
+        self.assertEqual((rollup.total_tasks, rollup.completed_tasks, rollup.role_name), (2, 0, 'Backend Developer'))
+
+        task = OnboardingTask.objects.filter(membership=self.membership).first()
+        set_onboarding_task_status(task, OnboardingTask.TaskStatus.COMPLETED)
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.completed_tasks, 1)
+        self.assertEqual(rollup.completion_percent, 50.0)
+
+    def test_refresh_command_rebuilds_rollup(self):
+        """The periodic command recreates missing rows."""
+        OnboardingStatsRollup.objects.all().delete()
+        call_command('refresh_onboarding_stats', stdout=io.StringIO())
+        self.assertEqual(OnboardingStatsRollup.objects.count(), ProjectMembership.objects.count())
+
+    def test_deleting_project_removes_its_rollups(self):
+        """Cascade deletes do not re-create rollup rows for memberships being removed."""
+        ProjectTask.objects.create(
+            title='Kickoff', project=self.project, assigned_to=self.user, date='2025-01-10', time='10:00'
+        )
+        self.project.delete()
+        self.assertFalse(OnboardingStatsRollup.objects.filter(project_id=self.project.id).exists())
+        self.assertFalse(ProjectTaskDailyRollup.objects.filter(project_id=self.project.id).exists())
+
+    def test_renames_and_role_deletion_update_rollup_names(self):
+        """Copied user, project and role names follow renames; deleting the role clears its name."""
+        self.user.username = 'renamed'
+        self.user.save()
+        self.project.name = 'Renamed project'
+        self.project.save()
+        self.role.name = 'Platform Engineer'
+        self.role.save()
+        rollup = OnboardingStatsRollup.objects.get(membership=self.membership)
+        self.assertEqual(
+            (rollup.username, rollup.project_name, rollup.role_name), ('renamed', 'Renamed project', 'Platform Engineer')
+        )
+
+        self.role.delete()
+        rollup.refresh_from_db()
+        self.assertEqual((rollup.role_id, rollup.role_name), (None, None))
+
+    def test_dashboard_filters_and_paginates(self):
+        """The dashboard reads filtered rollup rows page by page."""
+        client = Client()
+        client.login(username='admin', password='testpass123')
+        response = client.get(reverse('statistics_dashboard'), {'project': self.project.id, 'role': self.role.id})
+
+        self.assertEqual(response.status_code, 200)
+        page = response.context['onboarding_stats']
+        self.assertEqual([row.username for row in page], ['member'])
+        self.assertEqual(page.paginator.count, 1)
+
+
+class StatisticsCacheTests(TestCase):
+    """Test cases for the generation-keyed statistics cache."""
+
+    def setUp(self):
+        """Set up a project with one task and clear the cache."""
+        from django.core.cache import cache
+        from webapp.models import ProjectTask
+
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        self.project = Project.objects.create(name='Alpha', description='Test')
+        ProjectTask.objects.create(
+            title='Kickoff', project=self.project, assigned_to=self.admin,
+            date='2025-01-10', time='10:00', duration=2
+        )
+        self.client = Client()
+        self.client.login(username='admin', password='testpass123')
+
+    def test_repeated_views_served_from_cache(self):
+        """The second identical request does not rerun the aggregate queries."""
+        url = reverse('statistics_dashboard')
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get(url, {'project': self.project.id, 'end_date': '2025-12-31'})
+        with CaptureQueriesContext(connection) as warm:
+            response = self.client.get(url, {'project': self.project.id, 'end_date': '2025-12-31'})
+
+        self.assertLess(len(warm), len(cold))
+        self.assertEqual(response.context['total_duration'], 2)
+
+    def test_task_write_invalidates_cache(self):
+        """Saving a task bumps the generation so the next view recomputes."""
+        from webapp.models import ProjectTask
+
+        url = reverse('statistics_dashboard')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectTask.objects.create(
+                title='Review', project=self.project, assigned_to=self.admin,
+                date='2025-01-11', time='10:00', duration=3
+            )
+        response = self.client.get(url)
+
+        self.assertEqual(response.context['total_duration'], 5)
+        self.assertEqual(response.context['task_stats_by_project'][0]['total_tasks'], 2)
+
+    def test_generation_is_shared_through_the_database(self):
+        """The generation survives a cache flush (another worker's view) and a bump is visible to every process."""
+        first = get_stats_generation()
+        cache.clear()
+        self.assertEqual(get_stats_generation(), first)
+
+        bump_cache_version(GENERATION_KEY)
+        self.assertNotEqual(get_stats_generation(), first)
+        self.assertEqual(CacheVersion.objects.get(key=GENERATION_KEY).version, get_stats_generation())
+
+    def test_write_in_another_process_invalidates_cache(self):
+        """Aggregates cached here are recomputed after a write committed by a different worker."""
+        url = reverse('statistics_dashboard')
+        self.client.get(url)
+        # Inny worker: zmiana bez sygnałów w tym procesie, nowa generacja tylko w bazie
+        ProjectTask.objects.filter(project=self.project).update(duration=5)
+        self.assertEqual(self.client.get(url).context['total_duration'], 2)
+
+        bump_cache_version(GENERATION_KEY)
+        self.assertEqual(self.client.get(url).context['total_duration'], 5)
+
+    def test_renaming_a_user_invalidates_organizer_stats(self):
+        """The per-organizer aggregate shows usernames, so a rename bumps the generation."""
+        url = reverse('statistics_dashboard')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.username = 'organizer'
+            self.admin.save()
+        response = self.client.get(url)
+        self.assertEqual(response.context['task_count_by_organizer'][0]['assigned_to__username'], 'organizer')
+
+
+class TaskCsvExportTests(TestCase):
+    """Test cases for the streaming task CSV export."""
+
+    def setUp(self):
+        """Set up tasks in two projects."""
+        from webapp.models import ProjectTask
+
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.project = Project.objects.create(name='Alpha', description='Test')
+        other = Project.objects.create(name='Beta', description='Test')
+        for i in range(3):
+            ProjectTask.objects.create(
+                title=f'Task {i}', project=self.project, assigned_to=self.user,
+                date='2025-01-10', time='10:00', duration=i + 1
+            )
+        ProjectTask.objects.create(
+            title='Other', project=other, assigned_to=self.user, date='2025-01-10', time='10:00'
+        )
+
+    def test_export_streams_filtered_rows_in_constant_queries(self):
+        """Rows are streamed with project and assignee joined in one query."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = Client().get(reverse('export_tasks_csv'), {'project': self.project.id})
+            content = b''.join(response.streaming_content).decode()
+
+        self.assertTrue(response.streaming)
+        lines = content.strip().splitlines()
+        self.assertEqual(lines[0], 'Title,Description,Date,Time,Project,Duration,Assigned To')
+        self.assertEqual(len(lines), 4)
+        self.assertIn('Task 2,,2025-01-10,10:00:00,Alpha,3,organizer', lines)
+        self.assertEqual(len(queries), 1)
+
+
+class AnalyticsExportTests(TestCase):
+    """Test cases for the columnar analytics export."""
+
+    def setUp(self):
+        """Set up a project task and an onboarding membership."""
+        from webapp.models import OnboardingStep, OnboardingTaskTemplate, ProjectTask
+
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.project = Project.objects.create(name='Alpha', description='Test')
+        ProjectTask.objects.create(
+            title='Kickoff', project=self.project, assigned_to=self.user,
+            date='2025-01-10', time='10:30', duration=2
+        )
+        role = ProjectRole.objects.create(project=self.project, name='Developer')
+        step = OnboardingStep.objects.create(role=role, title='Setup', order=1)
+        OnboardingTaskTemplate.objects.create(step=step, title='Install Docker')
+        ProjectMembership.objects.create(user=self.user, project=self.project, role=role)
+
+    def _read(self, dataset, **filters):
+        import tempfile
+        import pyarrow.parquet as pq
+        from webapp.analytics_export import export_dataset
+
+        with tempfile.NamedTemporaryFile(suffix='.parquet') as output:
+            written = export_dataset(dataset, filters, output.name, batch_size=1)
+            return written, pq.read_table(output.name)
+
+    def test_exports_typed_columns(self):
+        """Dates, times, booleans and joined names keep their types."""
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest('pyarrow not installed')
+        import datetime
+
+        written, table = self._read('tasks', project=self.project.id)
+        self.assertEqual(written, 1)
+        row = table.to_pylist()[0]
+        self.assertEqual(row['date'], datetime.date(2025, 1, 10))
+        self.assertEqual(row['time'], datetime.time(10, 30))
+        self.assertEqual((row['project'], row['assigned_to'], row['duration']), ('Alpha', 'organizer', 2))
+
+        written, table = self._read('onboarding_tasks')
+        self.assertEqual(table.column('completed').to_pylist(), [False])
+
+        written, table = self._read('membership_progress', project=self.project.id + 1)
+        self.assertEqual(written, 0)
+
+    def test_endpoint_returns_file(self):
+        """The endpoint serves the export as an attachment (or 501 without pyarrow)."""
+        client = Client()
+        client.login(username='organizer', password='testpass123')
+        response = client.get(reverse('export_analytics', args=['membership_progress']))
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.assertEqual(response.status_code, 501)
+            return
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('membership_progress.parquet', response['Content-Disposition'])
+        self.assertEqual(
+            client.get(reverse('export_analytics', args=['unknown'])).status_code, 404
+        )
+
+
+class DailyTaskRollupTests(TestCase):
+    """Test cases for the daily project task rollups and time-series API."""
+
+    def setUp(self):
+        """Set up a project with tasks spread over two weeks."""
+        from webapp.models import ProjectTask
+
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        self.project = Project.objects.create(name='Alpha', description='Test')
+        self.tasks = [
+            ProjectTask.objects.create(
+                title=f'Task {day}', project=self.project, assigned_to=self.user,
+                date=f'2025-01-{day:02d}', time='10:00', duration=day
+            )
+            for day in (6, 6, 8, 14)
+        ]
+
+    def _rollup(self, day):
+        from webapp.models import ProjectTaskDailyRollup
+
+        return ProjectTaskDailyRollup.objects.filter(day=day).values_list('task_count', 'total_duration').first()
+
+    def test_rollup_follows_task_writes(self):
+        """Creating, moving and deleting tasks keeps daily rows in sync."""
+        self.assertEqual(self._rollup('2025-01-06'), (2, 12))
+
+        task = self.tasks[2]
+        task.date = '2025-01-06'
+        task.duration = 5
+        task.save()
+        self.assertEqual(self._rollup('2025-01-06'), (3, 17))
+        self.assertIsNone(self._rollup('2025-01-08'))
+
+        self.tasks[3].delete()
+        self.assertIsNone(self._rollup('2025-01-14'))
+
+    def test_backfill_matches_incremental_rollup(self):
+        """The backfill command rebuilds the same rows from raw tasks."""
+        from django.core.management import call_command
+        from webapp.models import ProjectTaskDailyRollup
+
+        before = set(ProjectTaskDailyRollup.objects.values_list('day', 'task_count', 'total_duration'))
+        ProjectTaskDailyRollup.objects.all().delete()
+        call_command('backfill_task_rollups', stdout=io.StringIO())
+        after = set(ProjectTaskDailyRollup.objects.values_list('day', 'task_count', 'total_duration'))
+        self.assertEqual(before, after)
+
+    def test_time_series_api_downsamples(self):
+        """The API aggregates daily rows into weeks."""
+        client = Client()
+        client.login(username='organizer', password='testpass123')
+        response = client.get(reverse('task_time_series_api'), {'bucket': 'week', 'project': self.project.id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['series'], [
+            {'period': '2025-01-06', 'task_count': 3, 'total_duration': 20},
+            {'period': '2025-01-13', 'task_count': 1, 'total_duration': 14},
+        ])
+        self.assertEqual(client.get(reverse('task_time_series_api'), {'bucket': 'year'}).status_code, 400)
+
+    def test_time_series_api_rejects_malformed_dates(self):
+        """Malformed or impossible dates return a 400 instead of a server error."""
+        client = Client()
+        client.login(username='organizer', password='testpass123')
+        for params in ({'start_date': 'yesterday'}, {'end_date': '2025-02-30'}):
+            response = client.get(reverse('task_time_series_api'), params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.json())
+
+
+class KeysetPaginationTests(TestCase):
+    """Test cases for keyset-paginated task lists."""
+
+    def setUp(self):
+        """Set up tasks sharing dates and times so the pk tiebreak matters."""
+        from webapp.models import ProjectTask
+
+        self.user = User.objects.create_user(username='organizer', password='testpass123')
+        project = Project.objects.create(name='Alpha', description='Test')
+        self.tasks = [
+            ProjectTask.objects.create(
+                title=f'Task {i}', project=project, assigned_to=self.user,
+                date=f'2025-01-0{1 + i // 4}', time='10:00' if i % 2 else '09:00'
+            )
+            for i in range(7)
+        ]
+        self.client = Client()
+        self.client.login(username='organizer', password='testpass123')
+
+    def test_feed_walks_every_task_once_in_order(self):
+        """Following next_cursor visits all tasks in (date, time, id) order."""
+        from webapp.models import ProjectTask
+
+        expected = list(ProjectTask.objects.order_by('date', 'time', 'pk').values_list('pk', flat=True))
+        seen, cursor = [], ''
+        while True:
+            data = self.client.get(reverse('task_feed'), {'cursor': cursor, 'page_size': 3}).json()
+            seen += [row['id'] for row in data['results']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_page_cost_is_constant(self):
+        """Deep pages and first pages run the same single query."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from webapp.models import ProjectTask
+        from webapp.pagination import keyset_paginate
+
+        first = keyset_paginate(ProjectTask.objects.select_related('project', 'assigned_to'), None, 2)
+        with CaptureQueriesContext(connection) as queries:
+            page = keyset_paginate(ProjectTask.objects.select_related('project', 'assigned_to'), first.next_cursor, 2)
+            [(task.project.name, task.assigned_to.username) for task in page]
+        self.assertEqual(len(queries), 1)
+
+    def test_task_list_renders_next_link(self):
+        """The HTML list shows a next-page link while more tasks remain."""
+        response = self.client.get(reverse('task_list'), {'page_size': 5})
+        self.assertEqual(len(response.context['tasks']), 5)
+        self.assertContains(response, f'?cursor={response.context["tasks"].next_cursor}&amp;page_size=5')
+
+    def test_task_dashboard_next_link_keeps_page_size(self):
+        """Following the dashboard's next-page link keeps the requested page size."""
+        response = self.client.get(reverse('task_dashboard'), {'page_size': 3})
+        cursor = response.context['tasks'].next_cursor
+        self.assertContains(response, f'?cursor={cursor}&amp;page_size=3')
+
+        response = self.client.get(reverse('task_dashboard'), {'cursor': cursor, 'page_size': 3})
+        self.assertEqual(len(response.context['tasks']), 3)
+        self.assertContains(response, 'href="?page_size=3">First page')
+
+
+class SeedLoadTests(TestCase):
+    """Test cases for the synthetic data generator and view benchmark."""
+
+    def test_seed_load_generates_requested_volumes(self):
+        """Bulk seeding creates consistent onboarding data and aggregates."""
+        from django.core.management import call_command
+        from webapp.models import OnboardingStatsRollup, OnboardingTask, ProjectTask, ProjectTaskDailyRollup
+
+        call_command(
+            'seed_load', '--users', '12', '--projects', '2', '--members-per-project', '5',
+            '--tasks-per-project', '10', '--prefix', 'load', stdout=io.StringIO()
+        )
+
+        memberships = ProjectMembership.objects.filter(project__name__startswith='load project')
+        self.assertEqual(User.objects.filter(username__startswith='load_user').count(), 12)
+        self.assertEqual(memberships.count(), 10)
+        self.assertEqual(ProjectTask.objects.count(), 20)
+        self.assertEqual(
+            sum(memberships.values_list('total_tasks', flat=True)),
+            OnboardingTask.objects.count(),
+        )
+        self.assertEqual(OnboardingStatsRollup.objects.count(), 10)
+        self.assertEqual(sum(ProjectTaskDailyRollup.objects.values_list('task_count', flat=True)), 20)
+
+        call_command('seed_load', '--users', '3', '--projects', '1', '--prefix', 'load', '--flush', stdout=io.StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='load_user').count(), 3)
+
+    def test_benchmark_views_writes_report_and_rolls_back(self):
+        """The benchmark times views per scale and leaves no seeded rows behind."""
+        import json
+        import tempfile
+        from django.core.management import call_command
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command(
+                'benchmark_views', '--sizes', '1', '--repeat', '1', '--only', 'task_list',
+                '--only', 'onboarding_dashboard', '--output', output.name, stdout=io.StringIO()
+            )
+            report = json.load(open(output.name))
+
+        views = report['results'][0]['views']
+        self.assertEqual(set(views), {'task_list', 'onboarding_dashboard'})
+        self.assertEqual(views['onboarding_dashboard']['status'], 200)
+        self.assertGreater(views['task_list']['queries'], 0)
+        self.assertFalse(User.objects.filter(username='benchmark_admin').exists())
+
+
+class LLMParserBenchmarkTests(TestCase):
+    """Test cases for parser stage statistics and the corpus replay benchmark."""
+
+    def test_parse_stats_record_repair_path(self):
+        """parse_llm_output reports the stages it ran and which one produced the result."""
+        clean = '{"steps": [{"id": "S1", "title": "Setup"}], "tasks": [{"step_id": "S1", "title": "Clone", "description": "Clone repo"}]}'
+        stats = {}
+        parse_llm_output(clean, stats=stats)
+        self.assertEqual(stats['repair_path'], 'direct')
+        self.assertEqual(stats['stages'], ['direct'])
+        self.assertIn('direct', stats['timings'])
+
+        stats = {}
+        parse_llm_output('Plan onboardingu bez JSON-a', stats=stats)
+        self.assertEqual(stats['repair_path'], 'fallback')
+        self.assertEqual(stats['error'], 'No JSON found in LLM output')
+
+        stats = {}
+        data = parse_llm_output('Plan: "steps": [], "tasks": []', stats=stats)
+        self.assertEqual(stats['repair_path'], 'missing_braces')
+        self.assertEqual(data, {'steps': [], 'tasks': []})
+
+    def test_benchmark_llm_parser_writes_report(self):
+        """The benchmark replays the recorded corpus and reports success rate and repair paths."""
+        import tempfile
+        from django.core.management import call_command
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command('benchmark_llm_parser', '--repeat', '2', '--output', output.name, stdout=io.StringIO())
+            report = json.load(open(output.name))
+
+        results = {result['file']: result for result in report['results']}
+        self.assertEqual(results['clean.json']['repair_path'], 'direct')
+        self.assertEqual(results['clean.json']['tasks'], 5)
+        self.assertEqual(results['clean.json']['expected'], {'steps': 3, 'tasks': 5})
+        self.assertTrue(results['clean.json']['success'])
+        self.assertEqual(results['onboarding_plan_backend_developer.txt']['repair_path'], 'fallback')
+        self.assertFalse(results['onboarding_plan_backend_developer.txt']['success'])
+        self.assertIn('parse_peak_bytes', results['clean.json'])
+        # A repair that lost steps or tasks is not a success
+        self.assertNotEqual(results['truncated.txt']['repair_path'], 'fallback')
+        self.assertLess(results['truncated.txt']['tasks'], results['truncated.txt']['expected']['tasks'])
+        self.assertFalse(results['truncated.txt']['success'])
+        self.assertEqual(
+            report['success_rate'],
+            sum(1 for result in report['results'] if result['success']) / len(report['results']),
+        )
+        self.assertEqual(report['recovered']['tasks'], sum(result['tasks'] for result in report['results']))
+
+
+class FakeTogetherServerTests(TestCase):
+    """Test cases for the local OpenAI-compatible Together AI stand-in."""
+
+    def start_server(self, **options):
+        from webapp.fake_together import start_fake_together
+
+        server = start_fake_together(seed=0, **options)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_generate_with_together_uses_configured_url(self):
+        """generate_with_together goes through HTTP to TOGETHER_API_URL and gets a parseable plan."""
+        from webapp.llm_together_integration import generate_with_together
+
+        server = self.start_server()
+        with override_settings(TOGETHER_API_URL=server.base_url, TOGETHER_API_KEY='test-key'):
+            text = generate_with_together('system', 'Create a comprehensive onboarding plan for: QA Engineer\n')
+
+        data = parse_llm_output(text)
+        self.assertTrue(data['steps'])
+        self.assertTrue(data['tasks'])
+        self.assertEqual(server.stats['requests'], 1)
+
+    def test_injected_rate_limit_and_templated_response(self):
+        """429 responses carry Retry-After; templated responses substitute the prompt role."""
+        import requests
+        from webapp.llm_together_integration import generate_with_together
+
+        server = self.start_server(rate_limit_rate=1.0, retry_after=7)
+        with override_settings(TOGETHER_API_URL=server.base_url, TOGETHER_API_KEY='test-key'):
+            with self.assertRaises(requests.HTTPError) as raised:
+                generate_with_together('system', 'user')
+        self.assertEqual(raised.exception.response.status_code, 429)
+        self.assertEqual(raised.exception.response.headers['Retry-After'], '7')
+
+        server = self.start_server(responses=['Plan for $role'])
+        with override_settings(TOGETHER_API_URL=server.base_url, TOGETHER_API_KEY='test-key'):
+            text = generate_with_together('system', 'Create a comprehensive onboarding plan for: Designer\n')
+        self.assertEqual(text, 'Plan for Designer')
+
+    def test_streaming_chunks_reassemble_response(self):
+        """stream=true returns SSE chunks that join into the full completion."""
+        import requests
+
+        server = self.start_server(responses=['x' * 100], chunk_chars=30)
+        response = requests.post(
+            f'{server.base_url}/chat/completions',
+            headers={'Authorization': 'Bearer test-key'},
+            json={'model': 'test', 'messages': [], 'stream': True},
+            stream=True,
+            timeout=5,
+        )
+        events = [line[len('data: '):] for line in response.iter_lines(decode_unicode=True) if line.startswith('data: ')]
+
+        self.assertEqual(events[-1], '[DONE]')
+        chunks = [json.loads(event)['choices'][0]['delta'].get('content', '') for event in events[:-1]]
+        self.assertEqual(''.join(chunks), 'x' * 100)
+        self.assertEqual(len([chunk for chunk in chunks if chunk]), 4)
+
+
+class RequestMetricsTests(TestCase):
+    """Test cases for the request metrics middleware and the /metrics endpoint."""
+
+    def setUp(self):
+        from webapp.metrics import REGISTRY
+
+        REGISTRY.reset()
+        self.addCleanup(REGISTRY.reset)
+        self.user = User.objects.create_user(username='metrics', password='testpass123')
+
+    @override_settings(METRICS_SAMPLE_RATE=1.0, METRICS_TOKEN='')
+    def test_sampled_request_records_latency_queries_and_size(self):
+        """A sampled request shows up in the counter and in every histogram under its view name."""
+        self.user.is_staff = True
+        self.user.save()
+        client = Client()
+        client.login(username='metrics', password='testpass123')
+        client.get(reverse('task_list'))
+
+        body = client.get(reverse('metrics')).content.decode()
+        self.assertIn('crm_http_requests_total{view="task_list",method="GET",status="200"} 1', body)
+        self.assertIn('crm_http_request_duration_seconds_count{view="task_list"} 1', body)
+        self.assertIn('crm_http_response_size_bytes_count{view="task_list"} 1', body)
+        self.assertIn('crm_http_request_sql_queries_bucket{view="task_list",le="+Inf"} 1', body)
+        self.assertNotIn('crm_http_request_sql_queries_bucket{view="task_list",le="0"} 1', body)
+
+    @override_settings(METRICS_SAMPLE_RATE=0.0, METRICS_TOKEN='secret')
+    def test_unsampled_requests_are_counted_and_endpoint_requires_token(self):
+        """Requests outside the sample are only counted; the endpoint honours METRICS_TOKEN."""
+        client = Client()
+        client.get(reverse('my-login'))
+
+        self.assertEqual(client.get(reverse('metrics')).status_code, 403)
+        self.assertEqual(client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        body = response.content.decode()
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('crm_http_requests_total{view="my-login",method="GET",status="200"} 1', body)
+        self.assertNotIn('crm_http_request_duration_seconds_count{view="my-login"}', body)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_endpoint_without_token_is_staff_only(self):
+        """Without METRICS_TOKEN the endpoint is denied to anonymous and non-staff users."""
+        client = Client()
+        self.assertEqual(client.get(reverse('metrics')).status_code, 403)
+        client.login(username='metrics', password='testpass123')
+        self.assertEqual(client.get(reverse('metrics')).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(client.get(reverse('metrics')).status_code, 200)
+
+
+@override_settings(LLM_CALL_LOG_ASYNC=False, TOGETHER_API_KEY='test-key')
+class LLMCallLogTests(TestCase):
+    """Test cases for the LLM call ledger."""
+
+    def start_server(self, **options):
+        from webapp.fake_together import start_fake_together
+
+        server = start_fake_together(seed=0, **options)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_successful_generation_records_tokens_and_parse_path(self):
+        """A Together AI generation logs tokens, status, latency and the parser repair path."""
+        from webapp.models import LLMCallLog
+
+        server = self.start_server()
+        with override_settings(TOGETHER_API_URL=server.base_url, TOGETHER_MODEL='test-model'):
+            result = generate_onboarding_draft('QA Engineer', 'Python', [])
+
+        log = LLMCallLog.objects.get()
+        self.assertEqual(log.model, 'test-model')
+        self.assertEqual(log.generation_method, 'together_ai')
+        self.assertEqual(log.prompt_hash, result['metadata']['prompt_hash'])
+        self.assertEqual(log.http_status, 200)
+        self.assertEqual(log.retries, 0)
+        self.assertEqual(log.parse_path, 'direct')
+        self.assertGreater(log.prompt_tokens, 0)
+        self.assertGreater(log.completion_tokens, 0)
+        self.assertGreaterEqual(log.latency_ms, log.api_latency_ms)
+
+    def test_rate_limited_generation_records_retries_and_fallback_reason(self):
+        """Retries on 429 are counted and the template fallback keeps the failure reason."""
+        from webapp.models import LLMCallLog
+
+        server = self.start_server(rate_limit_rate=1.0, retry_after=0)
+        with override_settings(TOGETHER_API_URL=server.base_url, TOGETHER_MAX_RETRIES=2):
+            generate_onboarding_draft('QA Engineer', 'Python', [])
+
+        log = LLMCallLog.objects.get()
+        self.assertEqual(server.stats['requests'], 3)
+        self.assertEqual(log.generation_method, 'template_fallback')
+        self.assertEqual(log.http_status, 429)
+        self.assertEqual(log.retries, 2)
+        self.assertTrue(log.fallback_reason.startswith('Together AI:'))
+
+    def test_writer_flushes_in_batches(self):
+        """The background writer groups queued entries into batches of flush_size."""
+        from webapp.llm_call_log import LLMCallLogWriter
+
+        batches = []
+        writer = LLMCallLogWriter(write=batches.append, flush_size=2, flush_interval=60)
+        for i in range(3):
+            writer.submit({'latency_ms': i})
+        self.assertTrue(writer.flush())
+        self.assertEqual(batches, [[{'latency_ms': 0}, {'latency_ms': 1}], [{'latency_ms': 2}]])
+
+    def test_admin_changelist_shows_latency_percentiles_per_model(self):
+        """The admin list reports p50/p95 latency and token totals per model."""
+        from webapp.models import LLMCallLog
+
+        LLMCallLog.objects.bulk_create(
+            [LLMCallLog(model='a', generation_method='together_ai', latency_ms=ms, completion_tokens=10)
+             for ms in range(1, 101)]
+            + [LLMCallLog(model='b', generation_method='template_fallback', latency_ms=5)]
+        )
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        self.client.login(username='admin', password='testpass123')
+
+        response = self.client.get(reverse('admin:webapp_llmcalllog_changelist'))
+        stats = {row['model']: row for row in response.context['model_stats']}
+        self.assertEqual(stats['a']['calls'], 100)
+        self.assertEqual(stats['a']['p50_ms'], 51)
+        self.assertEqual(stats['a']['p95_ms'], 95)
+        self.assertEqual(stats['a']['total_completion_tokens'], 1000)
+        self.assertEqual(stats['b']['p95_ms'], 5)
+        self.assertContains(response, 'p95 latency')
+
+
+class RequestUserProfileTests(TestCase):
+    """Test cases for the request-scoped user profile."""
+
+    def setUp(self):
+        from webapp.models import UserProfile, UserRole
+
+        self.role = UserRole.objects.create(name='Manager', can_manage_projects=True)
+        self.user = User.objects.create_user(username='manager', password='testpass123')
+        UserProfile.objects.filter(user=self.user).update(role=self.role)
+
+    def test_profile_and_role_loaded_once_per_request(self):
+        """Repeated lookups and permission checks reuse one query joined with the role."""
+        from django.db import connection
+        from django.test import RequestFactory
+        from django.test.utils import CaptureQueriesContext
+        from webapp.context_processors import get_user_profile, user_profile
+
+        request = RequestFactory().get('/')
+        request.user = self.user
+        context = user_profile(request)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(context['user_profile'].has_permission('can_manage_projects'))
+            self.assertEqual(context['user_profile'].role.name, 'Manager')
+            self.assertIs(get_user_profile(request), get_user_profile(request))
+        self.assertEqual(len(queries), 1)
+
+    def test_missing_profile_is_created(self):
+        """Users without a profile still get one on first access."""
+        from django.test import RequestFactory
+        from webapp.context_processors import get_user_profile
+        from webapp.models import UserProfile
+
+        UserProfile.objects.filter(user=self.user).delete()
+        request = RequestFactory().get('/')
+        request.user = self.user
+        self.assertIsNone(get_user_profile(request).role)
+        self.assertTrue(UserProfile.objects.filter(user=self.user).exists())
+
+    def test_sidebar_permissions_render(self):
+        """Pages still show role-gated navigation from the lazy profile."""
+        self.client.login(username='manager', password='testpass123')
+        response = self.client.get(reverse('task_dashboard'))
+        self.assertContains(response, reverse('manage_projects'))
+
+
+class UserProfileProvisioningTests(TestCase):
+    """Test cases for bulk profile provisioning and the paginated manage_users page."""
+
+    def setUp(self):
+        from webapp.models import UserProfile
+
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        User.objects.bulk_create([User(username=f'user{i:03d}') for i in range(60)])  # bez sygnałów - bez profili
+        self.missing = User.objects.filter(userprofile__isnull=True)
+        self.assertEqual(self.missing.count(), 60)
+        self.UserProfile = UserProfile
+
+    def test_ensure_user_profiles_command_creates_missing_profiles_in_bulk(self):
+        """The startup command fills every missing profile with a constant number of queries."""
+        from django.core.management import call_command
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('ensure_user_profiles', stdout=io.StringIO())
+        self.assertFalse(self.missing.exists())
+        self.assertLessEqual(len(queries), 4)
+
+        call_command('ensure_user_profiles', stdout=io.StringIO())
+        self.assertEqual(self.UserProfile.objects.count(), User.objects.count())
+
+    def test_ensure_user_profiles_attaches_saved_rows_and_counts_only_new_ones(self):
+        """Profiles created concurrently are not counted, and every user gets a saved profile attached."""
+        from webapp.user_service import ensure_user_profiles
+
+        users = list(User.objects.select_related('userprofile').filter(userprofile__isnull=True))
+        self.UserProfile.objects.create(user=users[0])  # profil z innego procesu
+
+        self.assertEqual(ensure_user_profiles(users), len(users) - 1)
+        for user in users:
+            self.assertIsNotNone(user.userprofile.pk)
+        self.assertEqual(users[0].userprofile, self.UserProfile.objects.get(user=users[0]))
+
+    def test_manage_users_is_paginated_and_provisions_page_profiles(self):
+        """manage_users shows one page of users and creates only that page's missing profiles."""
+        from webapp.views.user_management_views import USERS_PAGE_SIZE
+
+        self.client.login(username='admin', password='testpass123')
+        response = self.client.get(reverse('manage_users'))
+
+        self.assertEqual(len(response.context['user_profiles']), USERS_PAGE_SIZE)
+        self.assertEqual(self.missing.count(), 61 - USERS_PAGE_SIZE)
+        self.assertContains(response, 'Page 1 of 2')
+
+        response = self.client.get(reverse('manage_users'), {'page': 2})
+        self.assertEqual(len(response.context['user_profiles']), 61 - USERS_PAGE_SIZE)
+        self.assertFalse(self.missing.exists())
+
+
+class ManageProjectsPageTests(TestCase):
+    """Test cases for the paginated, prefetch-backed manage_projects page."""
+
+    def setUp(self):
+        from webapp.views.project_views import PROJECTS_PAGE_SIZE
+
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        self.client.login(username='admin', password='testpass123')
+        self.projects = [
+            Project.objects.create(name=f'Project {i:02d}', description='', creator=self.admin)
+            for i in range(PROJECTS_PAGE_SIZE + 5)
+        ]
+        for project in self.projects:
+            ProjectRole.objects.create(project=project, name=f'Role of {project.name}')
+
+    def test_projects_are_paginated_with_per_project_role_choices(self):
+        """Each project's forms list only its own roles; later projects are on the next page."""
+        from webapp.views.project_views import PROJECTS_PAGE_SIZE
+
+        response = self.client.get(reverse('manage_projects'))
+        page = response.context['projects']
+        self.assertEqual(len(page), PROJECTS_PAGE_SIZE)
+        self.assertContains(response, 'Page 1 of 2')
+
+        first = page[0]
+        role_labels = [label for _, label in first.add_member_form.fields['role'].choices]
+        self.assertEqual(role_labels, ['---------', f'Role of {first.name}'])
+        self.assertEqual(
+            [label for _, label in first.bulk_add_members_form.fields['role'].choices],
+            role_labels,
+        )
+
+        response = self.client.get(reverse('manage_projects'), {'page': 2})
+        self.assertEqual(len(response.context['projects']), 5)
+
+    def test_query_count_does_not_grow_with_projects(self):
+        """Adding projects, roles and members does not add queries."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('manage_projects'))
+        for project in self.projects:
+            ProjectRole.objects.create(project=project, name='Extra')
+            ProjectMembership.objects.create(project=project, user=User.objects.create_user(username=f'm{project.pk}'))
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(reverse('manage_projects'))
+        self.assertEqual(len(large), len(small))
+
+    def test_user_options_are_rendered_once_per_page(self):
+        """The member selects share one user list instead of repeating it for every project."""
+        User.objects.create_user(username='candidate')
+        response = self.client.get(reverse('manage_projects'))
+
+        self.assertContains(response, '>candidate</option>', count=1)
+        first = response.context['projects'][0]
+        self.assertEqual(list(first.add_member_form.fields['user'].choices), [('', '---------')])
+        self.assertEqual(list(first.bulk_add_members_form.fields['users'].choices), [])
+        self.assertContains(response, 'data-user-options="user-options"', count=2 * len(response.context['projects']))
+
+    def test_add_member_rejects_role_of_another_project(self):
+        """A role from a different project is not a valid choice."""
+        member = User.objects.create_user(username='member')
+        foreign_role = self.projects[1].roles.get()
+        self.client.post(reverse('manage_projects'), {
+            'action': 'add_member', 'project_id': self.projects[0].pk, 'user': member.pk, 'role': foreign_role.pk,
+        })
+        self.assertFalse(ProjectMembership.objects.filter(user=member).exists())
+
+        own_role = self.projects[0].roles.get()
+        self.client.post(reverse('manage_projects'), {
+            'action': 'add_member', 'project_id': self.projects[0].pk, 'user': member.pk, 'role': own_role.pk,
+        })
+        self.assertTrue(ProjectMembership.objects.filter(user=member, role=own_role).exists())
+
+
+class ProjectPermissionCacheTests(TestCase):
+    """Test cases for the per-request and per-session project membership cache."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.project = Project.objects.create(name='Project', description='', creator=self.user)
+        self.membership = ProjectMembership.objects.get(project=self.project, user=self.user)  # creator is admin
+        ProjectMembership.objects.create(project=self.project, user=self.other, is_admin=False)
+
+    def _request(self, user, session=None):
+        from django.contrib.sessions.backends.signed_cookies import SessionStore
+        from django.test import RequestFactory
+
+        request = RequestFactory().get('/')
+        request.user = user
+        request.session = session if session is not None else SessionStore()
+        return request
+
+    def test_repeated_checks_in_a_request_hit_the_database_once(self):
+        """Only the first check in a request loads the profile version and the memberships."""
+        from webapp.permissions import get_project_memberships, is_project_admin
+
+        request = self._request(self.user)
+        with self.assertNumQueries(2):
+            self.assertTrue(is_project_admin(request, self.project))
+        with self.assertNumQueries(0):
+            self.assertTrue(is_project_admin(request, self.project.pk))
+            self.assertIn(self.project.pk, get_project_memberships(request))
+            self.assertFalse(is_project_admin(request, self.project.pk + 1))
+
+    def test_session_cache_is_reused_until_memberships_change(self):
+        """A later request reuses the session copy; a membership change invalidates it without the cache."""
+        from django.core.cache import cache
+        from webapp.permissions import is_project_admin
+
+        session = self._request(self.user).session
+        is_project_admin(self._request(self.user, session), self.project)
+        with self.assertNumQueries(1):  # only the profile with its version
+            self.assertTrue(is_project_admin(self._request(self.user, session), self.project))
+
+        # The version lives in the database, so other workers (and a cleared cache) see the change at once
+        self.membership.is_admin = False
+        self.membership.save()
+        cache.clear()
+        self.assertFalse(is_project_admin(self._request(self.user, session), self.project))
+
+    def test_session_cache_expires_and_is_bound_to_the_user(self):
+        """Expired or foreign session entries are reloaded."""
+        from webapp.permissions import is_project_admin
+
+        session = self._request(self.user).session
+        is_project_admin(self._request(self.user, session), self.project)
+        with self.assertNumQueries(2):
+            self.assertFalse(is_project_admin(self._request(self.other, session), self.project))
+
+        with override_settings(PROJECT_PERMISSIONS_SESSION_TTL=0):
+            with self.assertNumQueries(2):
+                is_project_admin(self._request(self.other, session), self.project)
+
+    def test_bulk_add_members_invalidates_cache(self):
+        """bulk_add_members does not send signals but still bumps the members' versions."""
+        from webapp.onboarding_service import bulk_add_members
+        from webapp.permissions import get_project_memberships
+
+        newcomer = User.objects.create_user(username='newcomer')
+        session = self._request(newcomer).session
+        self.assertNotIn(self.project.pk, get_project_memberships(self._request(newcomer, session)))
+        bulk_add_members(self.project, [{'user': newcomer, 'role': None, 'is_admin': False}])
+        self.assertIn(self.project.pk, get_project_memberships(self._request(newcomer, session)))
+
+    def test_decorated_views_reject_non_admins(self):
+        """JSON endpoints answer 403 and page views redirect for non-admins; missing projects are 404."""
+        self.client.login(username='other', password='testpass123')
+        response = self.client.get(reverse('document_status_api', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['error'], 'No permissions')
+
+        response = self.client.get(reverse('llm_onboarding_review', args=[self.project.pk]))
+        self.assertRedirects(
+            response, reverse('onboarding_setup', args=[self.project.pk]), fetch_redirect_response=False
+        )
+
+        response = self.client.post(reverse('llm_onboarding_edit_draft', args=[self.project.pk]), '{}',
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['error'], 'Brak uprawnień')
+
+        response = self.client.get(reverse('document_status_api', args=[self.project.pk + 100]))
+        self.assertEqual(response.status_code, 404)
+
+        self.client.login(username='admin', password='testpass123')
+        response = self.client.get(reverse('document_status_api', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 200)
+
+
+class SpotifyClientCacheTests(TestCase):
+    """Test cases for the shared Spotify client, the artist search cache and typeahead suggestions."""
+
+    def setUp(self):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from django.core.cache import cache
+        from webapp.spotify_utils import artist_cache, suggestion_cache
+
+        stats = self.stats = {'token': 0, 'search': 0, 'connections': 0}
+        gate = self.gate = threading.Event()
+        gate.set()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                stats['connections'] += 1
+                super().setup()
+
+            def _reply(self, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                stats['token'] += 1
+                self._reply({'access_token': 'token', 'token_type': 'Bearer', 'expires_in': 3600})
+
+            def do_GET(self):
+                stats['search'] += 1
+                gate.wait(5)
+                names = ['Daft Punk', 'Daft Punk Tribute', 'Daft Punk Orchestra']
+                items = [] if 'nobody' in self.path else [{'id': str(i), 'name': name} for i, name in enumerate(names)]
+                self._reply({'artists': {'items': items}})
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        base_url = f'http://127.0.0.1:{server.server_address[1]}'
+        overrides = override_settings(
+            SPOTIFY_CLIENT_ID='id', SPOTIFY_CLIENT_SECRET='secret',
+            SPOTIFY_TOKEN_URL=f'{base_url}/api/token', SPOTIFY_API_URL=f'{base_url}/v1/',
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        for store in (artist_cache, suggestion_cache, cache):
+            store.clear()
+            self.addCleanup(store.clear)
+
+    def test_repeated_search_skips_token_and_search_requests(self):
+        """Names differing only in case and spacing share one cached result."""
+        from webapp.spotify_utils import get_artist_info
+
+        self.assertEqual(get_artist_info('Daft Punk')['name'], 'Daft Punk')
+        self.assertEqual(get_artist_info('  daft   PUNK ')['name'], 'Daft Punk')
+        self.assertEqual(self.stats, {'token': 1, 'search': 1, 'connections': 1})
+
+        self.assertIsNone(get_artist_info('Nobody'))
+        self.assertIsNone(get_artist_info('nobody'))
+        self.assertEqual(self.stats, {'token': 1, 'search': 2, 'connections': 1})
+
+    def test_cache_expires_and_evicts_least_recently_used(self):
+        """Entries expire after the TTL and the oldest unused entry is evicted first."""
+        from webapp.spotify_utils import TTLCache
+
+        now = [0.0]
+        cache = TTLCache(ttl=10, max_size=2, clock=lambda: now[0])
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+
+        now[0] = 10
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 1)
+
+    def test_artist_search_view_uses_cache(self):
+        """The artist_search view hits the Spotify stand-in once per artist."""
+        User.objects.create_user(username='listener', password='testpass123')
+        self.client.login(username='listener', password='testpass123')
+        for _ in range(2):
+            response = self.client.post(reverse('artist_search_url'), {'artist_name': 'Daft Punk'})
+            self.assertContains(response, 'Daft Punk')
+        self.assertEqual(self.stats['search'], 1)
+
+    def test_suggest_endpoint_returns_top_matches_from_cache(self):
+        """The JSON endpoint returns the top N matches; repeated prefixes are served from cache."""
+        User.objects.create_user(username='listener', password='testpass123')
+        self.client.login(username='listener', password='testpass123')
+        url = reverse('artist_suggest')
+
+        data = self.client.get(url, {'q': 'daft', 'limit': 2}).json()
+        self.assertEqual([artist['name'] for artist in data['results']], ['Daft Punk', 'Daft Punk Tribute'])
+        data = self.client.get(url, {'q': 'Daft '}).json()
+        self.assertEqual(len(data['results']), 3)
+        self.assertEqual(self.client.get(url, {'q': 'd'}).json()['results'], [])
+        self.assertEqual(self.stats['search'], 1)
+
+    def test_suggest_endpoint_debounces_uncached_queries_per_session(self):
+        """A second uncached query within the debounce window does not reach Spotify."""
+        User.objects.create_user(username='listener', password='testpass123')
+        self.client.login(username='listener', password='testpass123')
+        url = reverse('artist_suggest')
+
+        with override_settings(SPOTIFY_TYPEAHEAD_DEBOUNCE=60):
+            self.assertFalse(self.client.get(url, {'q': 'da'}).json()['debounced'])
+            self.assertTrue(self.client.get(url, {'q': 'daf'}).json()['debounced'])
+            self.assertFalse(self.client.get(url, {'q': 'da'}).json()['debounced'])
+        self.assertEqual(self.stats['search'], 1)
+
+    def test_concurrent_identical_queries_are_coalesced(self):
+        """Threads asking for the same prefix at once share one upstream search."""
+        import threading
+        import time
+        from webapp.spotify_utils import search_artists
+
+        self.gate.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(search_artists('daft'))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while self.stats['search'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        self.gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(self.stats['search'], 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result == results[0] for result in results))
+
+
+class OnboardingDashboardTreeTests(OnboardingMemberTestCase):
+    """Test cases for the prefetched step -> template -> task tree behind onboarding_dashboard."""
+
+    def setUp(self):
+        """Set up a member with two steps of onboarding tasks."""
+        super().setUp()
+        self.client = Client()
+        self.client.login(username='member', password='testpass123')
+
+    def create_templates(self):
+        self.setup_step = OnboardingStep.objects.create(role=self.role, title='Setup', order=1)
+        self.docs_step = OnboardingStep.objects.create(role=self.role, title='Docs', order=2)
+        OnboardingTaskTemplate.objects.create(step=self.setup_step, title='Install Docker')
+        OnboardingTaskTemplate.objects.create(step=self.setup_step, title='Clone repo')
+        OnboardingTaskTemplate.objects.create(step=self.docs_step, title='Read README')
+
+    def test_tree_pairs_templates_with_member_tasks(self):
+        """Each row carries its template and the member's task; counts roll up per step."""
+        task = OnboardingTask.objects.get(membership=self.membership, template__title='Clone repo')
+        set_onboarding_task_status(task, OnboardingTask.TaskStatus.COMPLETED)
+
+        tree = onboarding_dashboard_tree(self.membership)
+        self.assertEqual([entry['step'].title for entry in tree['steps']], ['Setup', 'Docs'])
+        setup = tree['steps'][0]
+        self.assertEqual([row['template'].title for row in setup['rows']], ['Install Docker', 'Clone repo'])
+        self.assertEqual([row['task'].template_id for row in setup['rows']], [row['template'].pk for row in setup['rows']])
+        self.assertEqual((setup['completed'], setup['total']), (1, 2))
+        self.assertEqual((tree['completed'], tree['total']), (1, 3))
+
+        response = self.client.get(reverse('onboarding_dashboard', args=[self.membership.pk]))
+        self.assertContains(response, '1 / 3 tasks completed')
+        self.assertContains(response, 'Clone repo')
+
+    def test_step_counts_and_row_states_use_the_same_completion_flag(self):
+        """The step header counts the rows shown as completed, even when status disagrees with completed."""
+        OnboardingTask.objects.filter(membership=self.membership, template__title='Install Docker').update(
+            completed=True
+        )
+        OnboardingTask.objects.filter(membership=self.membership, template__title='Clone repo').update(
+            status=OnboardingTask.TaskStatus.COMPLETED
+        )
+
+        setup = onboarding_dashboard_tree(self.membership)['steps'][0]
+        self.assertEqual([row['state'] for row in setup['rows']], ['completed', 'unlocked'])
+        self.assertEqual(setup['completed'], 1)
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        """The tree is loaded in three queries whatever the number of templates and tasks."""
+        with self.assertNumQueries(3):
+            onboarding_dashboard_tree(self.membership)
+
+        OnboardingTaskTemplate.objects.bulk_create([
+            OnboardingTaskTemplate(step=step, title=f'Task {i}')
+            for step in (self.setup_step, self.docs_step) for i in range(100)
+        ])
+        assign_onboarding_tasks([self.membership.pk])
+        with self.assertNumQueries(3):
+            tree = onboarding_dashboard_tree(self.membership)
+        self.assertEqual(tree['total'], 203)
+        self.assertTrue(all(row['task'] for entry in tree['steps'] for row in entry['rows']))
+
+
+class OnboardingDependencyTests(OnboardingMemberTestCase):
+    """Test cases for the depends_on graph and the incremental pending dependency counters."""
+
+    def setUp(self):
+        """Set up the member with an empty cache so role graphs are built from these templates."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        super().setUp()
+
+    def create_templates(self):
+        """Set up a role where Deploy needs Build, and Build needs Install."""
+        step = OnboardingStep.objects.create(role=self.role, title='Setup', order=1)
+        self.install = OnboardingTaskTemplate.objects.create(step=step, title='Install')
+        self.build = OnboardingTaskTemplate.objects.create(step=step, title='Build', depends_on=[self.install.pk])
+        self.deploy = OnboardingTaskTemplate.objects.create(
+            step=step, title='Deploy', depends_on=[self.install.pk, self.build.pk]
+        )
+
+    def pending(self):
+        return dict(
+            OnboardingTask.objects.filter(membership=self.membership).values_list('template__title', 'pending_dependencies')
+        )
+
+    def task(self, template):
+        return OnboardingTask.objects.get(membership=self.membership, template=template)
+
+    def test_draft_dependencies_resolve_to_template_ids_and_reject_cycles(self):
+        """Task ids, titles and step ids resolve to templates; a cycle aborts approval."""
+        step = OnboardingStep.objects.create(role=self.role, title='Draft', order=2)
+        drafts = [
+            {'id': 'T1', 'step_id': 'S1', 'title': 'Clone', 'depends_on': []},
+            {'id': 'T2', 'step_id': 'S1', 'title': 'Configure', 'depends_on': ['T1']},
+            {'id': 'T3', 'step_id': 'S2', 'title': 'Test', 'depends_on': ['S1', 'configure', 'unknown']},
+        ]
+        created = [(draft, OnboardingTaskTemplate.objects.create(step=step, title=draft['title'])) for draft in drafts]
+        clone, configure, test = (template.pk for _, template in created)
+        self.assertEqual(
+            resolve_draft_dependencies(created),
+            {clone: [], configure: [clone], test: [clone, configure]},
+        )
+
+        drafts[0]['depends_on'] = ['T3']
+        with self.assertRaises(DependencyCycleError) as raised:
+            resolve_draft_dependencies(created)
+        self.assertIn('Clone', str(raised.exception))
+
+    def test_counters_follow_completion_of_direct_dependencies(self):
+        """Completing a task only unblocks its dependents; reopening blocks them again."""
+        self.assertEqual(self.pending(), {'Install': 0, 'Build': 1, 'Deploy': 2})
+
+        set_onboarding_task_status(self.task(self.install), OnboardingTask.TaskStatus.COMPLETED)
+        self.assertEqual(self.pending(), {'Install': 0, 'Build': 0, 'Deploy': 1})
+        set_onboarding_task_status(self.task(self.build), OnboardingTask.TaskStatus.COMPLETED)
+        self.assertEqual(self.pending(), {'Install': 0, 'Build': 0, 'Deploy': 0})
+
+        set_onboarding_task_status(self.task(self.install), OnboardingTask.TaskStatus.TODO)
+        self.assertEqual(self.pending(), {'Install': 0, 'Build': 1, 'Deploy': 1})
+
+    def test_dashboard_shows_unlocked_blocked_and_next_tasks(self):
+        """The dashboard tree derives row states from the counters."""
+        tree = onboarding_dashboard_tree(self.membership)
+        rows = {row['template'].title: row for row in tree['steps'][0]['rows']}
+        self.assertEqual({title: row['state'] for title, row in rows.items()},
+                         {'Install': 'unlocked', 'Build': 'blocked', 'Deploy': 'blocked'})
+        self.assertEqual(rows['Deploy']['blocked_by'], ['Install', 'Build'])
+        self.assertEqual([row['template'].title for row in tree['next_tasks']], ['Install'])
+        self.assertEqual((tree['unlocked'], tree['blocked']), (1, 2))
+
+        self.client.login(username='member', password='testpass123')
+        response = self.client.get(reverse('onboarding_dashboard', args=[self.membership.pk]))
+        self.assertContains(response, 'Waiting for: Install, Build')
+
+    def test_dashboard_completion_of_a_missing_task_counts_its_dependencies(self):
+        """A task the member did not have yet is created with its real pending counter, so it stays blocked."""
+        self.task(self.deploy).delete()
+
+        self.client.login(username='member', password='testpass123')
+        response = self.client.post(
+            reverse('onboarding_dashboard', args=[self.membership.pk]), {'complete_task_id': self.deploy.pk}, follow=True
+        )
+        self.assertContains(response, 'is waiting for other tasks to be completed first')
+        self.assertFalse(self.task(self.deploy).completed)
+        self.assertEqual(self.pending(), {'Install': 0, 'Build': 1, 'Deploy': 2})
+
+    def test_blocked_task_cannot_be_completed(self):
+        """Completing a blocked task is rejected and its dependents' counters stay put; the page hides Done."""
+        with self.assertRaises(TaskBlockedError):
+            set_onboarding_task_status(self.task(self.build), OnboardingTask.TaskStatus.COMPLETED)
+        self.assertFalse(self.task(self.build).completed)
+        self.assertEqual(self.pending(), {'Install': 0, 'Build': 1, 'Deploy': 2})
+
+        self.client.login(username='member', password='testpass123')
+        response = self.client.get(reverse('mark_task_complete', args=[self.task(self.build).pk]), follow=True)
+        self.assertContains(response, 'is waiting for other tasks to be completed first')
+        self.assertEqual(self.pending(), {'Install': 0, 'Build': 1, 'Deploy': 2})
+        self.assertContains(response, reverse('mark_task_complete', args=[self.task(self.install).pk]))
+        self.assertNotContains(response, reverse('mark_task_complete', args=[self.task(self.build).pk]))
+
+    def test_graph_is_cached_until_templates_change(self):
+        """The role graph is built once and rebuilt after a template change; a hit costs only the version read."""
+        get_role_graph(self.role.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_role_graph(self.role.pk).dependents[self.install.pk], [self.build.pk, self.deploy.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.deploy.depends_on = [self.build.pk]
+            self.deploy.save()
+        self.assertEqual(get_role_graph(self.role.pk).dependents[self.install.pk], [self.build.pk])
+        self.assertEqual(self.pending()['Deploy'], 1)
+
+    def test_graph_version_changes_with_the_template_edit(self):
+        """The version moves in the edit's transaction, so workers holding the old graph rebuild it."""
+        get_role_graph(self.role.pk)
+        version = get_graph_version()
+
+        # Zmiana z innego workera: bez sygnałów w tym procesie, tylko wiersz szablonu i wersja w bazie
+        with self.captureOnCommitCallbacks(execute=False):
+            OnboardingTaskTemplate.objects.filter(pk=self.deploy.pk).update(depends_on=[self.build.pk])
+            bump_graph_version()
+        self.assertNotEqual(get_graph_version(), version)
+        self.assertEqual(get_role_graph(self.role.pk).dependents[self.install.pk], [self.build.pk])
+
+    def test_deleting_a_dependency_unblocks_dependents(self):
+        """Removing a template recomputes the counters of tasks that depended on it."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.install.delete()
+        self.assertEqual(self.pending(), {'Build': 0, 'Deploy': 1})
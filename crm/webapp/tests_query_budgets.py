@@ -0,0 +1,63 @@
+"""
+Per-view query budgets.
+
+Every URL name listed in webapp.urls.QUERY_BUDGETS is rendered against seeded data at
+two sizes. The query count must stay within the declared budget and must not grow with
+the amount of data - an N+1 pattern in a view or template makes the larger run issue
+more queries and fails the test.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from webapp.models import Project, ProjectMembership
+from webapp.seeding import scaled_volumes, seed_dataset
+from webapp.stats_cache import get_stats_generation
+from webapp.urls import QUERY_BUDGETS
+
+SMALL = 1
+LARGE = 3
+
+
+class QueryBudgetTests(TestCase):
+    """Query counts per view stay flat as data grows."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        self.client.login(username='admin', password='testpass123')
+        seed_dataset(scaled_volumes(SMALL), prefix='small', admin=self.admin)
+
+    def url_for(self, name):
+        """Reverse a budgeted URL name using the most recently seeded (largest) project."""
+        project = Project.objects.order_by('-pk').first()
+        membership = ProjectMembership.objects.get(user=self.admin, project=project)
+        kwargs = {
+            'onboarding_setup': {'project_id': project.pk},
+            'onboarding_dashboard': {'membership_id': membership.pk},
+        }
+        return reverse(name, kwargs=kwargs.get(name))
+
+    def count_queries(self, name):
+        url = self.url_for(name)
+        cache.clear()  # liczymy zimny przebieg, bez agregatów z cache statystyk
+        get_stats_generation()  # wiersz wersji w bazie powstaje raz - nie wliczamy go do budżetu
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, f"{name}: {url} returned {response.status_code}")
+        return len(queries)
+
+    def test_views_stay_within_budget_and_do_not_grow(self):
+        small = {name: self.count_queries(name) for name in QUERY_BUDGETS}
+        seed_dataset(scaled_volumes(LARGE), prefix='large', admin=self.admin)
+        large = {name: self.count_queries(name) for name in QUERY_BUDGETS}
+
+        for name, budget in QUERY_BUDGETS.items():
+            with self.subTest(view=name):
+                self.assertEqual(
+                    large[name], small[name],
+                    f"{name}: {small[name]} queries at scale {SMALL}, {large[name]} at scale {LARGE}",
+                )
+                self.assertLessEqual(large[name], budget, f"{name}: {large[name]} queries over budget of {budget}")
@@ -0,0 +1,126 @@
+"""
+Query-plan regression tests for hot filters.
+
+Each hot query is EXPLAINed against a seeded dataset and must be served by the
+composite index added for it (looked up by its fields on the model's Meta.indexes),
+so dropping that index fails the test even when a single-column FK index could still
+avoid a full scan. On PostgreSQL sequential scans are disabled for the transaction
+(enable_seqscan = off); SQLite plans are also checked for full-table SCAN steps.
+"""
+import datetime
+import json
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+
+from webapp.analytics_export import filter_project_tasks
+from webapp.models import (
+    DocumentSource, OnboardingStep, OnboardingTask, OnboardingTaskTemplate, Project, ProjectMembership,
+    ProjectRole, ProjectTask, ProjectTaskDailyRollup
+)
+from webapp.pagination import TASK_PAGE_SIZE, decode_cursor, encode_cursor
+
+
+def _index_name(model, fields):
+    for index in model._meta.indexes:
+        if list(index.fields) == list(fields):
+            return index.name
+    raise AssertionError(f"{model.__name__} has no index on {fields}")
+
+
+def _postgres_seq_scans(plan):
+    scans = []
+    if plan.get('Node Type') == 'Seq Scan':
+        scans.append(plan.get('Relation Name'))
+    for child in plan.get('Plans', []):
+        scans += _postgres_seq_scans(child)
+    return scans
+
+
+class QueryPlanTests(TestCase):
+    """EXPLAIN-based checks that hot filters are served by indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Seed enough rows that every table has several projects, users and days."""
+        cls.users = User.objects.bulk_create([User(username=f'user{i}') for i in range(20)])
+        cls.projects = [Project.objects.create(name=f'Project {i}', description='Seed') for i in range(5)]
+        role = ProjectRole.objects.create(project=cls.projects[0], name='Developer')
+        step = OnboardingStep.objects.create(role=role, title='Setup', order=1)
+        for i in range(5):
+            OnboardingTaskTemplate.objects.create(step=step, title=f'Template {i}')
+        for i, user in enumerate(cls.users):
+            ProjectMembership.objects.create(user=user, project=cls.projects[0], role=role, is_admin=i % 5 == 0)
+            for project in cls.projects[1:]:
+                ProjectMembership.objects.create(user=user, project=project)
+        for i in range(200):
+            ProjectTask.objects.create(
+                title=f'Task {i}', description='', project=cls.projects[i % 5], assigned_to=cls.users[i % 20],
+                date=datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 60), time='10:00', duration=1
+            )
+        DocumentSource.objects.bulk_create([
+            DocumentSource(project=cls.projects[i % 5], title=f'Doc {i}', content='', doc_type='txt',
+                           ai_generation_status=('pending', 'completed', 'failed')[i % 3])
+            for i in range(60)
+        ])
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('ANALYZE')
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            elif connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset, model, fields):
+        """Fail if the plan scans model's table sequentially or does not use the index on fields."""
+        table = model._meta.db_table
+        index = _index_name(model, fields)
+        if connection.vendor == 'postgresql':
+            plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+            scans = _postgres_seq_scans(plan)
+            self.assertNotIn(table, scans, f"Seq Scan on {table}:\n{queryset.explain()}")
+        elif connection.vendor == 'sqlite':
+            plan = queryset.explain()
+            self.assertIsNone(
+                re.search(rf'\bSCAN {table}\b(?! USING)', plan),
+                f"Full scan on {table}:\n{plan}",
+            )
+        else:
+            self.skipTest(f'No plan check for {connection.vendor}')
+        plan = queryset.explain()
+        self.assertIn(index, plan, f"Index {index} not used:\n{plan}")
+
+    def test_project_tasks_by_project_and_date_range(self):
+        tasks = filter_project_tasks({
+            'project': self.projects[1].pk, 'start_date': '2025-01-10', 'end_date': '2025-01-20',
+        })
+        self.assertUsesIndex(tasks, ProjectTask, ['project', 'date'])
+
+    def test_task_keyset_page(self):
+        anchor = ProjectTask.objects.order_by('date', 'time', 'pk')[100]
+        day, time, pk = decode_cursor(encode_cursor(anchor))
+        page = ProjectTask.objects.order_by('date', 'time', 'pk').filter(
+            Q(date__gt=day) | Q(date=day, time__gt=time) | Q(date=day, time=time, pk__gt=pk)
+        )[:TASK_PAGE_SIZE + 1]
+        self.assertUsesIndex(page, ProjectTask, ['date', 'time', 'basetask_ptr'])
+
+    def test_onboarding_tasks_by_membership_and_completed(self):
+        membership = ProjectMembership.objects.filter(role__isnull=False).first()
+        tasks = OnboardingTask.objects.filter(membership=membership, completed=False)
+        self.assertUsesIndex(tasks, OnboardingTask, ['membership', 'completed'])
+
+    def test_documents_by_project_and_status(self):
+        documents = DocumentSource.objects.filter(project=self.projects[2], ai_generation_status='pending')
+        self.assertUsesIndex(documents, DocumentSource, ['project', 'ai_generation_status'])
+
+    def test_admin_memberships_by_user(self):
+        memberships = ProjectMembership.objects.filter(user=self.users[0], is_admin=True)
+        self.assertUsesIndex(memberships, ProjectMembership, ['user', 'is_admin'])
+
+    def test_daily_rollups_by_project_and_day(self):
+        rollups = ProjectTaskDailyRollup.objects.filter(project=self.projects[3], day__gte='2025-02-01')
+        self.assertUsesIndex(rollups, ProjectTaskDailyRollup, ['project', 'day'])
@@ -15,7 +15,7 @@ from webapp.views.contact_views import (
 )
 
 from webapp.views.task_views import (
-    task_dashboard, task_list, task_detail, create_task,
+    task_dashboard, task_list, task_feed, task_detail, create_task,
     mark_task_complete, mark_task_in_progress, reset_task_to_do
 )
 
@@ -38,13 +38,31 @@ from webapp.views.llm_onboarding_views import (
 )
 
 from webapp.views.statistics_views import (
-    statistics_dashboard, export_tasks_csv
+    statistics_dashboard, export_tasks_csv, export_analytics, task_time_series_api
 )
 
 from webapp.views.spotify_views import (
-    artist_search
+    artist_search, artist_suggest
 )
 
+from webapp.views.metrics_views import (
+    metrics
+)
+
+# Maksymalna liczba zapytań SQL na GET danego widoku (webapp.tests_query_budgets).
+# Liczba zapytań nie może też rosnąć razem z ilością danych.
+QUERY_BUDGETS = {
+    'task_dashboard': 5,
+    'task_list': 4,
+    'task_feed': 5,
+    'manage_projects': 7,
+    'manage_users': 5,
+    'statistics_dashboard': 13,
+    'onboarding_projects': 4,
+    'onboarding_setup': 11,
+    'onboarding_dashboard': 6,
+}
+
 urlpatterns = [
     path('', home, name=""),
     path('register', register, name="register"),
@@ -62,6 +80,7 @@ urlpatterns = [
     # TASKS
     path('task_dashboard', task_dashboard, name="task_dashboard"),
     path('task_list', task_list, name='task_list'),
+    path('api/tasks/', task_feed, name='task_feed'),
     path('task/<int:task_id>/', task_detail, name='task_detail'),
     path('create_task/', create_task, name='create_task'),
 
@@ -72,9 +91,15 @@ urlpatterns = [
     # STATISTICS & EXPORT
     path('statistics_dashboard', statistics_dashboard, name="statistics_dashboard"),
     path('export-csv/', export_tasks_csv, name='export_tasks_csv'),
+    path('export/<str:dataset>/', export_analytics, name='export_analytics'),
+    path('api/task-time-series/', task_time_series_api, name='task_time_series_api'),
+
+    # METRICS (Prometheus)
+    path('metrics', metrics, name='metrics'),
 
     # SPOTIFY
     path('artist-search/', artist_search, name='artist_search_url'),
+    path('artist-search/suggest/', artist_suggest, name='artist_suggest'),
 
     # ONBOARDING
     path('onboarding/<int:membership_id>/', onboarding_dashboard, name='onboarding_dashboard'),
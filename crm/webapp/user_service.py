@@ -0,0 +1,46 @@
+"""
+Operacje zbiorcze na użytkownikach i ich profilach.
+"""
+import logging
+from typing import Iterable, Optional
+
+from django.contrib.auth.models import User
+
+from webapp.models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def ensure_user_profiles(users: Optional[Iterable[User]] = None, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Tworzy brakujące UserProfile jednym zapytaniem i INSERT-ami partiami zamiast get_or_create per użytkownik.
+
+    users - załadowani użytkownicy (z select_related('userprofile')); utworzone profile są do nich
+    podpinane, więc dalszy dostęp do user.userprofile nie robi zapytań. Bez users uzupełnia profile
+    wszystkich użytkowników (start kontenera, komenda ensure_user_profiles).
+    Zwraca liczbę utworzonych profili.
+    """
+    if users is None:
+        missing = [User(pk=pk) for pk in User.objects.filter(userprofile__isnull=True).values_list('pk', flat=True)]
+    else:
+        missing = [user for user in users if not hasattr(user, 'userprofile')]
+    if not missing:
+        return 0
+
+    # Profil mógł powstać równolegle (sygnał post_save, drugi proces przy starcie)
+    existing = set(UserProfile.objects.filter(user__in=missing).values_list('user_id', flat=True))
+    UserProfile.objects.bulk_create(
+        [UserProfile(user=user) for user in missing if user.pk not in existing],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    # Przy ignore_conflicts obiekty z bulk_create nie mają pk - podpinamy wiersze z bazy
+    profiles = {profile.user_id: profile for profile in UserProfile.objects.filter(user__in=missing)}
+    for user in missing:
+        if user.pk in profiles:
+            user.userprofile = profiles[user.pk]
+    created = len(profiles) - len(existing)
+    logger.info(f"Created {created} missing user profiles")
+    return created
@@ -8,3 +8,4 @@ from .onboarding_views import *
 from .statistics_views import *
 from .spotify_views import *
 from .llm_onboarding_views import *
+from .metrics_views import *
@@ -21,17 +21,25 @@ from webapp.llm_service import (
     chunk_text,
     update_document_status
 )
+from webapp.onboarding_dag import bump_graph_version, resolve_draft_dependencies
+from webapp.onboarding_service import schedule_template_propagation
+from webapp.permissions import is_project_admin, project_admin_required
 
 logger = logging.getLogger(__name__)
 
 
-def is_project_admin(user, project):
-    """Sprawdza czy użytkownik jest adminem projektu"""
-    return ProjectMembership.objects.filter(
-        user=user,
-        project=project,
-        is_admin=True
-    ).exists()
+def _redirect_to_setup(request, project_id):
+    messages.error(request, "No permissions")
+    return redirect('onboarding_setup', project_id=project_id)
+
+
+def _json_forbidden(request, project_id):
+    return JsonResponse({'error': 'No permissions'}, status=403)
+
+
+def _json_forbidden_draft(request, project_id):
+    # Edycja draftu zawsze zwracała komunikat po polsku - frontend go wyświetla
+    return JsonResponse({'error': 'Brak uprawnień'}, status=403)
 
 
 @login_required
@@ -45,7 +53,7 @@ def llm_onboarding_generate(request, project_id):
     project = get_object_or_404(Project, id=project_id)
     
     # Sprawdzenie uprawnień
-    is_admin = is_project_admin(request.user, project)
+    is_admin = is_project_admin(request, project)
     if not is_admin:
         # Show the page but with admin error flag
         roles = ProjectRole.objects.filter(project=project)
@@ -160,6 +168,7 @@ def llm_onboarding_generate(request, project_id):
 
 
 @login_required
+@project_admin_required(on_denied=_redirect_to_setup)
 def llm_onboarding_review(request, project_id):
     """
     Widok do review i edycji wygenerowanego draftu.
@@ -169,11 +178,6 @@ def llm_onboarding_review(request, project_id):
     """
     project = get_object_or_404(Project, id=project_id)
     
-    # Sprawdzenie uprawnień
-    if not is_project_admin(request.user, project):
-        messages.error(request, "No permissions")
-        return redirect('onboarding_setup', project_id=project_id)
-    
     # Pobierz draft z sesji
     draft_session = request.session.get('llm_draft')
     if not draft_session or draft_session.get('project_id') != project_id:
@@ -223,6 +227,7 @@ def llm_onboarding_review(request, project_id):
                         )
                     
                     # Tworzymy tasks
+                    created = []  # (task z draftu, utworzony szablon) - do rozwiązania depends_on
                     for task_data in draft_data['tasks']:
                         step_id = task_data['step_id']
                         step = step_map.get(step_id)
@@ -231,16 +236,27 @@ def llm_onboarding_review(request, project_id):
                             logger.warning(f"Step {step_id} not found for task {task_data['title']}")
                             continue
                         
-                        OnboardingTaskTemplate.objects.create(
+                        template = OnboardingTaskTemplate.objects.create(
                             step=step,
                             title=task_data['title'],
                             description=task_data.get('description', ''),
                             is_required=task_data.get('is_required', True),
                             acceptance_criteria='\n'.join(task_data.get('acceptance_criteria', [])),
                             estimated_time_hours=task_data.get('estimated_time_hours'),
-                            depends_on=task_data.get('depends_on', [])
+                            depends_on=[]
                         )
+                        created.append((task_data, template))
+
+                    # depends_on z draftu -> ID szablonów; cykl przerywa zatwierdzenie (DependencyCycleError)
+                    dependencies = resolve_draft_dependencies(created)
+                    for _, template in created:
+                        template.depends_on = dependencies[template.pk]
+                    OnboardingTaskTemplate.objects.bulk_update([template for _, template in created], ['depends_on'])
+                    bump_graph_version()
                     
+                    # Nowe szablony trafiają też do obecnych członków roli (w tle)
+                    schedule_template_propagation([role.id])
+
                     # Usuwamy draft z sesji
                     del request.session['llm_draft']
                     
@@ -267,6 +283,7 @@ def llm_onboarding_review(request, project_id):
 
 @login_required
 @require_http_methods(["POST"])
+@project_admin_required(on_denied=_json_forbidden_draft)
 def llm_onboarding_edit_draft(request, project_id):
     """
     API endpoint do edycji draftu (AJAX).
@@ -274,9 +291,6 @@ def llm_onboarding_edit_draft(request, project_id):
     """
     project = get_object_or_404(Project, id=project_id)
     
-    if not is_project_admin(request.user, project):
-        return JsonResponse({'error': 'Brak uprawnień'}, status=403)
-    
     try:
         data = json.loads(request.body)
         draft_session = request.session.get('llm_draft')
@@ -297,16 +311,13 @@ def llm_onboarding_edit_draft(request, project_id):
 
 
 @login_required
+@project_admin_required(on_denied=_redirect_to_setup)
 def upload_document(request, project_id):
     """
     Upload dokumentu źródłowego dla projektu.
     """
     project = get_object_or_404(Project, id=project_id)
     
-    if not is_project_admin(request.user, project):
-        messages.error(request, "No permissions")
-        return redirect('onboarding_setup', project_id=project_id)
-    
     if request.method == 'POST':
         try:
             title = request.POST.get('title')
@@ -343,6 +354,7 @@ def upload_document(request, project_id):
 
 @login_required
 @require_http_methods(["GET"])
+@project_admin_required(on_denied=_json_forbidden)
 def document_status_api(request, project_id):
     """
     API endpoint to get document processing status.
@@ -350,10 +362,6 @@ def document_status_api(request, project_id):
     """
     project = get_object_or_404(Project, id=project_id)
     
-    # Check permissions
-    if not is_project_admin(request.user, project):
-        return JsonResponse({'error': 'No permissions'}, status=403)
-    
     # Get base queryset for documents
     base_qs = DocumentSource.objects.filter(project=project)
     
@@ -378,6 +386,7 @@ def document_status_api(request, project_id):
 
 @login_required
 @require_http_methods(["POST"])
+@project_admin_required(on_denied=_json_forbidden)
 def llm_onboarding_generate_sync(request, project_id):
     """
     Generate onboarding plan synchronously (Railway free tier compatible).
@@ -385,10 +394,6 @@ def llm_onboarding_generate_sync(request, project_id):
     """
     project = get_object_or_404(Project, id=project_id)
     
-    # Check permissions
-    if not is_project_admin(request.user, project):
-        return JsonResponse({'error': 'No permissions'}, status=403)
-    
     try:
         # Parse request data
         data = json.loads(request.body) if request.body else {}
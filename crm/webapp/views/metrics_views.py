@@ -0,0 +1,28 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+from webapp.metrics import REGISTRY
+
+
+def _authorized(request) -> bool:
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        # Bez tokenu metryki widzi tylko zalogowany personel
+        return request.user.is_authenticated and request.user.is_staff
+    return hmac.compare_digest(
+        request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()
+    )
+
+
+def metrics(request):
+    """Metryki procesu w formacie Prometheusa; wymagają nagłówka Bearer z METRICS_TOKEN (bez tokenu - konta staff)."""
+    if not getattr(settings, 'METRICS_ENABLED', True):
+        raise Http404
+    if not _authorized(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        REGISTRY.render(sample_rate=getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
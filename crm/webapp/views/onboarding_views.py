@@ -2,7 +2,7 @@ import csv
 from django.shortcuts import render, redirect, get_object_or_404
 from webapp.forms import (CreateUserForm, LoginForm, CreateContactForm, ContactForm, UpdateContactForm, TaskForm, ProjectForm, CreateRoleForm,
                     AssignProjectRoleForm, AddMemberForm, CreateProjectRoleForm, CreateProjectForm, CreateOnboardingTaskForm,UpdateProgressForm,CreateOnboardingTaskTemplateForm, CreateOnboardingStepForm)
-from django.db.models import Count, Sum
+from django.db.models import Count, Prefetch, Sum
 from django.utils import timezone
 from django.contrib.auth.models import auth
 from django.contrib.auth import authenticate
@@ -12,6 +12,11 @@ from django.contrib import messages
 from webapp.spotify_utils import get_artist_info
 from django.http import HttpResponse
 from django.views.decorators.http import require_POST
+from webapp.onboarding_service import (
+    TaskBlockedError, onboarding_dashboard_tree, schedule_template_propagation, restart_membership_onboarding,
+    set_onboarding_task_status
+)
+from webapp.onboarding_dag import refresh_pending_dependencies
 
 @login_required
 def onboarding_progress(request, membership_id):
@@ -50,6 +55,7 @@ def onboarding_setup(request, project_id):
                 task = task_form.save(commit=False)
                 if task.step.role.project_id == project.id:
                     task.save()
+                    schedule_template_propagation([task.step.role_id])
                     messages.success(request, "Task added successfully.")
                 else:
                     messages.error(request, "Invalid step: does not belong to this project.")
@@ -82,8 +88,18 @@ def onboarding_setup(request, project_id):
         step_form = CreateOnboardingStepForm()
 
     # Nadpisujemy querysety formularzy, żeby wyświetlały tylko role i stepy z tego projektu:
-    task_form.fields['step'].queryset = OnboardingStep.objects.filter(role__project=project)
-    step_form.fields['role'].queryset = roles
+    task_form.fields['step'].queryset = OnboardingStep.objects.filter(role__project=project).select_related('role')
+    step_form.fields['role'].queryset = roles.select_related('project')
+
+    # Całe drzewo rola -> członkowie / kroki -> szablony w stałej liczbie zapytań
+    roles = roles.prefetch_related(
+        Prefetch(
+            'projectmembership_set',
+            queryset=ProjectMembership.objects.select_related('user'),
+            to_attr='members',
+        ),
+        'steps__task_templates',
+    )
 
     context = {
         'project': project,
@@ -96,25 +112,29 @@ def onboarding_setup(request, project_id):
 
 @login_required
 def onboarding_dashboard(request, membership_id):
-    membership = get_object_or_404(ProjectMembership, id=membership_id, user=request.user)
-    steps = OnboardingStep.objects.filter(role=membership.role).order_by('order')
-
-    user_tasks = {
-        task.template.id: task
-        for task in OnboardingTask.objects.filter(membership=membership)
-    }
-
+    membership = get_object_or_404(
+        ProjectMembership.objects.select_related('project', 'role'), id=membership_id, user=request.user
+    )
     if request.method == 'POST':
         if 'complete_task_id' in request.POST:
             task_id = request.POST.get('complete_task_id')
             template = get_object_or_404(OnboardingTaskTemplate, id=task_id)
-            task, _ = OnboardingTask.objects.get_or_create(
+            task, created = OnboardingTask.objects.get_or_create(
                 membership=membership,
-                template=template
+                template=template,
+                defaults={
+                    'title': template.title,
+                    'description': template.description,
+                    'assigned_to': membership.user,
+                }
             )
-            task.completed = True
-            task.completed_at = timezone.now()
-            task.save()
+            if created:
+                # Nowe zadanie ma pending_dependencies=0 - liczymy je przed przesunięciem liczników następników
+                refresh_pending_dependencies([membership.pk])
+            try:
+                set_onboarding_task_status(task, OnboardingTask.TaskStatus.COMPLETED)
+            except TaskBlockedError:
+                messages.error(request, f"Task '{task.title}' is waiting for other tasks to be completed first.")
             return redirect('onboarding_dashboard', membership_id=membership.id)
 
         elif 'custom_step_id' in request.POST:
@@ -132,8 +152,7 @@ def onboarding_dashboard(request, membership_id):
 
     context = {
         'membership': membership,
-        'onboarding_steps': steps,
-        'user_tasks': user_tasks,
+        'onboarding': onboarding_dashboard_tree(membership),
         'custom_task_form': form,
     }
     return render(request, 'webapp/onboarding_dashboard.html', context)
@@ -172,20 +191,8 @@ def onboarding_projects(request):
 def restart_onboarding(request, membership_id):
     membership = get_object_or_404(ProjectMembership, id=membership_id, user=request.user)
 
-    # Usuń istniejące zadania onboardingowe użytkownika
-    OnboardingTask.objects.filter(membership=membership).delete()
-
-    # Utwórz ponownie zadania na podstawie szablonów
-    templates = OnboardingTaskTemplate.objects.filter(step__role=membership.role)
-    for template in templates:
-        OnboardingTask.objects.create(
-            title=template.title,
-            description=template.description,
-            assigned_to=membership.user,
-            status=BaseTask.TaskStatus.TODO,
-            template=template,
-            membership=membership,
-        )
+    # Archiwizacja ukończonych zadań + reset w miejscu zamiast kasowania i tworzenia od nowa
+    restart_membership_onboarding(membership)
 
     messages.success(request, "Onboarding has been restarted with default tasks.")
     return redirect('onboarding_dashboard', membership_id=membership.id)
\ No newline at end of file
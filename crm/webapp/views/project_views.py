@@ -1,8 +1,9 @@
 import csv
 from django.shortcuts import render, redirect, get_object_or_404
 from webapp.forms import (CreateUserForm, LoginForm, CreateContactForm, ContactForm, UpdateContactForm, TaskForm, ProjectForm, CreateRoleForm,
-                    AssignProjectRoleForm, AddMemberForm, CreateProjectRoleForm, CreateProjectForm, CreateOnboardingTaskForm,UpdateProgressForm,CreateOnboardingTaskTemplateForm, CreateOnboardingStepForm)
-from django.db.models import Count, Sum
+                    AssignProjectRoleForm, AddMemberForm, CreateProjectRoleForm, CreateProjectForm, CreateOnboardingTaskForm,UpdateProgressForm,CreateOnboardingTaskTemplateForm, CreateOnboardingStepForm,
+                    BulkAddMembersForm, set_role_choices, use_shared_user_options)
+from django.db.models import Count, Prefetch, Sum
 from django.utils import timezone
 from django.contrib.auth.models import auth
 from django.contrib.auth import authenticate
@@ -10,7 +11,11 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from webapp.models import Contact, Project, ProjectTask, User,UserProfile, UserRole, ProjectRole, ProjectMembership, OnboardingStep, OnboardingTaskTemplate, OnboardingTask, OnboardingProgress
 from django.contrib import messages
 from webapp.spotify_utils import get_artist_info
+from webapp.onboarding_service import bulk_add_members, read_member_rows
 from django.http import HttpResponse
+from django.core.paginator import Paginator
+
+PROJECTS_PAGE_SIZE = 20
 
 @login_required
 def manage_projects(request):
@@ -32,7 +37,7 @@ def manage_projects(request):
         project = get_object_or_404(Project, id=project_id) if project_id else None
 
         if action == 'add_member':
-            add_member_form = AddMemberForm(request.POST)
+            add_member_form = AddMemberForm(request.POST, project=project)
             if add_member_form.is_valid():
                 membership = add_member_form.save(commit=False)
                 membership.project = project
@@ -51,6 +56,39 @@ def manage_projects(request):
                 
                 return redirect('manage_projects')
             
+        elif action == 'bulk_add_members':
+            bulk_form = BulkAddMembersForm(request.POST, request.FILES, project=project)
+            if bulk_form.is_valid() and project:
+                role = bulk_form.cleaned_data['role']
+                is_admin = bulk_form.cleaned_data['is_admin']
+                rows = [
+                    {'user': u, 'role': role, 'is_admin': is_admin}
+                    for u in bulk_form.cleaned_data['users']
+                ]
+
+                csv_text = bulk_form.cleaned_data['csv_file']
+                if csv_text:
+                    parsed = read_member_rows(csv_text, project)
+                    for error in parsed['errors']:
+                        messages.error(request, error)
+                    for row in parsed['rows']:
+                        if row['role'] is None:
+                            row['role'] = role
+                        row['is_admin'] = row['is_admin'] or is_admin
+                    rows.extend(parsed['rows'])
+
+                result = bulk_add_members(project, rows)
+                messages.success(
+                    request,
+                    f"Added {result['created_memberships']} members to '{project.name}' "
+                    f"with {result['created_tasks']} onboarding tasks."
+                )
+                if result['skipped']:
+                    messages.warning(request, f"Skipped {len(result['skipped'])} users (already members or invalid role).")
+                return redirect('manage_projects')
+            for error in [*bulk_form.non_field_errors(), *bulk_form.errors.get('csv_file', [])]:
+                messages.error(request, error)
+
         elif action == 'create_role':
             add_role_form = CreateProjectRoleForm(request.POST)
             if add_role_form.is_valid():
@@ -82,13 +120,31 @@ def manage_projects(request):
             return redirect('manage_projects')
 
     # Przy GET albo jeśli POST nie był poprawny:
-    add_member_form = AddMemberForm()
     add_role_form = CreateProjectRoleForm()
     create_project_form = CreateProjectForm()
 
+    # Członkowie i role projektów ze strony w dwóch zapytaniach zamiast dwóch na projekt
+    projects = projects.select_related('creator').prefetch_related(
+        Prefetch('memberships', queryset=ProjectMembership.objects.select_related('user', 'role')),
+        'roles',
+    ).order_by('name', 'pk')
+    projects_page = Paginator(projects, PROJECTS_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    # Lista użytkowników renderowana raz na stronę (<template id="user-options">) - selecty projektów
+    # wypełnia z niej JS, więc rozmiar strony nie rośnie z liczbą użytkowników razy projektów.
+    # Role tylko danego projektu, z prefetcha.
+    user_options = User.objects.order_by('username').values_list('pk', 'username')
+    for project in projects_page:
+        project.add_member_form = AddMemberForm(project=project)
+        project.bulk_add_members_form = BulkAddMembersForm(project=project)
+        use_shared_user_options(project.add_member_form, 'user')
+        use_shared_user_options(project.bulk_add_members_form, 'users')
+        for form in (project.add_member_form, project.bulk_add_members_form):
+            set_role_choices(form, project.roles.all())
+
     context = {
-        'projects': projects,
-        'add_member_form': add_member_form,
+        'projects': projects_page,
+        'user_options': user_options,
         'add_role_form': add_role_form,
         'create_project_form': create_project_form,
     }
@@ -1,16 +1,27 @@
 import csv
+import logging
+import time
+
+import requests
+from spotipy.exceptions import SpotifyBaseException
+
 from django.shortcuts import render, redirect, get_object_or_404
 from webapp.forms import (CreateUserForm, LoginForm, CreateContactForm, ContactForm, UpdateContactForm, TaskForm, ProjectForm, CreateRoleForm,
                     AssignProjectRoleForm, AddMemberForm, CreateProjectRoleForm, CreateProjectForm, CreateOnboardingTaskForm,UpdateProgressForm,CreateOnboardingTaskTemplateForm, CreateOnboardingStepForm)
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Count, Sum
 from django.utils import timezone
 from django.contrib.auth.models import auth
 from django.contrib.auth import authenticate
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.views.decorators.http import require_GET
 from webapp.models import Contact, Project, ProjectTask, User,UserProfile, UserRole, ProjectRole, ProjectMembership, OnboardingStep, OnboardingTaskTemplate, OnboardingTask, OnboardingProgress
 from django.contrib import messages
-from webapp.spotify_utils import get_artist_info
-from django.http import HttpResponse
+from webapp.spotify_utils import cached_artist_suggestions, get_artist_info, search_artists
+from django.http import HttpResponse, JsonResponse
+
+logger = logging.getLogger(__name__)
 
 @login_required
 def artist_search(request):
@@ -18,4 +29,45 @@ def artist_search(request):
     if request.method == 'POST':
         artist_name = request.POST.get('artist_name')
         artist = get_artist_info(artist_name)
-    return render(request, 'webapp/artist_search.html', {'artist': artist})
\ No newline at end of file
+    return render(request, 'webapp/artist_search.html', {'artist': artist})
+
+
+def _debounced(request) -> bool:
+    """True, jeśli ta sesja pytała Spotify krócej niż SPOTIFY_TYPEAHEAD_DEBOUNCE sekund temu."""
+    window = settings.SPOTIFY_TYPEAHEAD_DEBOUNCE
+    if window <= 0:
+        return False
+    key = f'spotify_typeahead:{request.session.session_key or request.user.pk}'
+    now = time.time()
+    last = cache.get(key)
+    if last is not None and now - last < window:
+        return True
+    cache.set(key, now, timeout=60)
+    return False
+
+
+@login_required
+@require_GET
+def artist_suggest(request):
+    """
+    Podpowiedzi artystów dla wpisywanego tekstu (JSON).
+
+    Wyniki z cache są zwracane zawsze; zapytanie do Spotify najwyżej raz na okno debounce
+    na sesję - w przeciwnym razie odpowiedź ma debounced=true i klient pyta ponownie.
+    """
+    query = request.GET.get('q', '')
+    try:
+        limit = max(1, int(request.GET.get('limit', settings.SPOTIFY_TYPEAHEAD_LIMIT)))
+    except ValueError:
+        limit = settings.SPOTIFY_TYPEAHEAD_LIMIT
+
+    results = cached_artist_suggestions(query)
+    if results is None:
+        if _debounced(request):
+            return JsonResponse({'query': query, 'results': [], 'debounced': True})
+        try:
+            results = search_artists(query)
+        except (SpotifyBaseException, requests.RequestException) as e:
+            logger.warning(f"Spotify artist suggestions failed for {query!r}: {e}")
+            return JsonResponse({'error': 'Spotify search failed'}, status=502)
+    return JsonResponse({'query': query, 'results': results[:limit], 'debounced': False})
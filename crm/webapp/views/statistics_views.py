@@ -1,16 +1,32 @@
 import csv
+import tempfile
 from django.shortcuts import render, redirect, get_object_or_404
 from webapp.forms import (CreateUserForm, LoginForm, CreateContactForm, ContactForm, UpdateContactForm, TaskForm, ProjectForm, CreateRoleForm,
                     AssignProjectRoleForm, AddMemberForm, CreateProjectRoleForm, CreateProjectForm, CreateOnboardingTaskForm,UpdateProgressForm,CreateOnboardingTaskTemplateForm, CreateOnboardingStepForm)
 from django.db.models import Count, Sum, F,Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.contrib.auth.models import auth
 from django.contrib.auth import authenticate
 from django.contrib.auth.decorators import login_required, user_passes_test
-from webapp.models import Contact, Project, ProjectTask, User,UserProfile, UserRole, ProjectRole, ProjectMembership, OnboardingStep, OnboardingTaskTemplate, OnboardingTask, OnboardingProgress
+from webapp.models import Contact, Project, ProjectTask, User,UserProfile, UserRole, ProjectRole, ProjectMembership, OnboardingStep, OnboardingTaskTemplate, OnboardingTask, OnboardingProgress, OnboardingStatsRollup
 from django.contrib import messages
 from webapp.spotify_utils import get_artist_info
-from django.http import HttpResponse
+from webapp.stats_cache import cached_stats, get_stats_generation
+from webapp.task_rollups import BUCKETS, task_time_series
+from webapp.analytics_export import DATASETS, FORMATS, ExportUnavailable, export_dataset, filter_project_tasks
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.paginator import Paginator
+
+ONBOARDING_STATS_PAGE_SIZE = 50
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """Pseudo-bufor dla csv.writer - zwraca wiersz zamiast go zapisywać."""
+
+    def write(self, value):
+        return value
 
 @login_required
 def statistics_dashboard(request):
@@ -21,24 +37,27 @@ def statistics_dashboard(request):
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
 
-    tasks = ProjectTask.objects.all()
-    if selected_project:
-        tasks = tasks.filter(project_id=selected_project)
-    if selected_organizer:
-        tasks = tasks.filter(assigned_to_id=selected_organizer)
-    if start_date:
-        tasks = tasks.filter(date__gte=start_date)
-    if end_date:
-        tasks = tasks.filter(date__lte=end_date)
-
-    task_count_by_project = ProjectTask.objects.values('project__name').annotate(total=Count('id')).order_by('-total')
-    task_count_by_organizer = ProjectTask.objects.values('assigned_to__username').annotate(total=Count('id')).order_by('-total')
-    task_stats_by_project = ProjectTask.objects.values('project__name').annotate(
-        total_tasks=Count('id'),
-        total_duration=Sum('duration')
-    ).order_by('-total_tasks')
-
-    total_duration = tasks.aggregate(Sum('duration'))['duration__sum'] or 0
+    tasks = filter_project_tasks(request.GET).select_related('project', 'assigned_to')
+
+    # Agregaty są cache'owane po (generacji danych, filtrach); zapisy zadań podbijają generację
+    generation = get_stats_generation()
+    task_count_by_project = cached_stats('task_count_by_project', (), lambda: list(
+        ProjectTask.objects.values('project__name').annotate(total=Count('id')).order_by('-total')
+    ), generation)
+    task_count_by_organizer = cached_stats('task_count_by_organizer', (), lambda: list(
+        ProjectTask.objects.values('assigned_to__username').annotate(total=Count('id')).order_by('-total')
+    ), generation)
+    task_stats_by_project = cached_stats('task_stats_by_project', (), lambda: list(
+        ProjectTask.objects.values('project__name').annotate(
+            total_tasks=Count('id'),
+            total_duration=Sum('duration')
+        ).order_by('-total_tasks')
+    ), generation)
+
+    filters = (selected_project, selected_organizer, start_date, end_date)
+    total_duration = cached_stats(
+        'total_duration', filters, lambda: tasks.aggregate(Sum('duration'))['duration__sum'] or 0, generation
+    )
 
     context = {
         'projects': projects,
@@ -53,56 +72,90 @@ def statistics_dashboard(request):
         'end_date': end_date,
         'total_duration': total_duration
     }
-    onboarding_stats = ProjectMembership.objects.annotate(
-        username=F('user__username'),                                   
-        project_name=F('project__name'),
-        role_name=F('role__name'),
-        total_tasks=Count('user_onboarding_tasks__template', distinct=True),
-        completed_tasks=Count('user_onboarding_tasks', filter=Q(user_onboarding_tasks__completed=True), distinct=True)
-    ).values(
-        'username', 'project_name', 'role_name', 'total_tasks', 'completed_tasks'
-    ) 
-
-    for entry in onboarding_stats:
-        entry["completion_percent"] = (
-            round((entry["completed_tasks"] / entry["total_tasks"]) * 100, 2)
-            if entry["total_tasks"] else 0
-        )
+    # Statystyki onboardingu czytamy z tabeli rollup (odświeżanej przy zmianach zadań)
+    selected_role = request.GET.get('role')
+    onboarding_stats = OnboardingStatsRollup.objects.all()
+    if selected_project:
+        onboarding_stats = onboarding_stats.filter(project_id=selected_project)
+    if selected_role:
+        onboarding_stats = onboarding_stats.filter(role_id=selected_role)
+
+    paginator = Paginator(onboarding_stats, ONBOARDING_STATS_PAGE_SIZE)
+    onboarding_page = paginator.get_page(request.GET.get('onboarding_page'))
+
+    querystring = request.GET.copy()
+    querystring.pop('onboarding_page', None)
 
     context.update({
-        'onboarding_stats': onboarding_stats
+        'onboarding_stats': onboarding_page,
+        'onboarding_roles': ProjectRole.objects.filter(project_id=selected_project) if selected_project else [],
+        'selected_role': selected_role,
+        'onboarding_querystring': querystring.urlencode(),
     })
 
     return render(request, 'webapp/statistics_dashboard.html', context)
 
 
 def export_tasks_csv(request):
-    response = HttpResponse(content_type='text/csv')
+    # Strumieniowo z kursora serwerowego: stała pamięć, joiny rozwiązane w jednym zapytaniu
+    rows = filter_project_tasks(request.GET).order_by('pk').values_list(
+        'title', 'description', 'date', 'time', 'project__name', 'duration', 'assigned_to__username'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    writer = csv.writer(Echo())
+    header = ['Title', 'Description', 'Date', 'Time', 'Project', 'Duration', 'Assigned To']
+
+    def stream():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="filtered_tasks.csv"'
+    return response
+
+
+@login_required
+def export_analytics(request, dataset):
+    # Parquet/Arrow potrzebuje stopki na końcu pliku, więc zapisujemy do pliku tymczasowego na dysku
+    file_format = request.GET.get('format', 'parquet')
+    if dataset not in DATASETS or file_format not in FORMATS:
+        raise Http404("Unknown export")
 
-    writer = csv.writer(response)
-    writer.writerow(['Title', 'Description', 'Date', 'Time', 'Project', 'Duration', 'Assigned To'])
-
-    tasks = ProjectTask.objects.all()
-
-    if request.GET.get('project'):
-        tasks = tasks.filter(project_id=request.GET['project'])
-    if request.GET.get('organizer'):
-        tasks = tasks.filter(assigned_to_id=request.GET['organizer'])
-    if request.GET.get('start_date'):
-        tasks = tasks.filter(date__gte=request.GET['start_date'])
-    if request.GET.get('end_date'):
-        tasks = tasks.filter(date__lte=request.GET['end_date'])
-
-    for task in tasks:
-        writer.writerow([
-            task.title,
-            task.description,
-            task.date,
-            task.time,
-            task.project.name,
-            task.duration,
-            task.assigned_to.username
-        ])
-
-    return response
\ No newline at end of file
+    output = tempfile.TemporaryFile()
+    try:
+        export_dataset(dataset, request.GET, output, file_format=file_format)
+    except ExportUnavailable as exc:
+        output.close()
+        return HttpResponse(str(exc), status=501, content_type='text/plain')
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=f'{dataset}.{file_format}')
+
+
+@login_required
+def task_time_series_api(request):
+    # Szereg czasowy z dziennych rollupów; bucket=day|week|month agregowany po stronie bazy
+    bucket = request.GET.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        return JsonResponse({'error': f"bucket must be one of: {', '.join(BUCKETS)}"}, status=400)
+    for name in ('start_date', 'end_date'):
+        value = request.GET.get(name)
+        try:
+            parsed = parse_date(value) if value else True
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            return JsonResponse({'error': f"{name} must be a date in YYYY-MM-DD format"}, status=400)
+
+    series = task_time_series(bucket, request.GET)
+    return JsonResponse({
+        'bucket': bucket,
+        'series': [
+            {
+                'period': row['period'].isoformat(),
+                'task_count': row['task_count'],
+                'total_duration': row['total_duration'],
+            }
+            for row in series
+        ],
+    })
@@ -9,7 +9,10 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from webapp.models import Contact, Project, ProjectTask, User,UserProfile, UserRole, ProjectRole, ProjectMembership, OnboardingStep, OnboardingTaskTemplate, OnboardingTask, OnboardingProgress
 from django.contrib import messages
 from webapp.spotify_utils import get_artist_info
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from webapp.onboarding_service import TaskBlockedError, set_onboarding_task_status
+from webapp.pagination import keyset_paginate, page_size_from
 
 @login_required
 def create_task(request):
@@ -32,17 +35,51 @@ def create_task(request):
     return render(request, 'webapp/task_form.html', {'form': form})
 
 def task_list(request):
-    tasks = ProjectTask.objects.all()
+    tasks = keyset_paginate(
+        ProjectTask.objects.select_related('project', 'assigned_to'),
+        request.GET.get('cursor'),
+        page_size_from(request.GET.get('page_size')),
+    )
     return render(request, 'webapp/task_list.html', {'tasks': tasks})
 
 
+@login_required
+def task_feed(request):
+    # Wariant JSON dla infinite scroll: ?cursor=<next_cursor>&mine=1
+    tasks = ProjectTask.objects.select_related('project', 'assigned_to')
+    if request.GET.get('mine'):
+        tasks = tasks.filter(assigned_to=request.user)
+    page = keyset_paginate(tasks, request.GET.get('cursor'), page_size_from(request.GET.get('page_size')))
+    return JsonResponse({
+        'results': [
+            {
+                'id': task.pk,
+                'title': task.title,
+                'date': task.date.isoformat(),
+                'time': task.time.isoformat(),
+                'duration': task.duration,
+                'status': task.status,
+                'project': task.project.name,
+                'assigned_to': task.assigned_to.username,
+                'url': reverse('task_detail', args=[task.pk]),
+            }
+            for task in page
+        ],
+        'next_cursor': page.next_cursor,
+    })
+
+
 def task_detail(request, task_id):
     task = get_object_or_404(ProjectTask, pk=task_id)
     return render(request, 'webapp/task_detail.html', {'task': task})
 
 @login_required(login_url='my-login')
 def task_dashboard(request):
-    my_tasks = ProjectTask.objects.filter(assigned_to=request.user)
+    my_tasks = keyset_paginate(
+        ProjectTask.objects.filter(assigned_to=request.user).select_related('project', 'assigned_to'),
+        request.GET.get('cursor'),
+        page_size_from(request.GET.get('page_size')),
+    )
 
     # tylko projekty, gdzie user jest członkiem
     my_memberships = ProjectMembership.objects.filter(user=request.user).select_related('project')
@@ -59,30 +96,25 @@ def task_dashboard(request):
 @login_required
 def mark_task_complete(request, task_id):
     task = get_object_or_404(OnboardingTask, id=task_id, membership__user=request.user)
-    task.status = OnboardingTask.TaskStatus.COMPLETED
-    task.completed_at = timezone.now()
-    task.completed = True
-    task.save()
-    messages.success(request, f"Marked task '{task.title}' as completed.")
+    try:
+        set_onboarding_task_status(task, OnboardingTask.TaskStatus.COMPLETED)
+    except TaskBlockedError:
+        messages.error(request, f"Task '{task.title}' is waiting for other tasks to be completed first.")
+    else:
+        messages.success(request, f"Marked task '{task.title}' as completed.")
     return redirect("onboarding_dashboard", membership_id=task.membership.id)
 
 @login_required
 def mark_task_in_progress(request, task_id):
     task = get_object_or_404(OnboardingTask, id=task_id, membership__user=request.user)
-    task.status = OnboardingTask.TaskStatus.IN_PROGRESS
-    task.completed = False
-    task.completed_at = None
-    task.save()
+    set_onboarding_task_status(task, OnboardingTask.TaskStatus.IN_PROGRESS)
     messages.info(request, f"Task '{task.title}' marked as in progress.")
     return redirect("onboarding_dashboard", membership_id=task.membership.id)
 
 @login_required
 def reset_task_to_do(request, task_id):
     task = get_object_or_404(OnboardingTask, id=task_id, membership__user=request.user)
-    task.status = OnboardingTask.TaskStatus.TODO
-    task.completed = False
-    task.completed_at = None
-    task.save()
+    set_onboarding_task_status(task, OnboardingTask.TaskStatus.TODO)
     messages.warning(request, f"Task '{task.title}' reset to To Do.")
     return redirect("onboarding_dashboard", membership_id=task.membership.id)
 
@@ -11,11 +11,15 @@ from webapp.models import Contact, Project, ProjectTask, User,UserProfile, UserR
 from django.contrib import messages
 from webapp.spotify_utils import get_artist_info
 from django.http import HttpResponse
+from django.core.paginator import Paginator
+from webapp.user_service import ensure_user_profiles
+
+USERS_PAGE_SIZE = 50
 
 @login_required
 @user_passes_test(lambda u: u.is_superuser)
 def manage_users(request):
-    users = User.objects.all().order_by('username')
+    users = User.objects.select_related('userprofile__role').order_by('username')
     roles = UserRole.objects.all()
     role_form = CreateRoleForm()
 
@@ -45,16 +49,14 @@ def manage_users(request):
             messages.success(request, f"Permissions updated for role '{role.name}'.")
             return redirect('manage_users')
 
-    user_profiles = [
-    {
-        'user': u,
-        'profile': UserProfile.objects.get_or_create(user=u)[0]
-    }
-    for u in users
-    ]
+    users_page = Paginator(users, USERS_PAGE_SIZE).get_page(request.GET.get('page'))
+    # Brakujące profile tworzymy jednym INSERT-em zamiast get_or_create per użytkownik
+    ensure_user_profiles(users_page.object_list)
+
+    user_profiles = [{'user': u, 'profile': u.userprofile} for u in users_page.object_list]
 
     context = {
-        'users': users,
+        'users': users_page,
         'roles': roles,
         'role_form': role_form,
         'user_profiles': user_profiles,